@@ -0,0 +1,104 @@
+"""Benchmarks the UV check of the export on a mesh with 1M loops and compares it against the previous implementation.
+
+Runs inside Blender:
+
+    blender --background --factory-startup --python benchmarks/bench_check_uvms.py -- [grid segments] [share of UVs at zero]
+
+The grid defaults to 500 segments per side, about 1M loops, with 1% of the UVs moved to (0, 0).
+"""
+
+import os
+import sys
+import time
+import importlib
+
+import bpy
+import bmesh
+import numpy as np
+
+from mathutils  import Vector
+
+
+REPEATS = 3
+
+
+def count_zero_uvs_reference(mesh) -> tuple:
+    """The loop check_uvms used before it was vectorized."""
+
+    at_zero = 0
+    obj_total = len(mesh.uv_layers.active.data)
+    for loop in mesh.loops:
+        uv = mesh.uv_layers.active.data[loop.index].uv
+        if uv == Vector((0.0, 0.0)):
+            at_zero += 1
+
+    return at_zero, obj_total
+
+
+def import_seut_errors():
+    """Imports seut_errors from the add-on in this repository."""
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, repo)
+
+    return importlib.import_module('space-engineers-utilities.seut_errors')
+
+
+def create_mesh(segments: int, zero_share: float):
+    """Creates a grid with UVs, of which the given share is moved to (0, 0)."""
+
+    mesh = bpy.data.meshes.new("SEUT Benchmark")
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=segments, y_segments=segments, size=1.0, calc_uvs=True)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    uv_data = mesh.uv_layers.active.data
+    uvs = np.empty(len(uv_data) * 2, dtype=np.float32)
+    uv_data.foreach_get('uv', uvs)
+
+    # Shifted, so that only the chosen UVs are at (0, 0) and not the corner of the grid.
+    uvs += 0.001
+    rng = np.random.default_rng(0)
+    zeroed = rng.choice(len(uv_data), int(len(uv_data) * zero_share), replace=False)
+    uvs[zeroed * 2] = 0.0
+    uvs[zeroed * 2 + 1] = 0.0
+    uv_data.foreach_set('uv', uvs)
+
+    return mesh
+
+
+def measure(function, mesh) -> tuple:
+    """Returns the best time out of several runs, in ms, and the result."""
+
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        result = function(mesh)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+
+    return best * 1000, result
+
+
+def main():
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    segments = int(args[0]) if len(args) > 0 else 500
+    zero_share = float(args[1]) if len(args) > 1 else 0.01
+
+    count_zero_uvs = import_seut_errors().count_zero_uvs
+    mesh = create_mesh(segments, zero_share)
+
+    before, expected = measure(count_zero_uvs_reference, mesh)
+    after, result = measure(count_zero_uvs, mesh)
+
+    print(f"Loops: {len(mesh.loops)}, at (0, 0): {expected[0]}")
+    print(f"Before: {before:.1f} ms, after: {after:.1f} ms, speedup: {before / after:.1f}x")
+
+    if result != expected:
+        print(f"Results differ: {result} instead of {expected}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
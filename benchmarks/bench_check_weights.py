@@ -0,0 +1,141 @@
+"""Benchmarks the weight painting check of the export on a mesh with 250k vertices and compares it against the previous implementation.
+
+Runs inside Blender:
+
+    blender --background --factory-startup --python benchmarks/bench_check_weights.py -- [grid segments] [share of problematic vertices]
+
+The grid defaults to 500 segments per side, about 250k vertices, spread over four bone groups. The given share of vertices,
+1% by default, is split into ungrouped and weightless vertices.
+"""
+
+import os
+import sys
+import time
+import importlib
+
+import bpy
+import bmesh
+import numpy as np
+
+
+GROUPS = 4
+
+
+def check_weights_reference(context, obj):
+    """The loop check_weights used before it was vectorized, without the report."""
+
+    grp_ungrouped = "Problematic - Ungrouped"
+    grp_weightless = "Problematic - Unweighted"
+    for v in obj.data.vertices:
+        
+        if len(v.groups) == 0 or len(v.groups) == 1 and obj.vertex_groups[v.groups[0].group].name in [grp_ungrouped, grp_weightless]:
+            if grp_ungrouped in obj.vertex_groups:
+                grp = obj.vertex_groups[grp_ungrouped]
+            else:
+                grp = obj.vertex_groups.new(name=grp_ungrouped)
+            grp.add([v.index], 0.0, 'ADD')
+        else:
+            if any(obj.vertex_groups[x.group].name == grp_ungrouped for x in v.groups):
+                obj.vertex_groups[grp_ungrouped].remove([v.index])
+
+        total_weight = 0
+        for g in v.groups:
+            total_weight += g.weight
+        
+        if total_weight == 0:
+            if grp_weightless in obj.vertex_groups:
+                grp = obj.vertex_groups[grp_weightless]
+            else:
+                grp = obj.vertex_groups.new(name=grp_weightless)
+            grp.add([v.index], 0.0, 'ADD')
+        else:
+            if any(obj.vertex_groups[x.group].name == grp_weightless for x in v.groups):
+                obj.vertex_groups[grp_weightless].remove([v.index])
+
+    if grp_ungrouped in obj.vertex_groups and len([v for v in obj.data.vertices if obj.vertex_groups[grp_ungrouped].index in [vg.group for vg in v.groups]]) == 0:
+        obj.vertex_groups.remove(obj.vertex_groups[grp_ungrouped])
+    if grp_weightless in obj.vertex_groups and len([v for v in obj.data.vertices if obj.vertex_groups[grp_weightless].index in [vg.group for vg in v.groups]]) == 0:
+        obj.vertex_groups.remove(obj.vertex_groups[grp_weightless])
+
+
+def import_seut_errors():
+    """Imports seut_errors from the add-on in this repository."""
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, repo)
+
+    return importlib.import_module('space-engineers-utilities.seut_errors')
+
+
+def create_object(segments: int, problem_share: float):
+    """Creates a weight painted grid, of which the given share of vertices is either ungrouped or weightless."""
+
+    mesh = bpy.data.meshes.new("SEUT Benchmark")
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=segments, y_segments=segments, size=1.0)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    obj = bpy.data.objects.new("SEUT Benchmark", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+
+    count = len(mesh.vertices)
+    rng = np.random.default_rng(0)
+    problematic = rng.choice(count, int(count * problem_share), replace=False)
+    ungrouped = set(problematic[:len(problematic) // 2].tolist())
+    weightless = set(problematic[len(problematic) // 2:].tolist())
+
+    for i in range(GROUPS):
+        grp = obj.vertex_groups.new(name=f"Bone {i}")
+        vertices = [v for v in range(i, count, GROUPS) if v not in ungrouped]
+        grp.add([v for v in vertices if v not in weightless], 1.0, 'REPLACE')
+        grp.add([v for v in vertices if v in weightless], 0.0, 'REPLACE')
+
+    return obj
+
+
+def get_problematic(obj) -> dict:
+    """Returns the vertices in each of the problematic groups."""
+
+    result = {}
+    for grp in obj.vertex_groups:
+        if grp.name.startswith("Problematic"):
+            result[grp.name] = sorted(v.index for v in obj.data.vertices if grp.index in [g.group for g in v.groups])
+
+    return result
+
+
+def measure(function, obj) -> float:
+    """Returns the time of a single run, in ms. The check modifies the object, so it is not repeated."""
+
+    start = time.perf_counter()
+    function(bpy.context, obj)
+
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    segments = int(args[0]) if len(args) > 0 else 500
+    problem_share = float(args[1]) if len(args) > 1 else 0.01
+
+    check_weights = import_seut_errors().check_weights
+    reference = create_object(segments, problem_share)
+    obj = create_object(segments, problem_share)
+
+    before = measure(check_weights_reference, reference)
+    after = measure(check_weights, obj)
+
+    expected = get_problematic(reference)
+    result = get_problematic(obj)
+
+    print(f"Vertices: {len(obj.data.vertices)}, " + ", ".join(f"{name}: {len(v)}" for name, v in expected.items()))
+    print(f"Before: {before:.1f} ms, after: {after:.1f} ms, speedup: {before / after:.1f}x")
+
+    if result != expected:
+        print("Problematic vertex groups differ.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
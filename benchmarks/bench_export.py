@@ -0,0 +1,342 @@
+"""Benchmarks the export on synthetic SEUT scenes, with stand-ins for the external tools.
+
+Runs inside Blender, or with the bpy module:
+
+    blender --background --factory-startup --python benchmarks/bench_export.py -- [options]
+    python benchmarks/bench_export.py [options]
+
+The stand-ins for FBXImporter, the Havok filter, MWM Builder and texconv are executable scripts (see stub_tools.py),
+which only works on Linux and macOS. SEUT_TOOL_DIR is pointed at them and the tool paths of the add-on preferences are
+set without saving the preferences. Everything is created in a temporary directory that is removed afterwards.
+
+Each run starts from an empty mod directory, so nothing is skipped by the incremental export. The median of all runs
+is written to --output. Passing a previous output as --baseline compares against it, and the script exits with 1 if
+the total time of a benchmark got slower by more than --tolerance.
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib
+import statistics
+import subprocess
+
+import bpy
+import bmesh
+import addon_utils
+
+
+ADDON = 'space-engineers-utilities'
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(BENCH_DIR)
+
+
+def parse_args() -> argparse.Namespace:
+    # Blender passes the arguments of the script after '--', the bpy module passes them directly.
+    if '--' in sys.argv:
+        args = sys.argv[sys.argv.index('--') + 1:]
+    elif bpy.app.background and bpy.app.binary_path == "":
+        args = sys.argv[1:]
+    else:
+        args = []
+
+    parser = argparse.ArgumentParser(prog="bench_export.py", description="Benchmarks the SEUT export on synthetic scenes.")
+    parser.add_argument('--objects', type=int, default=50, help="Objects in the Main collection of each scene")
+    parser.add_argument('--segments', type=int, default=32, help="Segments of each object's UV sphere, LODs use fewer")
+    parser.add_argument('--lods', type=int, default=3, choices=range(0, 4), help="LOD collections that contain objects")
+    parser.add_argument('--bs', type=int, default=3, choices=range(0, 4), help="Build stage collections that contain objects")
+    parser.add_argument('--materials', type=int, default=8, help="Local materials with CM, NG and ADD textures")
+    parser.add_argument('--texture-size', type=int, default=256, help="Resolution of the generated textures")
+    parser.add_argument('--subparts', type=int, default=2, help="Subpart scenes, each referenced by an empty in the main scene")
+    parser.add_argument('--runs', type=int, default=3, help="Runs per benchmark, the median is reported")
+    parser.add_argument('--stub-delay', type=float, default=0.0, help="Seconds each call of a stub tool takes")
+    parser.add_argument('--benchmarks', nargs='+', default=['export', 'export_all_scenes'], choices=['export', 'export_all_scenes'])
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results', 'bench_export.json'), help="File the results are written to")
+    parser.add_argument('--baseline', default=None, help="Results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Allowed slowdown against the baseline, as a fraction")
+
+    return parser.parse_args(args)
+
+
+def enable_addon():
+    """Enables the add-on from this repository instead of an installed copy."""
+
+    sys.path.insert(0, REPO)
+    addon_utils.enable(ADDON, default_set=False, handle_error=None)
+
+    if ADDON not in bpy.context.preferences.addons:
+        raise RuntimeError(f"Add-on '{ADDON}' could not be enabled from '{REPO}'.")
+
+    return importlib.import_module(ADDON)
+
+
+def setup_environment(workspace: str, args: argparse.Namespace) -> dict:
+    """Creates the mod and asset directories, installs the stub tools and points the add-on at them."""
+
+    sys.path.insert(0, BENCH_DIR)
+    import stub_tools
+
+    dirs = {
+        'mod': os.path.join(workspace, 'Mod'),
+        'assets': os.path.join(workspace, 'Assets'),
+        'tools': os.path.join(workspace, 'Tools'),
+    }
+    os.makedirs(os.path.join(dirs['mod'], 'Data'), exist_ok=True)
+    os.makedirs(os.path.join(dirs['assets'], 'Materials'), exist_ok=True)
+
+    tools = stub_tools.install(dirs['tools'])
+    os.environ['SEUT_TOOL_DIR'] = dirs['tools']
+    os.environ['SEUT_STUB_DELAY'] = str(args.stub_delay)
+
+    # Assigned as ID properties, so the update functions neither verify the paths, register asset libraries nor save the preferences.
+    preferences = bpy.context.preferences.addons[ADDON].preferences
+    preferences['asset_path'] = dirs['assets']
+    preferences['mwmb_path'] = tools['MwmBuilder.exe']
+    preferences['havok_path'] = tools['hctStandAloneFilterManager.exe']
+    preferences['profile_export'] = True
+
+    return dirs
+
+
+def get_context_override(scene) -> dict:
+    """Returns a context with a 3D viewport, which the export operators require, showing the given scene."""
+
+    window = bpy.context.window_manager.windows[0]
+    window.scene = scene
+    area = window.screen.areas[0]
+    area.type = 'VIEW_3D'
+
+    return {'window': window, 'screen': window.screen, 'area': area, 'region': area.regions[-1], 'scene': scene}
+
+
+def create_materials(dirs: dict, args: argparse.Namespace) -> list:
+    """Creates local materials whose textures are within the mod's Textures folder, so they are converted during export."""
+
+    texture_dir = os.path.join(dirs['mod'], 'Textures', 'Models', 'Bench')
+    os.makedirs(texture_dir, exist_ok=True)
+
+    materials = []
+    for i in range(args.materials):
+        mat = bpy.data.materials.new(f"Bench_Material_{i}")
+        mat.use_nodes = True
+        nodes = mat.node_tree.nodes
+
+        for offset, tex_type in enumerate(['CM', 'NG', 'ADD']):
+            image = bpy.data.images.new(f"Bench_{i}_{tex_type.lower()}", args.texture_size, args.texture_size)
+            image.generated_color = ((i * 0.1) % 1.0, 0.2 * offset, 0.5, 1.0)
+            image.filepath_raw = os.path.join(texture_dir, f"Bench_{i}_{tex_type.lower()}.png")
+            image.file_format = 'PNG'
+            image.save()
+
+            node = nodes.new('ShaderNodeTexImage')
+            node.name = tex_type
+            node.label = tex_type
+            node.image = image
+
+        materials.append(mat)
+
+    return materials
+
+
+def create_mesh_object(name: str, segments: int, collection, material=None, parent=None):
+    """Creates a UV sphere with UVs and the given material."""
+
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_uvsphere(bm, u_segments=max(segments, 3), v_segments=max(segments // 2, 3), radius=0.5, calc_uvs=True)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    if material is not None:
+        mesh.materials.append(material)
+
+    obj = bpy.data.objects.new(name, mesh)
+    collection.objects.link(obj)
+    obj.parent = parent
+
+    return obj
+
+
+def create_scene(seut, name: str, scene_type: str, dirs: dict, args: argparse.Namespace, materials: list, subparts: tuple = ()):
+    """Creates a SEUT scene with objects in its Main, LOD, BS and Collision collections."""
+
+    scene = bpy.data.scenes.new(name)
+
+    with bpy.context.temp_override(**get_context_override(scene)):
+        scene.seut.sceneType = scene_type
+        scene.seut.subtypeId = name
+        bpy.ops.scene.recreate_collections()
+        scene.seut.mod_path = dirs['mod']
+
+    collections = {key: cols or [] for key, cols in seut.seut_collections.get_collections(scene).items()}
+    material = lambda i: materials[i % len(materials)] if materials != [] else None
+
+    # Only a single object may be unparented.
+    root = create_mesh_object(f"{name}_Root", args.segments, collections['main'][0], material(0))
+    for i in range(1, args.objects):
+        obj = create_mesh_object(f"{name}_{i}", args.segments, collections['main'][0], material(i), root)
+        obj.location = (i % 10, i // 10, 0)
+
+    for subpart in subparts:
+        empty = bpy.data.objects.new(f"subpart_{subpart.name}", None)
+        collections['main'][0].objects.link(empty)
+        empty.parent = root
+        # Assigned as ID properties, the update function requires the empty to be active.
+        empty.seut['linkedScene'] = subpart
+        empty['file'] = subpart.seut.subtypeId
+
+    main_lods = [c for c in collections['lod'] if c.seut.ref_col == collections['main'][0]]
+    for index, col in enumerate(main_lods[:args.lods]):
+        lod_root = create_mesh_object(f"{name}_LOD{index + 1}_Root", args.segments // (2 ** (index + 1)), col, material(0))
+        for i in range(1, args.objects):
+            create_mesh_object(f"{name}_LOD{index + 1}_{i}", args.segments // (2 ** (index + 1)), col, material(i), lod_root)
+
+    for index, col in enumerate(collections['bs'][:args.bs]):
+        bs_root = create_mesh_object(f"{name}_BS{index + 1}_Root", args.segments, col, material(0))
+        for i in range(1, max(args.objects // 2, 1)):
+            create_mesh_object(f"{name}_BS{index + 1}_{i}", args.segments, col, material(i), bs_root)
+
+    if collections['hkt'] != []:
+        collision = create_mesh_object(f"{name}_Collision", 8, collections['hkt'][0])
+        with bpy.context.temp_override(**get_context_override(scene), object=collision, active_object=collision, selected_objects=[collision]):
+            bpy.ops.rigidbody.object_add()
+            collision.rigid_body.collision_shape = 'CONVEX_HULL'
+
+    return scene
+
+
+def reset_outputs(seut, dirs: dict):
+    """Removes everything the previous export wrote, so the next one does not skip anything."""
+
+    for name in ['Models', 'Data']:
+        shutil.rmtree(os.path.join(dirs['mod'], name), ignore_errors=True)
+    os.makedirs(os.path.join(dirs['mod'], 'Data'), exist_ok=True)
+
+    for dds in glob.glob(os.path.join(dirs['mod'], 'Textures', '**', '*.dds'), recursive=True):
+        os.remove(dds)
+
+    shutil.rmtree(os.path.join(dirs['assets'], 'Cache'), ignore_errors=True)
+    seut.utils.seut_texture_cache.texture_caches.clear()
+
+
+def run_benchmark(seut, name: str, scene, dirs: dict, args: argparse.Namespace) -> dict:
+    """Runs one of the export operators several times. Returns the median total and per-stage wall times, in seconds."""
+
+    totals = []
+    stages = {}
+
+    for run in range(args.runs):
+        reset_outputs(seut, dirs)
+
+        with bpy.context.temp_override(**get_context_override(scene)):
+            start = time.perf_counter()
+            if name == 'export':
+                result = bpy.ops.scene.export()
+            else:
+                result = bpy.ops.scene.export_all_scenes()
+            totals.append(time.perf_counter() - start)
+
+        if result != {'FINISHED'}:
+            raise RuntimeError(f"Benchmark '{name}' failed in run {run + 1}: {result}. See the output above for the reported errors.")
+
+        mwms = glob.glob(os.path.join(dirs['mod'], 'Models', '**', '*.mwm'), recursive=True)
+        if mwms == []:
+            raise RuntimeError(f"Benchmark '{name}' did not produce any MWM files.")
+
+        for stage in seut.utils.seut_profiler.get_last_summary():
+            stages.setdefault(stage['stage'], []).append(stage['wall'])
+
+        print(f"{name}, run {run + 1}: {totals[-1]:.2f}s")
+
+    return {
+        'total': statistics.median(totals),
+        'stages': {stage: statistics.median(times) for stage, times in stages.items()},
+    }
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints the change of every time against the baseline. Returns False if a total got slower than allowed."""
+
+    passed = True
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            continue
+        before = baseline['benchmarks'][name]
+
+        change = result['total'] / before['total'] - 1 if before['total'] > 0 else 0
+        print(f"{name}: {before['total']:.2f}s -> {result['total']:.2f}s ({change:+.1%})")
+        for stage, wall in result['stages'].items():
+            if stage in before['stages'] and before['stages'][stage] > 0:
+                print(f"    {stage}: {before['stages'][stage]:.3f}s -> {wall:.3f}s ({wall / before['stages'][stage] - 1:+.1%})")
+
+        if change > tolerance:
+            print(f"{name} is {change:.1%} slower than the baseline ({baseline['commit']}), more than the allowed {tolerance:.0%}.")
+            passed = False
+
+    if baseline['config'] != results['config']:
+        print("The baseline was recorded with a different configuration, the times may not be comparable.")
+
+    return passed
+
+
+def main():
+    args = parse_args()
+
+    if os.name == 'nt':
+        print("The stub tools are executable scripts, which Windows cannot run in place of the tools' EXE files.")
+        sys.exit(1)
+
+    seut = enable_addon()
+    workspace = tempfile.mkdtemp(prefix='seut_bench_')
+
+    try:
+        dirs = setup_environment(workspace, args)
+        materials = create_materials(dirs, args)
+
+        subparts = [create_scene(seut, f"BenchSubpart{i}", 'subpart', dirs, args, materials) for i in range(args.subparts)]
+        main_scene = create_scene(seut, "Bench", 'mainScene', dirs, args, materials, subparts)
+
+        # The export requires a saved BLEND file.
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.join(workspace, 'bench.blend'))
+        main_scene = bpy.data.scenes["Bench"]
+
+        results = {
+            'commit': get_commit(),
+            'blender': bpy.app.version_string,
+            'platform': platform.platform(),
+            'config': {k: v for k, v in vars(args).items() if k not in ['output', 'baseline', 'tolerance', 'benchmarks']},
+            'benchmarks': {},
+        }
+        for name in args.benchmarks:
+            results['benchmarks'][name] = run_benchmark(seut, name, main_scene, dirs, args)
+
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to '{args.output}'.")
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmarks format_entry on SBC files and checks its output against the previous implementation.
+
+Runs inside Blender, as the add-on's modules depend on bpy:
+
+    blender --background --factory-startup --python benchmarks/bench_format_entry.py -- [SBC files or directories]
+
+Without arguments, the vanilla CubeBlocks definitions are used, found via the SE_GAME_PATH environment variable.
+Next to each file, all files are also formatted as a single entry, as export_sbc does for large definition files.
+"""
+
+import os
+import sys
+import glob
+import time
+import importlib
+
+
+REPEATS = 5
+
+
+def format_entry_reference(lines: str, depth: int = 0) -> str:
+    """The implementation of format_entry before it was made linear-time, to compare output and timings against."""
+
+    indent = "\t"
+    lines_arr = lines.splitlines()
+    entry = ""
+
+    for line in lines_arr:
+
+        remove = False
+        line = indent * depth + line.strip()
+
+        start = line.find('<')
+        end = line.rfind('>')
+
+        if line.count('<') <= 0 and line.count('>') <= 0:
+            if line.strip() == "":
+                remove = True
+        elif line[start:start+4] == '<!--' and line[end-2:end+1] == '-->':
+            pass
+        elif line[end-1:end+1] == '/>':
+            pass
+        elif line.find('<!--') != -1 and line.find('/>') != -1:
+            pass
+        elif line[start:start+2] == '<?' and line[end-1:end+1] == '?>':
+            pass
+        elif line.count('<') >= 2 and line.count('>') >= 2 and line.count('</') == 1:
+            pass
+        elif line[start:start+2] == '</':
+            depth -= 1
+            line = line[1:]
+        else:
+            depth += 1
+
+        if line.strip() != lines_arr[-1].strip():
+            line = line + "\n"
+
+        if not remove:
+            entry += line
+
+    return entry
+
+
+def import_xml_utils():
+    """Imports seut_xml_utils from the add-on in this repository."""
+
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, repo)
+
+    return importlib.import_module('space-engineers-utilities.utils.seut_xml_utils')
+
+
+def get_files(args: list) -> list:
+
+    if args == []:
+        game_path = os.environ.get('SE_GAME_PATH')
+        if game_path is None:
+            print("Pass SBC files or set SE_GAME_PATH to the Space Engineers installation directory.")
+            sys.exit(1)
+        args = [os.path.join(game_path, 'Content', 'Data', 'CubeBlocks')]
+
+    files = []
+    for arg in args:
+        if os.path.isdir(arg):
+            files += sorted(glob.glob(os.path.join(arg, '**', '*.sbc'), recursive=True))
+        else:
+            files.append(arg)
+
+    return files
+
+
+def measure(function, text: str) -> tuple:
+    """Returns the best time out of several runs, in ms, and the output."""
+
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        output = function(text)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+
+    return best * 1000, output
+
+
+def main():
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    format_entry = import_xml_utils().format_entry
+
+    inputs = []
+    for file in get_files(args):
+        with open(file, encoding='utf-8-sig') as f:
+            inputs.append((os.path.basename(file), f.read()))
+
+    if inputs == []:
+        print("No SBC files found.")
+        sys.exit(1)
+
+    inputs.append((f"all {len(inputs)} files", "\n".join(text for name, text in inputs)))
+
+    print(f"{'Input':<40} {'Lines':>8} {'Before (ms)':>12} {'After (ms)':>12} {'Speedup':>8}  Identical")
+
+    mismatches = 0
+    for name, text in inputs:
+        before, expected = measure(format_entry_reference, text)
+        after, output = measure(format_entry, text)
+
+        identical = output == expected
+        if not identical:
+            mismatches += 1
+
+        print(f"{name[:40]:<40} {text.count(chr(10)) + 1:>8} {before:>12.2f} {after:>12.2f} {before / after:>7.2f}x  {'yes' if identical else 'NO'}")
+
+    if mismatches > 0:
+        print(f"{mismatches} inputs were formatted differently.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
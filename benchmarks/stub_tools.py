@@ -0,0 +1,76 @@
+"""Stand-ins for the external tools of the export, used by bench_export.py.
+
+Each stub is installed as an executable script with the file name of the tool it replaces. It writes output files
+of a plausible size where the real tool would, so that the export runs through all of its steps. The time each call
+takes can be set through the SEUT_STUB_DELAY environment variable, in seconds.
+"""
+
+import os
+import sys
+import glob
+import time
+import stat
+import shutil
+
+
+TOOLS = {
+    'FBXImporter.exe': 'fbximporter',
+    'hctStandAloneFilterManager.exe': 'havok',
+    'MwmBuilder.exe': 'mwmbuilder',
+    'texconv.exe': 'texconv',
+}
+
+
+def install(target_dir: str) -> dict:
+    """Creates an executable stub for every tool in the directory. Returns the paths of the stubs by file name."""
+
+    os.makedirs(target_dir, exist_ok=True)
+
+    paths = {}
+    for file_name, tool in TOOLS.items():
+        path = os.path.join(target_dir, file_name)
+        with open(path, 'w') as f:
+            f.write(f"#!{sys.executable}\n")
+            f.write("import sys\n")
+            f.write(f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n")
+            f.write("import stub_tools\n")
+            f.write(f"sys.exit(stub_tools.main({tool!r}, sys.argv[1:]))\n")
+
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        paths[file_name] = path
+
+    return paths
+
+
+def main(tool: str, args: list) -> int:
+    delay = float(os.environ.get('SEUT_STUB_DELAY', 0))
+    if delay > 0:
+        time.sleep(delay)
+
+    if tool == 'fbximporter':
+        # FBXImporter.exe <source> <target>
+        shutil.copyfile(args[0], args[1])
+
+    elif tool == 'havok':
+        # hctStandAloneFilterManager.exe -t -s <options> -p <target> <source>
+        target = args[args.index('-p') + 1]
+        if os.path.abspath(target) != os.path.abspath(args[-1]):
+            shutil.copyfile(args[-1], target)
+
+    elif tool == 'mwmbuilder':
+        # MwmBuilder.exe /f /s:<source dir> /m:<pattern> /o:<output dir> /x:<materials dir>
+        options = {a[1]: a[3:] for a in args if a.startswith('/') and len(a) > 2 and a[2] == ':'}
+        for fbx in glob.glob(os.path.join(options['s'], options['m'])):
+            if fbx.endswith('.hkt.fbx'):
+                continue
+            print(f"Processing {fbx}")
+            shutil.copyfile(fbx, os.path.join(options['o'], os.path.splitext(os.path.basename(fbx))[0] + '.mwm'))
+
+    elif tool == 'texconv':
+        # texconv.exe <source> [options] -o <output dir>, where -ft sets the output format.
+        output_dir = args[args.index('-o') + 1]
+        extension = args[args.index('-ft') + 1].lower() if '-ft' in args else 'dds'
+        for source in [a for a in args if os.path.isfile(a)]:
+            shutil.copyfile(source, os.path.join(output_dir, os.path.splitext(os.path.basename(source))[0] + '.' + extension))
+
+    return 0
@@ -79,6 +79,7 @@ from .planets.seut_planet_operators             import (SEUT_OT_Planet_RecreateS
                                                         SEUT_OT_Planet_OreMappings_Remove,
                                                         SEUT_OT_Planet_ExportAll,
                                                         SEUT_OT_Planet_Bake,
+                                                        SEUT_OT_Planet_ValidateMaps,
                                                         SEUT_OT_Planet_ImportSBC)
 from .planets.seut_planet_ui                    import (SEUT_UL_PlanetDistributionRulesLayers,
                                                         SEUT_UL_PlanetDistributionRules,
@@ -160,6 +161,7 @@ from .seut_mountpoints                  import SEUT_OT_AddMountpointArea
 from .seut_collections                  import SEUT_Collection
 from .seut_collections                  import SEUT_OT_RecreateCollections
 from .seut_collections                  import SEUT_OT_CreateCollection
+from .seut_collections                  import collection_registry_handler, collection_registry_depsgraph_handler
 from .seut_ot_simple_navigation         import SEUT_OT_SimpleNavigation
 from .seut_icon_render                  import SEUT_OT_IconRenderPreview
 from .seut_icon_render                  import SEUT_OT_CopyRenderOptions
@@ -170,7 +172,7 @@ from .seut_text                         import SEUT_RepositoryProperty
 from .seut_text                         import SEUT_IssueProperty
 from .seut_text                         import SEUT_Text
 from .seut_utils                        import SEUT_OT_UpdateSubpartInstances, get_seut_blend_data
-from .seut_errors                       import init_logging
+from .seut_errors                       import init_logging, end_logging
 
 
 classes = (
@@ -254,6 +256,7 @@ classes = (
     SEUT_OT_Planet_OreMappings_Remove,
     SEUT_OT_Planet_ExportAll,
     SEUT_OT_Planet_Bake,
+    SEUT_OT_Planet_ValidateMaps,
     SEUT_OT_Planet_ImportSBC,
     SEUT_UL_PlanetDistributionRulesLayers,
     SEUT_UL_PlanetDistributionRules,
@@ -326,6 +329,10 @@ def register():
     bpy.types.Text.seut = PointerProperty(type=SEUT_Text)
     
     bpy.app.handlers.load_post.append(load_handler)
+    bpy.app.handlers.load_post.append(collection_registry_handler)
+    bpy.app.handlers.undo_post.append(collection_registry_handler)
+    bpy.app.handlers.redo_post.append(collection_registry_handler)
+    bpy.app.handlers.depsgraph_update_post.append(collection_registry_depsgraph_handler)
 
     from .seut_bau import bau_register
     bpy.app.timers.register(bau_register)
@@ -350,8 +357,13 @@ def unregister():
     del bpy.types.Text.seut
 
     bpy.app.handlers.load_post.remove(load_handler)
+    bpy.app.handlers.load_post.remove(collection_registry_handler)
+    bpy.app.handlers.undo_post.remove(collection_registry_handler)
+    bpy.app.handlers.redo_post.remove(collection_registry_handler)
+    bpy.app.handlers.depsgraph_update_post.remove(collection_registry_depsgraph_handler)
 
     unload_icons()
+    end_logging()
 
 
 def menu_func(self, context):
@@ -125,17 +125,13 @@ def export_animation_xml(self, context: bpy.types.Context):
                     elif kf.easing != 'AUTO':
                         add_attrib(anim, 'easing', kf.easing)
 
-    temp_string = ET.tostring(animations, 'utf-8')
-    xml_string = xml.dom.minidom.parseString(temp_string)
-    xml_formatted = xml_string.toprettyxml()
+    xml_formatted = serialize_xml(animations)
 
     filename = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
     target_file = os.path.join(path_data, f"{filename}.xml")
-    if not os.path.exists(os.path.join(path_data)):
-        os.makedirs(os.path.join(path_data))
 
-    exported_xml = open(target_file, "w")
-    exported_xml.write(xml_formatted)
+    if write_xml_file(self, context, target_file, xml_formatted) is None:
+        return {'CANCELLED'}
 
     update_main_info(filename, path_data)
 
@@ -4,14 +4,14 @@ import tempfile
 
 from ..seut_export_utils        import ExportSettings
 from ...utils.called_tool_type  import ToolType
-from ...utils.seut_xml_utils    import update_subelement, format_entry
+from ...utils.seut_xml_utils    import SBCPatch, update_subelement, format_entry
 from ...seut_errors             import seut_report
 
 
 def convert_fbx_to_fbxi_hkt(context, settings: ExportSettings, source: str, target: str):
-    """Converts the FBX created by export to FBXImporter FBX for HKT creation."""
+    """Converts the FBX created by export to FBXImporter FBX for HKT creation. Returns False if FBXImporter failed."""
 
-    settings.callTool(
+    return settings.callTool(
         context,
         [settings.fbximporter, source, target],
         ToolType(1),
@@ -19,10 +19,11 @@ def convert_fbx_to_fbxi_hkt(context, settings: ExportSettings, source: str, targ
     )
 
 
-def convert_fbxi_hkt_to_hkt(self, context, settings: ExportSettings, source: str, target: str, adjustments: dict = None):
-    """Converts the HKT created by FBXImporter to the final HKT."""
-    
-    havok_options = get_hko_content(adjustments)
+def convert_fbxi_hkt_to_hkt(self, context, settings: ExportSettings, source: str, target: str, adjustments: dict = None, havok_options: str = None):
+    """Converts the HKT created by FBXImporter to the final HKT. Returns False if Havok failed."""
+
+    if havok_options is None:
+        havok_options = get_hko_content(adjustments)
 
     hko = tempfile.NamedTemporaryFile(mode='wt', prefix='space_engineers_', suffix=".hko", delete=False) # wt mode is write plus text mode.	
     try:
@@ -39,13 +40,12 @@ def convert_fbxi_hkt_to_hkt(self, context, settings: ExportSettings, source: str
             successfulExitCodes=[0,1]
         )
 
-    except Exception as e:
-        print(e)
-
     finally:
-        if context.scene.seut.export_deleteLooseFiles:
+        if settings.delete_loose_files:
             os.remove(hko.name)
 
+    return result
+
 
 def get_hko_content(adjustments: dict = None) -> str:
     """Returns the content of the default HKO file."""
@@ -58,8 +58,9 @@ def get_hko_content(adjustments: dict = None) -> str:
         hko = file.read()
 
     if adjustments is not None:
+        patch = SBCPatch(hko)
         for elem, value in adjustments.items():
-            hko = update_subelement(hko, 'hkparam', value, elem)
-        hko = format_entry(hko)
+            update_subelement(patch, 'hkparam', value, elem)
+        hko = format_entry(patch.apply())
     
     return hko
\ No newline at end of file
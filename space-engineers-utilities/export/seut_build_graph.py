@@ -0,0 +1,359 @@
+import bpy
+import os
+import json
+import hashlib
+
+from array  import array
+
+from ..seut_collections     import get_collections, get_rev_ref_cols
+from ..seut_errors          import check_collection, get_abs_path
+from ..seut_utils           import get_preferences, get_addon
+
+
+MANIFEST_VERSION = 1
+
+# Attribute data type: (foreach_get property, values per element, array typecode)
+attribute_layouts = {
+    'FLOAT': ('value', 1, 'f'),
+    'INT': ('value', 1, 'i'),
+    'BOOLEAN': ('value', 1, 'b'),
+    'INT8': ('value', 1, 'b'),
+    'FLOAT2': ('vector', 2, 'f'),
+    'INT32_2D': ('value', 2, 'i'),
+    'FLOAT_VECTOR': ('vector', 3, 'f'),
+    'FLOAT_COLOR': ('color', 4, 'f'),
+    'BYTE_COLOR': ('color', 4, 'f'),
+    'QUATERNION': ('value', 4, 'f'),
+    'FLOAT4X4': ('value', 16, 'f'),
+}
+
+
+class BuildManifest:
+    """Keeps track of the inputs the exported files of a scene were built from, so that files whose inputs did not change are not exported again.
+    The manifest is stored next to the exported files to survive restarts of Blender."""
+
+    def __init__(self, path: str, subtype_id: str):
+        self.path = path
+        self.file = os.path.join(path, f"{subtype_id}.seut-build.json")
+        self.entries = {}
+        self.digests = {}
+        self.pending = {}
+
+        self.load()
+
+
+    def load(self):
+        """Loads the manifest from disk, if there is a valid one."""
+
+        if not os.path.isfile(self.file):
+            return
+
+        try:
+            with open(self.file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('entries', {})
+
+
+    def is_current(self, key: str) -> bool:
+        """Returns True if the files of the key were built from the current inputs and still exist."""
+
+        if key not in self.digests or key not in self.entries:
+            return False
+
+        entry = self.entries[key]
+        if entry['digest'] != self.digests[key]:
+            return False
+
+        for artifact in entry['artifacts']:
+            if not os.path.isfile(os.path.join(self.path, artifact)):
+                return False
+
+        return True
+
+
+    def record(self, key: str, artifacts: list):
+        """Records that the files of the key are being built from the current inputs.
+        Only takes effect once committed, which only happens if all steps of the export job succeeded. Until then, the key's previous entry is dropped."""
+
+        if key in self.digests:
+            self.pending[key] = [os.path.basename(a) for a in artifacts]
+            self.entries.pop(key, None)
+
+
+    def commit(self):
+        """Adds all recorded entries to the manifest and saves it. Runs as the last step of the export job,
+        so it is skipped if any of the tools failed."""
+
+        for key, artifacts in self.pending.items():
+            self.entries[key] = {'digest': self.digests[key], 'artifacts': artifacts}
+
+        self.pending = {}
+        self.save()
+
+
+    def save(self):
+        """Writes the manifest to disk."""
+
+        data = {
+            'version': MANIFEST_VERSION,
+            'entries': self.entries
+        }
+
+        try:
+            with open(self.file, 'w') as f:
+                json.dump(data, f, indent=1)
+        except OSError as e:
+            print(f"SEUT: Could not save build manifest '{self.file}': {e}")
+
+
+def create_build_manifests(context, targets: list):
+    """Creates the build manifests of all export targets of the current scene, with the digests of all their inputs.
+    Scene types that do not support incremental export get no manifest."""
+
+    scene = context.scene
+
+    # Character exports re-import their own FBX and depend on armatures and animations.
+    if scene.seut.sceneType in ['character', 'character_animation']:
+        return
+
+    for target in targets:
+        target.manifest = BuildManifest(target.get_abs_path(), target.subtype_id)
+
+    hash_build_inputs(context, targets)
+
+
+def hash_build_inputs(context, targets: list):
+    """Hashes the inputs of all files of the scene's export: one digest per collection, plus one for the MWM that combines all of them.
+    The collections' contents are hashed once and combined with the settings of each target."""
+
+    from .seut_export_utils import get_col_filename
+
+    scene = context.scene
+    collections = get_collections(scene)
+    depsgraph = context.evaluated_depsgraph_get()
+
+    materials_hash = hashlib.sha1()
+
+    # Every XML contains entries for all materials.
+    for mat in bpy.data.materials:
+        hash_material(materials_hash, mat)
+
+    settings_digests = {}
+    mwm_hashes = {}
+    for target in targets:
+        settings_digests[target] = hash_export_settings(scene, target, materials_hash.hexdigest())
+        mwm_hashes[target] = hashlib.sha1(settings_digests[target].encode())
+
+    for col_type in ['main', 'bs', 'lod', 'hkt']:
+        if col_type not in collections or collections[col_type] is None:
+            continue
+
+        for col in collections[col_type]:
+            if check_collection(None, context, scene, col, True) != {'CONTINUE'}:
+                continue
+
+            if col_type == 'hkt':
+                content_digest = hash_hkt_collection(depsgraph, col)
+            else:
+                content_digest = hash_collection(depsgraph, collections, col)
+
+            for target in targets:
+                key = get_col_filename(col, target)
+                if col_type == 'hkt':
+                    key += ".hkt"
+
+                digest = hashlib.sha1(f"{settings_digests[target]};{content_digest}".encode()).hexdigest()
+                target.manifest.digests[key] = digest
+                mwm_hashes[target].update(f"{key}={digest};".encode())
+
+    for target in targets:
+        target.manifest.digests['mwm'] = mwm_hashes[target].hexdigest()
+
+
+def hash_export_settings(scene, target, materials_digest: str) -> str:
+    """Hashes everything outside of a collection that affects its exported files when exporting to the given target."""
+
+    preferences = get_preferences()
+    bl_info = get_addon().bl_info
+
+    h = hashlib.sha1(materials_digest.encode())
+    h.update(f"{bl_info['version']}-{bl_info['dev_version']};".encode())
+    h.update(f"{preferences.asset_path};{preferences.mwmb_path};{preferences.havok_path};".encode())
+    h.update(f"{target.grid_scale};{target.subtype_id};{target.rescale_factor!r};{target.export_path};".encode())
+
+    for prop in ['sceneType', 'gridScale', 'export_largeGrid', 'export_smallGrid', 'export_medium_grid', 'export_sbc_type', 'mod_path']:
+        h.update(f"{prop}={getattr(scene.seut, prop)!r};".encode())
+
+    return h.hexdigest()
+
+
+def hash_material(h, mat):
+    """Adds a material, its SEUT properties and the textures it uses to the hash."""
+
+    h.update(f"mat={mat.name};{mat.users};{mat.use_fake_user};".encode())
+    if mat.library is not None:
+        h.update(f"{mat.library.filepath};".encode())
+    if mat.asset_data is not None:
+        hash_rna(h, mat.asset_data.seut)
+
+    hash_rna(h, mat.seut)
+
+    if mat.node_tree is None:
+        return
+
+    for node in mat.node_tree.nodes:
+        if node.type != 'TEX_IMAGE' or node.image is None:
+            continue
+        path = get_abs_path(node.image.filepath)
+        h.update(f"{node.name};{node.label};{node.image.filepath};".encode())
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            h.update(f"{stat.st_mtime_ns};{stat.st_size};".encode())
+
+    for link in mat.node_tree.links:
+        h.update(f"{link.from_node.name}:{link.from_node.label}>{link.to_node.name}:{link.to_socket.name};".encode())
+
+
+def hash_collection(depsgraph, collections: dict, collection) -> str:
+    """Hashes the contents the XML and FBX of a collection are exported from."""
+
+    h = hashlib.sha1()
+    hash_rna(h, collection.seut)
+
+    # Main and BS XMLs reference their LODs.
+    if collection.seut.col_type in ['main', 'bs']:
+        for col in get_rev_ref_cols(collections, collection, 'lod'):
+            h.update(f"lod={col.seut.type_index};{col.seut.lod_distance};{len(col.objects)};".encode())
+
+    for obj in sorted(collection.objects, key=lambda o: o.name):
+        hash_object(h, depsgraph, obj)
+
+    return h.hexdigest()
+
+
+def hash_hkt_collection(depsgraph, collection) -> str:
+    """Hashes the contents the HKT of a collision collection is exported from."""
+
+    h = hashlib.sha1()
+    hash_rna(h, collection.seut)
+
+    if collection.seut.hkt_file != "":
+        path = get_abs_path(collection.seut.hkt_file)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            h.update(f"{stat.st_mtime_ns};{stat.st_size};".encode())
+
+    for obj in sorted(collection.objects, key=lambda o: o.name):
+        hash_object(h, depsgraph, obj)
+        if obj.rigid_body is not None:
+            hash_rna(h, obj.rigid_body)
+
+    return h.hexdigest()
+
+
+def hash_object(h, depsgraph, obj):
+    """Adds an object, its transform, custom properties and evaluated mesh to the hash."""
+
+    h.update(f"obj={obj.name};{obj.type};{obj.parent.name if obj.parent is not None else ''};".encode())
+    h.update(repr(to_hashable(obj.matrix_world)).encode())
+
+    for key in obj.keys():
+        # The exported subpart reference and highlights are derived from the SEUT properties of the empty.
+        if key == 'file' and obj.seut.linkedScene is not None or key == 'highlight':
+            continue
+        h.update(f"{key}={to_hashable(obj[key])!r};".encode())
+
+    if obj.type == 'EMPTY':
+        h.update(f"{obj.empty_display_size};".encode())
+        if obj.seut.linkedScene is not None:
+            h.update(f"{obj.seut.linkedScene.seut.subtypeId};".encode())
+        for entry in obj.seut.highlight_objects:
+            if entry.obj is not None:
+                h.update(f"{entry.obj.name};".encode())
+
+    elif obj.type == 'MESH':
+        for slot in obj.material_slots:
+            h.update(f"slot={slot.name};".encode())
+
+        for mod in obj.modifiers:
+            hash_rna(h, mod)
+
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        try:
+            hash_mesh(h, mesh)
+        finally:
+            obj_eval.to_mesh_clear()
+
+
+def hash_mesh(h, mesh):
+    """Adds the topology and attributes of a mesh to the hash."""
+
+    h.update(f"mesh={len(mesh.vertices)};{len(mesh.loops)};{len(mesh.polygons)};".encode())
+
+    buffer = array('i', [0]) * len(mesh.loops)
+    mesh.loops.foreach_get('vertex_index', buffer)
+    h.update(buffer)
+
+    buffer = array('i', [0]) * len(mesh.polygons)
+    mesh.polygons.foreach_get('loop_total', buffer)
+    h.update(buffer)
+
+    for attribute in mesh.attributes:
+        # Internal attributes like the selection state do not affect the export.
+        if attribute.name.startswith('.') or attribute.data_type not in attribute_layouts:
+            continue
+
+        prop, size, typecode = attribute_layouts[attribute.data_type]
+        buffer = array(typecode, [0]) * (len(attribute.data) * size)
+        attribute.data.foreach_get(prop, buffer)
+
+        h.update(f"{attribute.name};{attribute.domain};{attribute.data_type};".encode())
+        h.update(buffer)
+
+    if mesh.has_custom_normals:
+        buffer = array('f', [0.0]) * (len(mesh.loops) * 3)
+        if hasattr(mesh, 'corner_normals'):
+            mesh.corner_normals.foreach_get('vector', buffer)
+        else:
+            mesh.calc_normals_split()
+            mesh.loops.foreach_get('normal', buffer)
+        h.update(buffer)
+
+
+def hash_rna(h, struct, exclude: tuple = ()):
+    """Adds all properties of a struct to the hash, except the excluded ones. Pointers are represented by their name, collections by their length."""
+
+    for prop in struct.bl_rna.properties:
+        # UI state does not affect the export.
+        if prop.identifier in ['rna_type', 'is_active'] or prop.identifier.startswith('show_') or prop.identifier in exclude:
+            continue
+
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == 'POINTER':
+            value = getattr(value, 'name', None)
+        elif prop.type == 'COLLECTION':
+            value = len(value)
+        else:
+            value = to_hashable(value)
+
+        h.update(f"{prop.identifier}={value!r};".encode())
+
+
+def to_hashable(value):
+    """Converts Blender arrays, vectors and matrices into tuples so their representation contains their values."""
+
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return value
+
+    if hasattr(value, 'to_dict'):
+        return sorted(value.to_dict().items())
+
+    try:
+        return tuple(to_hashable(v) for v in value)
+    except TypeError:
+        return str(value)
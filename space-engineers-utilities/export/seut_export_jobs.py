@@ -0,0 +1,362 @@
+import os
+import threading
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.seut_tool_utils    import kill_process
+from ..utils.seut_profiler      import profile_stage
+from ..seut_errors              import seut_report
+
+
+job_queue = None
+job_runner = None
+
+
+class ExportJob:
+    """The external tool steps (HKT conversion, MWM compilation) of exporting one scene at one grid size.
+    Steps do not access Blender data, which allows them to run outside of the main thread."""
+
+    def __init__(self, scene_name: str, path: str, subtype_id: str):
+        self.scene_name = scene_name
+        self.name = f"{scene_name}: {subtype_id}"
+        self.path = path
+        self.subtype_id = subtype_id
+        self.steps = []
+        self.reports = []
+        self.result = None
+        self.current_step = None
+        self.cancelled = False
+        self.processes = []
+        self.lock = threading.Lock()
+
+
+    def add_step(self, label: str, function, *args, stage: str = None, collection: str = None):
+        """Adds a step to the job. The label is displayed while the step is running.
+        Steps with a stage are measured if the export is being profiled."""
+
+        self.steps.append((label, function, args, stage, collection))
+
+
+    def report(self, report_type: str, can_report: bool, code: str, variable_1=None, variable_2=None, variable_3=None):
+        """Collects a report to be displayed once the job has finished."""
+
+        self.reports.append((report_type, can_report, code, variable_1, variable_2, variable_3))
+
+
+    def run(self) -> bool:
+        """Runs all steps of the job. A step fails by raising an exception or returning False, which skips all following steps."""
+
+        result = True
+        for idx, (label, function, args, stage, collection) in enumerate(self.steps):
+            if self.cancelled:
+                result = False
+                break
+
+            self.current_step = idx
+            try:
+                if stage is None:
+                    step_result = function(*args)
+                else:
+                    with profile_stage(stage, self.scene_name, collection, self.subtype_id):
+                        step_result = function(*args)
+            except Exception:
+                if not self.cancelled:
+                    print(f"SEUT: Export job '{self.name}' failed:\n{traceback.format_exc()}")
+                result = False
+                break
+
+            if step_result is False:
+                print(f"SEUT: Export job '{self.name}' failed at step '{label}'.")
+                result = False
+                break
+
+        if self.cancelled:
+            print(f"SEUT: Export job '{self.name}' was cancelled.")
+
+        self.current_step = None
+        self.result = result
+
+        return self.result
+
+
+    def get_stage(self) -> str:
+        """Returns a description of the step that is currently running. None if no step is running."""
+
+        idx = self.current_step
+        if idx is None:
+            return None
+
+        return f"{self.name}: {self.steps[idx][0]}"
+
+
+    def get_progress(self) -> int:
+        """Returns the number of steps that have been completed."""
+
+        if self.result is not None:
+            return len(self.steps)
+
+        idx = self.current_step
+        return idx if idx is not None else 0
+
+
+    def add_process(self, process):
+        """Registers a running tool process, so it can be killed if the job is cancelled."""
+
+        with self.lock:
+            self.processes.append(process)
+            if self.cancelled:
+                kill_process(process)
+
+
+    def remove_process(self, process):
+        """Unregisters a tool process once it has exited."""
+
+        with self.lock:
+            if process in self.processes:
+                self.processes.remove(process)
+
+
+    def cancel(self):
+        """Skips all remaining steps and kills the running tool processes of the job. Can be called from any thread."""
+
+        with self.lock:
+            self.cancelled = True
+            for process in self.processes:
+                kill_process(process)
+
+
+    def replay_reports(self, operator, context):
+        """Displays the collected reports. Must be called from the main thread."""
+
+        for report_type, can_report, code, variable_1, variable_2, variable_3 in self.reports:
+            seut_report(operator, context, report_type, can_report, code, variable_1, variable_2, variable_3)
+        self.reports.clear()
+
+
+class JobRunner:
+    """Runs jobs in a pool of worker threads without blocking the main thread."""
+
+    def __init__(self, jobs: list, max_workers: int = None):
+        self.jobs = jobs
+        self.cancelled = False
+        self.executor = None
+        self.futures = []
+
+        if jobs == []:
+            return
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
+        groups = get_job_groups(jobs)
+
+        self.executor = ThreadPoolExecutor(max_workers=min(max_workers, len(groups)))
+        self.futures = [self.executor.submit(run_job_group, group) for group in groups]
+
+
+    def is_done(self) -> bool:
+        """Returns True once all jobs have finished."""
+
+        return all(future.done() for future in self.futures)
+
+
+    def wait(self):
+        """Blocks until all jobs have finished."""
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+    def cancel(self):
+        """Cancels all jobs. They finish shortly after, as their running tool processes are killed."""
+
+        self.cancelled = True
+        for job in self.jobs:
+            job.cancel()
+
+
+    def get_progress(self) -> float:
+        """Returns the share of the steps of all jobs that have been completed."""
+
+        total = sum(len(job.steps) for job in self.jobs)
+        if total == 0:
+            return 1.0
+
+        return sum(job.get_progress() for job in self.jobs) / total
+
+
+    def get_status(self) -> str:
+        """Returns a summary of the running steps to be displayed in the status bar."""
+
+        finished = len([job for job in self.jobs if job.result is not None])
+
+        if self.cancelled:
+            return f"SEUT: Cancelling export ({finished} of {len(self.jobs)} jobs finished)..."
+
+        text = f"SEUT: Exporting - {finished} of {len(self.jobs)} jobs finished ({int(self.get_progress() * 100)}%)"
+
+        stages = [stage for stage in (job.get_stage() for job in self.jobs) if stage is not None]
+        if stages != []:
+            text += f" - {stages[0]}"
+            if len(stages) > 1:
+                text += f" (+{len(stages) - 1} more)"
+
+        return text + " - Press Esc to cancel"
+
+
+class JobRunnerOperator:
+    """Lets an operator run its export jobs in the background while Blender stays responsive.
+    Progress is shown in the status bar, pressing Esc cancels the jobs."""
+
+    def start_jobs(self, context, jobs: list) -> set:
+        """Starts running the jobs and the operator's modal loop."""
+
+        global job_runner
+        job_runner = JobRunner(jobs)
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.25, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+        context.workspace.status_text_set(job_runner.get_status())
+
+        return {'RUNNING_MODAL'}
+
+
+    def modal(self, context, event):
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            if not job_runner.cancelled:
+                job_runner.cancel()
+                context.workspace.status_text_set(job_runner.get_status())
+            return {'RUNNING_MODAL'}
+
+        if event.type != 'TIMER' or event.timer != self.timer:
+            return {'PASS_THROUGH'}
+
+        if not job_runner.is_done():
+            context.window_manager.progress_update(int(job_runner.get_progress() * 100))
+            context.workspace.status_text_set(job_runner.get_status())
+            return {'PASS_THROUGH'}
+
+        runner = self.stop_jobs(context)
+
+        return self.finish_jobs(context, runner.jobs, runner.cancelled)
+
+
+    def cancel(self, context):
+        runner = self.stop_jobs(context, True)
+        self.finish_jobs(context, runner.jobs, True)
+
+
+    def stop_jobs(self, context, cancel: bool = False) -> JobRunner:
+        """Ends the modal loop once all jobs have finished and returns their runner."""
+
+        global job_runner
+        runner = job_runner
+        job_runner = None
+
+        if cancel:
+            runner.cancel()
+        runner.wait()
+
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+        return runner
+
+
+    def finish_jobs(self, context, jobs: list, cancelled: bool) -> set:
+        """Called once all jobs have finished. Returns the result of the operator."""
+
+        return {'FINISHED'}
+
+
+def begin_deferred_jobs():
+    """Makes submitted jobs wait until run_deferred_jobs is called instead of running them immediately."""
+
+    global job_queue
+    job_queue = []
+
+
+def end_deferred_jobs() -> list:
+    """Stops deferring jobs and returns the queued ones without running them."""
+
+    global job_queue
+    jobs = job_queue if job_queue is not None else []
+    job_queue = None
+
+    return jobs
+
+
+def discard_deferred_jobs():
+    """Stops deferring jobs without running the queued ones."""
+
+    global job_queue
+    job_queue = None
+
+
+def submit_job(self, context, job: ExportJob):
+    """Runs a job immediately or queues it, if jobs are being deferred. Returns the result of the job or None if it was queued."""
+
+    if job_queue is not None:
+        job_queue.append(job)
+        return None
+
+    job.run()
+    job.replay_reports(self, context)
+
+    return job.result
+
+
+def run_deferred_jobs(max_workers: int = None) -> list:
+    """Runs all queued jobs in a pool of worker threads and stops deferring jobs. Returns the finished jobs."""
+
+    runner = JobRunner(end_deferred_jobs(), max_workers)
+    runner.wait()
+
+    return runner.jobs
+
+
+def is_running_jobs() -> bool:
+    """Returns True while an operator is running export jobs in the background."""
+
+    return job_runner is not None
+
+
+def run_job_group(group: list) -> list:
+    """Runs a group of jobs one after another."""
+
+    for job in group:
+        job.run()
+        print(f"SEUT: Export job '{job.name}' {'finished' if job.result else 'failed'}.")
+
+    return group
+
+
+def get_job_groups(jobs: list) -> list:
+    """Groups jobs that cannot run at the same time. MWM Builder picks up all FBX files starting with the SubtypeId
+    and loose files are deleted by the same prefix, so jobs in the same directory must not run in parallel if one SubtypeId is the prefix of another."""
+
+    groups = []
+    for job in jobs:
+        path = os.path.normcase(os.path.normpath(job.path))
+
+        conflicting = []
+        for group in groups:
+            for other in group:
+                if os.path.normcase(os.path.normpath(other.path)) == path and (other.subtype_id.startswith(job.subtype_id) or job.subtype_id.startswith(other.subtype_id)):
+                    conflicting.append(group)
+                    break
+
+        merged = [job]
+        for group in conflicting:
+            groups.remove(group)
+            merged = group + merged
+        groups.append(merged)
+
+    return groups
@@ -2,13 +2,16 @@ import bpy
 import os
 
 
-from ..materials.seut_ot_texture_conversion     import convert_texture
+from ..materials.seut_ot_texture_conversion     import convert_texture, presets
+from ..utils.seut_texture_cache                 import get_texture_cache, save_texture_cache
+from ..utils.seut_tool_utils                    import get_tool_dir
 from ..seut_errors                              import *
 from ..seut_utils                               import check_vanilla_texture, create_relative_path, get_seut_blend_data
 
 
 def export_material_textures(self, context, material):
-    """Checks if source file is newer than converted file, if so, exports to DDS."""
+    """Converts the material's textures to DDS, unless the converted file is up to date or can be taken from the texture cache.
+    During an export, the cache is only saved once all materials have been exported."""
 
     data = get_seut_blend_data()
     scene = context.scene
@@ -36,6 +39,8 @@ def export_material_textures(self, context, material):
     if not data.seut.convert_textures:
         return {'FINISHED'}
 
+    cache = get_texture_cache()
+
     for preset, source in textures.items():
 
         # Skip if texture is a vanilla texture and thus does not need to be converted.
@@ -47,20 +52,30 @@ def export_material_textures(self, context, material):
             target_file = os.path.splitext(target)[0] + '.dds'
             target_dir = os.path.dirname(target)
 
-            if not os.path.exists(target_file):
+            if cache is not None:
+                key = cache.get_key(source, presets[preset], os.path.join(get_tool_dir(), 'texconv.exe'))
+
+                if cache.is_current(target_file, key):
+                    continue
+
                 os.makedirs(target_dir, exist_ok=True)
+
+                if cache.fetch(key, target_file):
+                    print(f"SEUT: '{preset}'-texture of material '{material.name}' taken from texture cache.")
+                    continue
+
+                # Textures converted before the cache existed are adopted instead of being converted again.
+                if target_file not in cache.targets and os.path.exists(target_file) and os.path.getmtime(source) <= os.path.getmtime(target_file):
+                    cache.store(key, target_file)
+                    continue
+
                 output = convert_texture(source, target_dir, preset)
-                try:
-                    os.rename(target_file, os.path.splitext(target_file)[0] + '.dds')
-                except:
-                    pass
+                if output[0] == 0 and os.path.exists(target_file):
+                    cache.store(key, target_file)
 
-            elif os.path.getmtime(source) > os.path.getmtime(target_file):
+            elif not os.path.exists(target_file) or os.path.getmtime(source) > os.path.getmtime(target_file):
+                os.makedirs(target_dir, exist_ok=True)
                 output = convert_texture(source, target_dir, preset)
-                try:
-                    os.rename(target_file, os.path.splitext(target_file)[0] + '.dds')
-                except:
-                    pass
             
             else:
                 continue
@@ -70,4 +85,7 @@ def export_material_textures(self, context, material):
             else:
                 seut_report(self, context, 'ERROR', False, 'E046', preset, material.name, output[1])
 
+    if cache is not None:
+        save_texture_cache(cache)
+
     return {'FINISHED'}
\ No newline at end of file
@@ -47,7 +47,7 @@ def export_transparent_mat(self, context, subtype_id):
     # TransparentMat-tree & entry for this particular TransparentMat was found
     else:
         def_definition = None
-        lines_entry = lines[start:end]
+        lines_entry = SBCPatch(lines, start, end)
         update = True
     
     lines_entry = update_add_subelement(def_definition, 'AlphaMistingEnable', str(material.seut.alpha_misting_enable).lower(), update, lines_entry)
@@ -139,30 +139,15 @@ def export_transparent_mat(self, context, subtype_id):
     lines_entry = update_add_subelement(def_definition, 'IsFlareOccluder', str(material.seut.is_flare_occluder).lower(), update, lines_entry)
 
     if file_to_update is None or scene.seut.export_sbc_type == 'new':
-        temp_string = ET.tostring(definitions, 'utf-8')
-        try:
-            temp_string.decode('ascii')
-        except UnicodeDecodeError:
+        xml_formatted = serialize_xml(definitions)
+        if not xml_formatted.isascii():
             seut_report(self, context, 'ERROR', True, 'E033')
             return {'CANCELLED'}
-        xml_string = xml.dom.minidom.parseString(temp_string)
-        xml_formatted = xml_string.toprettyxml()
     
     elif file_to_update is not None and start is None and end is None:
-        temp_string = ET.tostring(def_definition, 'utf-8')
-        xml_string = xml.dom.minidom.parseString(temp_string)
-        xml_formatted = xml_string.toprettyxml()
-
         insert_index = lines.rfind('</TransparentMaterial>') + len('</TransparentMaterial>')
-        xml_formatted = lines[:insert_index] + '\n' + xml_formatted.replace('<?xml version="1.0" ?>\n', "") + '\n' + lines[insert_index:]
-
-        xml_formatted = format_entry(xml_formatted)
-        target_file = file_to_update
-
-    else:
-        xml_formatted = lines.replace(lines[start:end], lines_entry)
-        xml_formatted = format_entry(xml_formatted)
-        target_file = file_to_update
+        lines_entry = SBCPatch(lines, insert_index, insert_index)
+        lines_entry.replace(insert_index, insert_index, '\n' + serialize_xml(def_definition, False) + '\n')
 
     # This removes empty lines
     # xml_formatted = re.sub(r'\n\s*\n', '\n', xml_formatted)
@@ -192,8 +177,11 @@ def export_transparent_mat(self, context, subtype_id):
     else:
         target_file = file_to_update
 
-    exported_xml = open(target_file, "w")
-    exported_xml.write(xml_formatted)
+    if file_to_update is None or scene.seut.export_sbc_type == 'new':
+        if write_xml_file(self, context, target_file, xml_formatted) is None:
+            return {'CANCELLED'}
+    elif not write_sbc_patch(self, context, target_file, lines_entry, subtype_id):
+        return {'CANCELLED'}
 
     if file_to_update is None or scene.seut.export_sbc_type == 'new':
         seut_report(self, context, 'INFO', False, 'I004', target_file)
@@ -5,7 +5,6 @@ import math
 import glob
 import subprocess
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
 
 from os.path                                import join
 from mathutils                              import Matrix	
@@ -13,7 +12,9 @@ from bpy_extras.io_utils                    import axis_conversion, ExportHelper
 
 from ..importing.seut_ot_import             import import_fbx
 from ..materials.seut_ot_remap_materials    import remap_materials
-from ..utils.seut_tool_utils                import get_tool_dir
+from ..utils.seut_tool_utils                import get_tool_dir, run_tool
+from ..utils.seut_profiler                  import profile_stage, STAGE_XML, STAGE_FBX, STAGE_TEXTURES
+from ..utils.seut_xml_utils                 import serialize_xml, write_xml_file
 from ..seut_collections                     import get_collections, get_rev_ref_cols
 from ..seut_utils                           import *
 from ..seut_errors                          import seut_report, get_abs_path
@@ -22,15 +23,18 @@ from .seut_export_transparent_mat           import export_transparent_mat
 from .seut_export_texture                   import export_material_textures
 
 
-def export_xml(self, context, collection) -> str:
+def export_xml(self, context, collection, targets: list = None) -> str:
     """Exports the XML definition for a collection"""
 
     scene = context.scene
     collections = get_collections(scene)
 
+    if targets is None:
+        targets = [ExportTarget(scene)]
+
     # Create XML tree and add initial parameters.
     model = ET.Element('Model')
-    model.set('Name', scene.seut.subtypeId)
+    model.set('Name', targets[0].subtype_id)
 
     if scene.seut.sceneType not in ['character', 'character_animation']:
         add_subelement(model, 'RescaleFactor', '1.0')
@@ -43,8 +47,6 @@ def export_xml(self, context, collection) -> str:
     if scene.seut.sceneType in ['character', 'character_animation']:
         add_subelement(model, 'RotationY', '180')
 
-    path = get_abs_path(scene.seut.export_exportPath)
-
     # Write local materials as material entries into XML, write library materials as matrefs into XML
     for mat in bpy.data.materials:
 
@@ -99,7 +101,8 @@ def export_xml(self, context, collection) -> str:
             for img_type in ['CM', 'ADD', 'NG', 'ALPHAMASK']:
                 if img_type in nodes and nodes[img_type].image is not None and os.path.exists(get_abs_path(nodes[img_type].image.filepath)):
                     if not check_vanilla_texture(nodes[img_type].image.filepath):
-                        export_material_textures(self, context, mat)
+                        with profile_stage(STAGE_TEXTURES, scene.name, mat.name):
+                            export_material_textures(self, context, mat)
                         break
 
             if mat.seut.technique in ['GLASS', 'HOLO', 'SHIELD'] and scene.seut.export_sbc_type in ['update', 'new']:
@@ -108,26 +111,36 @@ def export_xml(self, context, collection) -> str:
             matRef = ET.SubElement(model, 'MaterialRef')
             matRef.set('Name', mat.name)
 
-    # Write LOD references into the XML, if applicable
-    if collection.seut.col_type in ['main', 'bs'] and 'lod' in collections:
-        if not collections['lod'] is None:
-            cols = get_rev_ref_cols(collections, collection, 'lod')
-            for col in cols:
-                if len(col.objects) > 0:
-                    create_lod_entry(model, col.seut.lod_distance, path, get_col_filename(col))
+    # Only the name and the LOD references differ between the export targets.
+    for target in targets:
+        model.set('Name', target.subtype_id)
+        path = target.get_abs_path()
+
+        # Write LOD references into the XML, if applicable
+        lod_entries = []
+        if collection.seut.col_type in ['main', 'bs'] and 'lod' in collections:
+            if not collections['lod'] is None:
+                cols = get_rev_ref_cols(collections, collection, 'lod')
+                for col in cols:
+                    if len(col.objects) > 0:
+                        lod_entries.append(create_lod_entry(model, col.seut.lod_distance, path, get_col_filename(col, target)))
+
+        # Create file with subtypename + collection name and write string to it
+        xml_formatted = format_xml(self, context, model)
 
-    # Create file with subtypename + collection name and write string to it
-    xml_formatted = format_xml(self, context, model)
+        path = os.path.join(path, f"{get_col_filename(collection, target)}.xml")
+        result = write_xml_file(self, context, path, xml_formatted)
 
-    path = os.path.join(path, f"{get_col_filename(collection)}.xml")
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    exported_xml = open(path, "w")
-    exported_xml.write(xml_formatted)
+        for lod in lod_entries:
+            model.remove(lod)
+
+        if result is None:
+            return {'CANCELLED'}
 
     return {'FINISHED'}
 
 
-def get_col_filename(collection: object) -> str:
+def get_col_filename(collection: object, target = None) -> str:
     """Returns the correct filename for a given collection."""
 
     schema = {
@@ -137,7 +150,10 @@ def get_col_filename(collection: object) -> str:
         'lod': "{ref_col_name}_LOD{type_index}" 
     }
 
-    subtypeId = collection.seut.scene.seut.subtypeId
+    if target is not None:
+        subtypeId = target.subtype_id
+    else:
+        subtypeId = collection.seut.scene.seut.subtypeId
     type_index = collection.seut.type_index
 
     ref_col_name = ""
@@ -237,23 +253,21 @@ def create_lod_entry(tree, distance: int, path: str, filename: str):
     lodModel = ET.SubElement(lod, 'Model')
     lodModel.text = create_relative_path(os.path.join(path, filename), "Models")
 
+    return lod
+
 
 def format_xml(self, context, tree) -> str:
     """Converts XML Tree to a formatted XML string"""
 
-    temp_string = ET.tostring(tree, 'utf-8')
+    xml_formatted = serialize_xml(tree)
 
-    try:
-        temp_string.decode('ascii')
-    except UnicodeDecodeError:
+    if not xml_formatted.isascii():
         seut_report(self, context, 'ERROR', False, 'E033')
 
-    xml_string = xml.dom.minidom.parseString(temp_string)
-    
-    return xml_string.toprettyxml()
+    return xml_formatted
 
 
-def export_fbx(self, context, collection, path_override = None) -> str:
+def export_fbx(self, context, collection, targets: list = None, path_override = None) -> str:
     """Exports the FBX file for a defined collection"""
 
     scene = context.scene
@@ -261,7 +275,8 @@ def export_fbx(self, context, collection, path_override = None) -> str:
     depsgraph = context.evaluated_depsgraph_get()
     settings = ExportSettings(scene, depsgraph)
 
-    path = get_abs_path(scene.seut.export_exportPath)
+    if targets is None:
+        targets = [ExportTarget(scene)]
 
     # Export exports the active layer_collection so the collection's layer_collection needs to be set as the active one
     try:
@@ -283,6 +298,7 @@ def export_fbx(self, context, collection, path_override = None) -> str:
                     g.weight = min(g.weight, 1)
 
     # Prepare empties for export
+    subpart_empties = []
     for empty in collection.objects:
         if empty is not None and empty.type == 'EMPTY':
 
@@ -332,9 +348,7 @@ def export_fbx(self, context, collection, path_override = None) -> str:
                     seut_report(self, context, 'WARNING', True, 'W001', linked_scene.name, scene.name)
 
                 # Remove subpart instances
-                reference = get_subpart_reference(empty, collections)
-                reference = correct_for_export_type(scene, reference)
-                empty['file'] = reference
+                subpart_empties.append((empty, get_subpart_reference(empty, collections)))
                 unlink_subpart_scene(empty)
 
             # Blender FBX export halves empty size on export, this works around it
@@ -349,19 +363,23 @@ def export_fbx(self, context, collection, path_override = None) -> str:
         if mat is not None and mat.node_tree is not None:
             prepare_mat_for_export(self, context, mat)
 
-    # Export the collection to FBX
-    if path_override is None:
-        path = os.path.join(path, f"{get_col_filename(collection)}.fbx")
-    else:
-        path = path_override
-    try:
-        export_to_fbxfile(settings, scene, path, collection.objects, ishavokfbxfile=False)
+    # Export the collection to FBX once per target, the preparations above are shared.
+    for target in targets:
+        for empty, reference in subpart_empties:
+            empty['file'] = correct_for_export_type(scene, reference, target.grid_scale)
+
+        if path_override is None:
+            path = os.path.join(target.get_abs_path(), f"{get_col_filename(collection, target)}.fbx")
+        else:
+            path = path_override
+        try:
+            export_to_fbxfile(settings, scene, path, collection.objects, ishavokfbxfile=False, rescale_factor=target.rescale_factor)
 
-    except RuntimeError as error:
-        seut_report(self, context, 'ERROR', False, 'E017')
+        except RuntimeError as error:
+            seut_report(self, context, 'ERROR', False, 'E017')
 
-    except KeyError as error:
-        seut_report(self, context, 'ERROR', True, 'E038', error)
+        except KeyError as error:
+            seut_report(self, context, 'ERROR', True, 'E038', error)
 
     # Revert materials back to original form
     for mat in bpy.data.materials:
@@ -403,10 +421,13 @@ def get_subpart_reference(empty, collections: dict) -> str:
     return empty.seut.linkedScene.seut.subtypeId
 
 
-def correct_for_export_type(scene, reference: str) -> str:
+def correct_for_export_type(scene, reference: str, grid_scale: str = None) -> str:
     """Corrects reference depending on export type (large / small) selected."""
 
-    if scene.seut.gridScale == 'large':
+    if grid_scale is None:
+        grid_scale = scene.seut.gridScale
+
+    if grid_scale == 'large':
         if reference.startswith("LG_") or reference.find("_LG_") != -1 or reference.endswith("_LG"):
             pass
 
@@ -421,7 +442,7 @@ def correct_for_export_type(scene, reference: str) -> str:
         elif scene.seut.export_largeGrid and scene.seut.export_smallGrid:
             reference = "LG_" + reference
 
-    elif scene.seut.gridScale == 'small':
+    elif grid_scale == 'small':
         if reference.startswith("SG_") or reference.find("_SG_") != -1 or reference.endswith("_SG"):
             pass
 
@@ -521,12 +542,30 @@ def revert_mat_after_export(self, context, material):
 vanilla_bones = ['SE_RigPelvis', 'SE_RigLThigh', 'SE_RigLCalf', 'SE_RigLFoot', 'SE_RigLR_Foot_tip1', 'SE_RigSpine1', 'SE_RigSpine2', 'SE_RigSpine3', 'SE_RigSpine4', 'SE_RigRibcage', 'SE_RigNeck', 'SE_RigHead', 'SE_RigHelmetGlassBone', 'SE_RigL_Eye', 'SE_RigL_EyeLidUpper', 'SE_RigL_EyeLidLower', 'SE_RigR_Eye', 'SE_RigR_EyeLidUpper', 'SE_RigR_EyeLidLower', 'SE_RigLCollarbone', 'SE_RigLUpperarm', 'SE_RigLForearm1', 'SE_RigLForearm2', 'SE_RigLForearm3', 'SE_RigLPalm', 'SE_RigL_Thumb_1', 'SE_RigL_Thumb_2', 'SE_RigL_Thumb_3', 'SE_RigL_Index_1', 'SE_RigL_Index_2', 'SE_RigL_Index_3', 'SE_RigL_Middle_1', 'SE_RigL_Middle_2', 'SE_RigL_Middle_3', 'SE_RigL_Ring_1', 'SE_RigL_Ring_2', 'SE_RigL_Ring_3', 'SE_RigL_Little_1', 'SE_RigL_Little_2', 'SE_RigL_Little_3', 'SE_RigRCollarbone', 'SE_RigRUpperarm', 'SE_RigRForearm1', 'SE_RigRForearm2', 'SE_RigRForearm3', 'SE_RigRPalm', 'SE_RigR_Thumb_1', 'SE_RigR_Thumb_2', 'SE_RigR_Thumb_3', 'SE_RigR_Index_1', 'SE_RigR_Index_2', 'SE_RigR_Index_3', 'SE_RigR_Middle_1', 'SE_RigR_Middle_2', 'SE_RigR_Middle_3', 'SE_RigR_Ring_1', 'SE_RigR_Ring_2', 'SE_RigR_Ring_3', 'SE_RigR_Little_1', 'SE_RigR_Little_2', 'SE_RigR_Little_3', 'SE_RigRibcageBone001', 'SE_RigRThigh', 'SE_RigRCalf', 'SE_RigRFoot', 'SE_RigRR_Foot_tip1', 'SE_RigL_Weapon_pin', 'SE_RigR_Weapon_pin']
 
 
-def export_collection(self, context, collection):
+def export_collection(self, context, collection, targets: list = None):
     """Exports the collection to XML and FBX"""
 
+    if targets is None:
+        targets = [ExportTarget(context.scene)]
+
+    # Targets whose files are up to date are skipped.
+    targets = [t for t in targets if t.manifest is None or not t.manifest.is_current(get_col_filename(collection, t))]
+    if targets == []:
+        print(f"\n------------------------------ Collection '{collection.name}' is up to date.\n")
+        return {'FINISHED'}, {'FINISHED'}
+
     print(f"\n------------------------------ Exporting Collection '{collection.name}'.")
-    result_xml = export_xml(self, context, collection)
-    result_fbx = export_fbx(self, context, collection)
+    with profile_stage(STAGE_XML, context.scene.name, collection.name):
+        result_xml = export_xml(self, context, collection, targets)
+    with profile_stage(STAGE_FBX, context.scene.name, collection.name):
+        result_fbx = export_fbx(self, context, collection, targets)
+
+    if {'CANCELLED'} not in (result_xml, result_fbx):
+        for target in targets:
+            if target.manifest is not None:
+                key = get_col_filename(collection, target)
+                path = target.get_abs_path()
+                target.manifest.record(key, [join(path, f"{key}.xml"), join(path, f"{key}.fbx")])
 
     # This is insane, yes, but it seems to be the only viable solution to mitigate empty drift on export.
     if context.scene.seut.sceneType == 'character':
@@ -564,7 +603,9 @@ def export_collection(self, context, collection):
                 corr_col = col
                 break
 
-        filepath = f"{os.path.join(get_abs_path(temp_scn.seut.export_exportPath), get_col_filename(collection)) + '.fbx'}"
+        # Character scenes are only ever exported to a single target.
+        target = targets[0]
+        filepath = f"{os.path.join(target.get_abs_path(), get_col_filename(collection, target)) + '.fbx'}"
 
         bpy.context.view_layer.active_layer_collection = temp_scn.view_layers['SEUT'].layer_collection.children[collections['seut'][0].name].children[corr_col.name]
         import_fbx(self, context, filepath)
@@ -574,7 +615,7 @@ def export_collection(self, context, collection):
             corr_col.objects.link(obj)
             collections['seut'][0].objects.unlink(obj)
 
-        result_fbx = export_fbx(self, context, corr_col, filepath)
+        result_fbx = export_fbx(self, context, corr_col, [target], filepath)
         
         context.window.scene = current_scn
 
@@ -636,6 +677,46 @@ class MissbehavingToolError(subprocess.SubprocessError):
     def __str__(self):
         return self.message
 
+class ToolOutputInspector:
+    """Checks the output of FBX Importer, Havok and MWM Builder line by line for known errors."""
+
+    # Errors after which a tool cannot produce a usable result.
+    fatal_errors = {
+        "Assimp.AssimpException: Error loading unmanaged library from path: Assimp32.dll": 'E039',
+        "System.ArgumentOutOfRangeException: Index was out of range. Must be non-negative and less than the size of the collection.": 'E043',
+    }
+
+    def __init__(self):
+        self.has_error = False
+        self.signature = None
+        self.code = None
+        self.model = None
+
+    def __call__(self, line: str) -> bool:
+        """Returns True if the tool should be stopped."""
+
+        if self.model is None and line.find("\\Models\\") != -1:
+            model = line[line.find("\\Models\\") + len("\\Models\\"):]
+            if model.find(".fbx") != -1:
+                self.model = model[:model.find(".fbx")] + ".fbx"
+
+        if line.find(": ERROR:") != -1:
+            self.has_error = True
+
+        if self.signature is None:
+            for signature, code in self.fatal_errors.items():
+                if line.find(signature) != -1:
+                    self.signature = code
+                    break
+
+        # The signature is only an error if the tool reports one, it may show up before or after the error line.
+        if self.has_error and self.signature is not None:
+            self.code = self.signature
+            return True
+
+        return False
+
+
 # STOLLIE: Returns a tools path from the user preferences config, e.g. FBXImporter/HavokTool/MWMBuilder.
 def tool_path(propertyName, displayName, toolPath=None):
     """Gets path to tool from user preferences.
@@ -657,30 +738,64 @@ def tool_path(propertyName, displayName, toolPath=None):
 
     return toolPath
 
-# STOLLIE: Called by other methods to write to a log file when an errors occur.
-def write_to_log(logfile, content, cmdline=None, cwd=None, loglines=[]):
-    with open(logfile, 'wb') as log: # wb params here represent writing/create file and binary mode.
-        if cwd:
-            str = "Running from: %s \n" % (cwd)
-            log.write(str.encode('utf-8'))
 
-        if cmdline:
-            str = "Command: %s \n" % (" ".join(cmdline))
-            log.write(str.encode('utf-8'))
+class ExportTarget:
+    """A grid size a scene is exported to, with the SubtypeId, rescale factor and export path that come with it.
+    Used instead of temporarily overwriting the scene's properties, which would trigger their update callbacks."""
 
-        for line in loglines:
-            log.write(line.encode('utf-8'))
-            log.write(b"\n")
+    def __init__(self, scene, grid_scale: str = None):
+        self.scene = scene
+        self.job = None
+        self.manifest = None
+
+        if grid_scale is None:
+            self.grid_scale = scene.seut.gridScale
+            self.subtype_id = scene.seut.subtypeId
+            self.rescale_factor = scene.seut.export_rescaleFactor
+            self.export_path = scene.seut.export_exportPath
+            return
+
+        self.grid_scale = grid_scale
+        self.subtype_id = correct_for_export_type(scene, scene.seut.subtypeId, grid_scale)
+        self.rescale_factor = 1.0
+        self.export_path = scene.seut.export_exportPath
+
+        small, large = os.sep + "small", os.sep + "large"
+        if grid_scale == 'large':
+            if scene.seut.gridScale == 'small':
+                self.rescale_factor = 3.0 if scene.seut.export_medium_grid else 5.0
 
-        log.write(content)
+            if self.export_path.find(small + os.sep) != -1 or self.export_path.endswith(small):
+                self.export_path = self.export_path.replace(small + os.sep, large + os.sep)
+                self.export_path = self.export_path.replace(small, large)
+
+        elif grid_scale == 'small':
+            if scene.seut.gridScale == 'large':
+                self.rescale_factor = 0.6 if scene.seut.export_medium_grid else 0.2
+
+            if self.export_path.find(large + os.sep) != -1 or self.export_path.endswith(large):
+                self.export_path = self.export_path.replace(large + os.sep, small + os.sep)
+                self.export_path = self.export_path.replace(large, small)
+
+
+    def get_abs_path(self) -> str:
+        """Returns the absolute export path of the target."""
+
+        return get_abs_path(self.export_path)
 
 
 class ExportSettings:
-    def __init__(self, scene, depsgraph, mwmDir=None):
+    def __init__(self, scene, depsgraph, mwmDir=None, target=None):
         self.scene = scene # ObjectSource.getObjects() uses .utils.scene() instead
         self.depsgraph = depsgraph
         self.operator = STDOUT_OPERATOR
         self.isLogToolOutput = True
+
+        # Tool calls of a job may run outside of the main thread, so everything they need from the scene is read here.
+        self.job = target.job if target is not None else None
+        self.scene_name = scene.name
+        self.subtype_id = target.subtype_id if target is not None else scene.seut.subtypeId
+        self.delete_loose_files = scene.seut.export_deleteLooseFiles
         
         # set on first access, see properties below
         self._fbximporter = None
@@ -706,47 +821,74 @@ class ExportSettings:
             self._mwmbuilder = tool_path('mwmb_path', 'MWM Builder')
         return self._mwmbuilder
 
-    def callTool(self, context, cmdline, tooltype, logfile=None, cwd=None, successfulExitCodes=[0], loglines=[], logtextInspector=None):
-        try:
-            out = subprocess.check_output(cmdline, cwd=cwd, stderr=subprocess.STDOUT, shell=True)
-            if self.isLogToolOutput and logfile:
-                write_to_log(logfile, out, cmdline=cmdline, cwd=cwd, loglines=loglines)
-            if logtextInspector is not None:
-                logtextInspector(out)
-
-            out_str = out.decode("utf-8")
-            if out_str.find(": ERROR:") != -1:
-                if out_str.find("Assimp.AssimpException: Error loading unmanaged library from path: Assimp32.dll") != -1:
-                    seut_report(self, context, 'ERROR', False, 'E039')
-                    return False
-                    
-                elif out_str.find("System.ArgumentOutOfRangeException: Index was out of range. Must be non-negative and less than the size of the collection.") != -1:
-                    temp_string = out_str[out_str.find("\\Models\\") + len("\\Models\\"):]
-                    temp_string = temp_string[:temp_string.find(".fbx")]
-                    seut_report(self, context, 'ERROR', False, 'E043', temp_string + ".fbx")
-                    return False
-            
-                else:
-                    seut_report(self, context, 'ERROR', False, 'E044')
-                    return False
+    def resolve_tool_paths(self):
+        """Resolves the paths of all tools, which requires access to the addon preferences."""
 
-            return True
+        return self.fbximporter, self.havokfilter, self.mwmbuilder
+
+    def report(self, context, report_type: str, can_report: bool, code: str, variable_1=None, variable_2=None, variable_3=None):
+        """Reports directly or, if the settings belong to a job, collects the report in the job."""
+
+        if self.job is not None:
+            self.job.report(report_type, can_report, code, variable_1, variable_2, variable_3)
+        else:
+            seut_report(self, context, report_type, can_report, code, variable_1, variable_2, variable_3)
+
+    def callTool(self, context, cmdline, tooltype, logfile=None, cwd=None, successfulExitCodes=[0], loglines=[]):
+        """Runs a tool and reports known errors as soon as they show up in its output. Tools that run into a fatal error are stopped right away."""
+
+        inspector = ToolOutputInspector()
 
-        except subprocess.CalledProcessError as e:
-            if self.isLogToolOutput and logfile:
-                write_to_log(logfile, e.output, cmdline=cmdline, cwd=cwd, loglines=loglines)
-            if e.returncode not in successfulExitCodes:
-                if e.returncode == 4294967295:
-                    seut_report(self, context, 'ERROR', False, 'E037')
-                elif e.returncode == 3221225477:
-                    seut_report(self, context, 'ERROR', False, 'E047')
-                elif e.returncode == 3221225781:
-                    seut_report(self, context, 'ERROR', False, 'E050')
+        header = ""
+        if cwd:
+            header += "Running from: %s \n" % (cwd)
+        header += "Command: %s \n" % (" ".join(cmdline))
+        for line in loglines:
+            header += line + "\n"
+
+        on_start = self.job.add_process if self.job is not None else None
+        on_exit = self.job.remove_process if self.job is not None else None
+
+        returncode, out, aborted = run_tool(
+            cmdline,
+            cwd=cwd,
+            logfile=logfile if self.isLogToolOutput else None,
+            log_header=header.encode('utf-8'),
+            inspect_line=inspector,
+            on_start=on_start,
+            on_exit=on_exit
+        )
+
+        if inspector.code is not None:
+            if inspector.code == 'E043':
+                self.report(context, 'ERROR', False, 'E043', inspector.model)
+            else:
+                self.report(context, 'ERROR', False, inspector.code)
+            return False
+
+        if returncode != 0:
+            # The tool was killed because the export was cancelled.
+            if self.job is not None and self.job.cancelled:
+                raise subprocess.CalledProcessError(returncode, cmdline, output=out)
+
+            if returncode not in successfulExitCodes:
+                if returncode == 4294967295:
+                    self.report(context, 'ERROR', False, 'E037')
+                elif returncode == 3221225477:
+                    self.report(context, 'ERROR', False, 'E047')
+                elif returncode == 3221225781:
+                    self.report(context, 'ERROR', False, 'E050')
                 else:
-                    seut_report(self, context, 'ERROR', False, 'E035', str(tooltype))
-                raise
+                    self.report(context, 'ERROR', False, 'E035', str(tooltype))
+                raise subprocess.CalledProcessError(returncode, cmdline, output=out)
 
             return False
+
+        if inspector.has_error:
+            self.report(context, 'ERROR', False, 'E044')
+            return False
+
+        return True
     
     def __getitem__(self, key): # makes all attributes available for parameter substitution
         if not type(key) is str or key.startswith('_'):
@@ -763,7 +905,7 @@ class ExportSettings:
 # HARAG: FWD = 'Z'
 # HARAG: MATRIX_NORMAL = axis_conversion(to_forward=FWD, to_up=UP).to_4x4()
 # HARAG: MATRIX_SCALE_DOWN = Matrix.Scale(0.2, 4) * MATRIX_NORMAL
-def export_to_fbxfile(settings: ExportSettings, scene, filepath, objects, ishavokfbxfile = False, kwargs = None):	
+def export_to_fbxfile(settings: ExportSettings, scene, filepath, objects, ishavokfbxfile = False, kwargs = None, rescale_factor = None):	
     kwargs = {	
         
         # Operator settings
@@ -857,7 +999,10 @@ def export_to_fbxfile(settings: ExportSettings, scene, filepath, objects, ishavo
     global_matrix = axis_conversion(to_forward=kwargs['axis_forward'], to_up=kwargs['axis_up']).to_4x4()
     scale = kwargs['global_scale']
 
-    scale *= scene.seut.export_rescaleFactor
+    # The rescale to the target grid size is applied as part of the global matrix.
+    if rescale_factor is None:
+        rescale_factor = scene.seut.export_rescaleFactor
+    scale *= rescale_factor
 
     if abs(1.0-scale) >= 0.000001:
         global_matrix = Matrix.Scale(scale, 4) @ global_matrix
@@ -2,27 +2,29 @@ import bpy
 import os
 import math
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
 import shutil
 
 from os.path        import join
 from bpy.types      import Operator
 
-from .havok.seut_havok_hkt          import convert_fbx_to_fbxi_hkt, convert_fbxi_hkt_to_hkt
+from .havok.seut_havok_hkt          import convert_fbx_to_fbxi_hkt, convert_fbxi_hkt_to_hkt, get_hko_content
 from .seut_mwmbuilder               import mwmbuilder
-from .seut_export_utils             import ExportSettings, export_to_fbxfile, create_relative_path
-from .seut_export_utils             import correct_for_export_type, export_collection, get_col_filename, convert_position_to_cell
+from .seut_export_jobs              import ExportJob, JobRunnerOperator, submit_job, is_running_jobs
+from .seut_export_jobs              import begin_deferred_jobs, end_deferred_jobs, discard_deferred_jobs
+from .seut_build_graph              import create_build_manifests
+from .seut_export_utils             import ExportSettings, ExportTarget, export_to_fbxfile, create_relative_path
+from .seut_export_utils             import export_collection, get_col_filename, convert_position_to_cell
 from ..utils.seut_xml_utils         import *
+from ..utils.seut_texture_cache     import begin_texture_batch, end_texture_batch
 from ..seut_collections             import get_collections, get_rev_ref_cols, get_cols_by_type, get_first_free_index
 from ..seut_errors                  import *
 from ..seut_utils                   import prep_context, get_preferences, create_relative_path, get_addon
 from ..utils.seut_tool_utils        import get_tool_dir
+from ..utils.seut_profiler          import begin_profile, end_profile, discard_profile, profile_stage, add_profile_target
+from ..utils.seut_profiler          import STAGE_FBX, STAGE_FBXIMPORTER, STAGE_HAVOK, STAGE_MWMBUILDER, STAGE_SBC
 
 
-orig_grid_scale = ""
-
-
-class SEUT_OT_Export(Operator):
+class SEUT_OT_Export(JobRunnerOperator, Operator):
     """Exports all collections in the current scene and compiles them to MWM.\nScene needs to be in Object mode for export to be available"""
     bl_idname = "scene.export"
     bl_label = "Export Current Scene"
@@ -31,17 +33,62 @@ class SEUT_OT_Export(Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT'
+        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT' and not is_running_jobs()
         
 
     def execute(self, context):
         """Calls the function to export all collections"""
 
-        result = export(self, context)
+        begin_profile(get_preferences().profile_export)
+        try:
+            result = export(self, context)
+        except Exception:
+            discard_profile()
+            raise
+
+        end_profile(self, context)
 
         return result
 
 
+    def invoke(self, context, event):
+        """Exports all collections, then runs the tools in the background"""
+
+        begin_profile(get_preferences().profile_export)
+        begin_deferred_jobs()
+        try:
+            result = export(self, context)
+        except Exception:
+            discard_deferred_jobs()
+            discard_profile()
+            raise
+
+        jobs = end_deferred_jobs()
+        if result != {'FINISHED'} or jobs == []:
+            end_profile(self, context)
+            return result
+
+        return self.start_jobs(context, jobs)
+
+
+    def finish_jobs(self, context, jobs: list, cancelled: bool) -> set:
+        """Displays the reports of the jobs once they have finished"""
+
+        for job in jobs:
+            job.replay_reports(self, context)
+
+        end_profile(self, context)
+
+        if cancelled:
+            seut_report(self, context, 'WARNING', True, 'W021', jobs[0].scene_name)
+            return {'CANCELLED'}
+
+        if False in [job.result for job in jobs]:
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+
 def export(self, context):
     """Exports all collections in the current scene and compiles them to MWM"""
     
@@ -66,7 +113,7 @@ def export(self, context):
     subparts = scene.seut.linkSubpartInstances
     scene.seut.linkSubpartInstances = False
 
-    if not os.path.isdir(get_abs_path(scene.seut.mod_path) + '\\'):
+    if not os.path.isdir(get_abs_path(scene.seut.mod_path)):
         seut_report(self, context, 'ERROR', True, 'E019', "Mod", scene.name)
         scene.seut.linkSubpartInstances = subparts
         return {'CANCELLED'}
@@ -77,9 +124,6 @@ def export(self, context):
         scene.seut.linkSubpartInstances = subparts
         return result
         
-    if not os.path.exists(get_abs_path(scene.seut.export_exportPath)):
-        os.makedirs(get_abs_path(scene.seut.export_exportPath))
-
     # Check for availability of FBX Importer
     result = check_toolpath(self, context, os.path.join(get_tool_dir(), 'FBXImporter.exe'), "Custom FBX Importer", "FBXImporter.exe")
     if not result == {'CONTINUE'}:
@@ -105,60 +149,19 @@ def export(self, context):
     if scene.seut.sceneType == 'character_animation' and len(scene.timeline_markers) <= 0:
         scene.timeline_markers.new('F_00', frame=0)
         
-    grid_scale = str(scene.seut.gridScale)
-    global orig_grid_scale
-    orig_grid_scale = grid_scale
-    subtype_id = str(scene.seut.subtypeId)
-    rescale_factor = int(scene.seut.export_rescaleFactor)
-    path = str(scene.seut.export_exportPath)
-    
-    # Exports large grid and character-type scenes
+    # Both grid sizes are exported in the same pass, without changing the scene's properties.
+    targets = []
     if scene.seut.export_largeGrid or scene.seut.sceneType in ['character','character_animation']:
-        scene.seut.gridScale = 'large'
-        scene.seut.subtypeId = correct_for_export_type(scene, scene.seut.subtypeId)
-
-        if grid_scale == 'small':
-            scene.seut.export_rescaleFactor = 5.0
-            if scene.seut.export_medium_grid:
-                scene.seut.export_rescaleFactor = 3.0
-        else:
-            scene.seut.export_rescaleFactor = 1.0
-
-        if scene.seut.export_exportPath.find("\small\\") != -1 or scene.seut.export_exportPath.endswith("\small"):
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\small\\", "\large\\")
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\small", "\large")
-        
-        result = export_all(self, context)
-
-        # Resetting the variables
-        scene.seut.subtypeId = subtype_id
-        scene.seut.gridScale = grid_scale
-        scene.seut.export_rescaleFactor = rescale_factor
-        scene.seut.export_exportPath = path
-    
-    # Exports small grid scenes
+        targets.append(ExportTarget(scene, 'large'))
     if scene.seut.export_smallGrid:
-        scene.seut.gridScale = 'small'
-        scene.seut.subtypeId = correct_for_export_type(scene, scene.seut.subtypeId)
-
-        if grid_scale == 'large':
-            scene.seut.export_rescaleFactor = 0.2
-            if scene.seut.export_medium_grid:
-                scene.seut.export_rescaleFactor = 0.6
-        else:
-            scene.seut.export_rescaleFactor = 1.0
+        targets.append(ExportTarget(scene, 'small'))
 
-        if scene.seut.export_exportPath.find("\large\\") != -1 or scene.seut.export_exportPath.endswith("\large"):
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\large\\", "\small\\")
-            scene.seut.export_exportPath = scene.seut.export_exportPath.replace("\large", "\small")
-        
-        result = export_all(self, context)
+    for target in targets:
+        if not os.path.exists(target.get_abs_path()):
+            os.makedirs(target.get_abs_path())
 
-        # Resetting the variables
-        scene.seut.subtypeId = subtype_id
-        scene.seut.gridScale = grid_scale
-        scene.seut.export_rescaleFactor = rescale_factor
-        scene.seut.export_exportPath = path
+    if targets != []:
+        result = export_all(self, context, targets)
         
     scene.seut.linkSubpartInstances = subparts
     
@@ -168,29 +171,72 @@ def export(self, context):
     return result
 
 
-def export_all(self, context):
-    """Exports all collections"""
+def export_all(self, context, targets: list):
+    """Exports all collections to all targets"""
 
     scene = context.scene
 
-    results = []
+    create_build_manifests(context, targets)
+    for target in targets:
+        target.job = ExportJob(scene.name, target.get_abs_path(), target.subtype_id)
+        add_profile_target(scene.name, target.subtype_id, target.get_abs_path())
 
-    results.append(export_bs(self, context))
-    results.append(export_lod(self, context))
-    results.append(export_main(self, context))
-    results.append(export_hkt(self, context))
+    # Nothing needs to be exported again for a target if none of its MWM's inputs changed since it was built.
+    stale_targets = []
+    for target in targets:
+        if target.manifest is not None and target.manifest.is_current('mwm'):
+            print(f"SEUT: MWM of scene '{scene.name}' is up to date, skipping export of '{target.subtype_id}'.")
+        else:
+            stale_targets.append(target)
+
+    results = []
 
-    if scene.seut.export_sbc_type in ['update', 'new'] and scene.seut.sceneType == 'mainScene':
-        results.append(export_sbc(self, context))
+    # Entries of both targets and of transparent materials are usually located in the same SBC files.
+    batch = begin_sbc_batch()
+    issues = begin_issue_batch()
+    textures = begin_texture_batch()
+    try:
+        if stale_targets != []:
+            results.append(export_bs(self, context, stale_targets))
+            results.append(export_lod(self, context, stale_targets))
+            results.append(export_main(self, context, stale_targets))
+            results.append(export_hkt(self, context, stale_targets))
+
+        if scene.seut.export_sbc_type in ['update', 'new'] and scene.seut.sceneType == 'mainScene':
+            for target in targets:
+                with profile_stage(STAGE_SBC, scene.name, subtype_id=target.subtype_id):
+                    results.append(export_sbc(self, context, target))
+
+    except Exception:
+        if batch:
+            discard_sbc_batch()
+        raise
+
+    finally:
+        if issues:
+            end_issue_batch()
+        if textures:
+            end_texture_batch()
+
+    if batch:
+        with profile_stage(STAGE_SBC, scene.name):
+            end_sbc_batch(self, context)
     
-    if {'CANCELLED'} not in results:
-        export_mwm(self, context)
-        return {'FINISHED'}
-    else:
+    if {'CANCELLED'} in results:
         return {'CANCELLED'}
 
+    result = {'FINISHED'}
+    for target in stale_targets:
+        export_mwm(self, context, target)
 
-def export_main(self, context):
+        # Returns None if the job is deferred, in which case its result is checked once it has run.
+        if submit_job(self, context, target.job) is False:
+            result = {'CANCELLED'}
+
+    return result
+
+
+def export_main(self, context, targets: list):
     """Exports the Main collection"""
 
     scene = context.scene
@@ -222,7 +268,7 @@ def export_main(self, context):
             return {'CANCELLED'}
         
         if obj.type == 'EMPTY' and 'file' in obj and not obj.seut.linked:
-            if orig_grid_scale == 'large' and scene.seut.export_smallGrid or orig_grid_scale == 'small' and scene.seut.export_largeGrid:
+            if scene.seut.gridScale == 'large' and scene.seut.export_smallGrid or scene.seut.gridScale == 'small' and scene.seut.export_largeGrid:
                 seut_report(self, context, 'WARNING', True, 'W020', scene.name, obj.name)
 
     # Check for armatures being present in collection
@@ -236,33 +282,38 @@ def export_main(self, context):
         seut_report(self, context, 'ERROR', True, 'E031', collections['main'][0].name)
         return {'CANCELLED'}
 
-    results = export_collection(self, context, collections['main'][0])            
+    results = export_collection(self, context, collections['main'][0], targets)            
     if {'CANCELLED'} in results:
         return {'CANCELLED'}
 
     return {'FINISHED'}
 
 
-def export_hkt(self, context):
-    """Exports collision to HKT"""
+def export_hkt(self, context, targets: list):
+    """Exports collision to FBX and adds its conversion to HKT to the targets' jobs"""
 
     scene = context.scene
     collections = get_collections(scene)
     preferences = get_preferences()
-    settings = ExportSettings(scene, None)
-    path = get_abs_path(scene.seut.export_exportPath) + "\\"
 
     # Check for availability of Havok SFM
     result = check_toolpath(self, context, preferences.havok_path, "Havok Standalone Filter Manager", "hctStandAloneFilterManager.exe")
     if not result == {'CONTINUE'}:
         return result
 
+    # The job's steps must not access Blender data, so tool paths and options are resolved beforehand.
+    havok_options = get_hko_content()
+    for target in targets:
+        target.settings = ExportSettings(scene, None, target=target)
+        target.settings.resolve_tool_paths()
+
     if 'hkt' in collections and not collections['hkt'] is None and collections['hkt'] != []:
         for col in collections['hkt']:
 
             # Use external file
             if col.seut.hkt_file != "":
-                shutil.copyfile(get_abs_path(col.seut.hkt_file), join(path, f"{get_col_filename(col)}.hkt"))
+                for target in targets:
+                    shutil.copyfile(get_abs_path(col.seut.hkt_file), join(target.get_abs_path(), f"{get_col_filename(col, target)}.hkt"))
 
             else:
                 result = check_collection(self, context, scene, col, True)
@@ -295,30 +346,41 @@ def export_hkt(self, context):
                     seut_report(self, context, 'ERROR', True, 'E022', col.name, len(col.objects))
                     continue
 
-                fbx_hkt_file = join(path, f"{get_col_filename(col)}.hkt.fbx")
-                hkt_file = join(path, f"{get_col_filename(col)}.hkt")
+                for target in targets:
+                    path = target.get_abs_path()
+                    fbx_hkt_file = join(path, f"{get_col_filename(col, target)}.hkt.fbx")
+                    hkt_file = join(path, f"{get_col_filename(col, target)}.hkt")
+
+                    key = f"{get_col_filename(col, target)}.hkt"
+                    if target.manifest is not None and target.manifest.is_current(key):
+                        print(f"SEUT: Collision of collection '{col.name}' for '{target.subtype_id}' is up to date.")
+                        continue
+
+                    # Export as FBX
+                    with profile_stage(STAGE_FBX, scene.name, col.name, target.subtype_id):
+                        export_to_fbxfile(target.settings, scene, fbx_hkt_file, col.objects, ishavokfbxfile=True, rescale_factor=target.rescale_factor)
 
-                # Export as FBX
-                export_to_fbxfile(settings, scene, fbx_hkt_file, col.objects, ishavokfbxfile=True)
+                    # Then create the HKT file.
+                    target.job.add_step(f"FBX Importer ({col.name})", convert_fbx_to_fbxi_hkt, context, target.settings, fbx_hkt_file, hkt_file, stage=STAGE_FBXIMPORTER, collection=col.name)
+                    target.job.add_step(f"Havok ({col.name})", convert_fbxi_hkt_to_hkt, self, context, target.settings, hkt_file, hkt_file, None, havok_options, stage=STAGE_HAVOK, collection=col.name)
 
-                # Then create the HKT file.
-                convert_fbx_to_fbxi_hkt(context, settings, fbx_hkt_file, hkt_file)
-                convert_fbxi_hkt_to_hkt(self, context, settings, hkt_file, hkt_file)
+                    if target.manifest is not None:
+                        target.manifest.record(key, [hkt_file])
 
     return {'FINISHED'}
 
 
-def export_bs(self, context):
+def export_bs(self, context, targets: list):
     """Exports Build Stage collections"""
 
     scene = context.scene
     bs_cols = get_cols_by_type(scene, 'bs')
-    result = check_export_col_dict(self, context, bs_cols)
+    result = check_export_col_dict(self, context, bs_cols, targets)
     
     return result
 
 
-def export_lod(self, context):
+def export_lod(self, context, targets: list):
     """Exports LOD collections"""
 
     scene = context.scene
@@ -326,14 +388,14 @@ def export_lod(self, context):
 
     # Normal LODs
     lod_cols = get_cols_by_type(scene, 'lod', collections['main'][0])
-    result_normal = check_export_col_dict(self, context, lod_cols)
+    result_normal = check_export_col_dict(self, context, lod_cols, targets)
 
     # BS LODs
     if 'bs' in collections:
         if collections['bs'] is not None:
             for ref_col in collections['bs']:
                 lod_cols = get_cols_by_type(scene, 'lod', ref_col)
-                result_bslod = check_export_col_dict(self, context, lod_cols)
+                result_bslod = check_export_col_dict(self, context, lod_cols, targets)
                 if result_bslod == {'CANCELLED'}:
                     return {'CANCELLED'}
 
@@ -343,7 +405,7 @@ def export_lod(self, context):
     return {'FINISHED'}
 
 
-def check_export_col_dict(self, context, cols: dict):
+def check_export_col_dict(self, context, cols: dict, targets: list):
     scene = context.scene
     first_free_idx = get_first_free_index(cols)
 
@@ -373,24 +435,53 @@ def check_export_col_dict(self, context, cols: dict):
                 if scene.seut.sceneType == 'character' and check_weights(context, obj) is False:
                     return {'CANCELLED'}
             
-            results = export_collection(self, context, col)
+            results = export_collection(self, context, col, targets)
             if {'CANCELLED'} in results:
                 return {'CANCELLED'}
 
 
-def export_mwm(self, context):
-    """Compiles to MWM from the previously exported temp files"""
+def export_mwm(self, context, target: ExportTarget):
+    """Adds the compilation to MWM from the previously exported temp files to the target's job"""
     
     scene = context.scene
     preferences = get_preferences()
-    path = get_abs_path(scene.seut.export_exportPath)
+    path = target.get_abs_path()
     materials_path = os.path.join(get_abs_path(preferences.asset_path), 'Materials')
     collections = get_collections(scene)
+    job = target.job
+    manifest = target.manifest
+
+    settings = ExportSettings(scene, None, target=target)
+    settings.resolve_tool_paths()
+    mwmfile = join(path, target.subtype_id + ".mwm")
+
+    # If there are empty collision collections for BS collections, do not duplicate main's HKT for them.
+    excluded_bses = []
+    if 'hkt' in collections and not collections['hkt'] is None and collections['hkt'] != []:
+        for col in collections['hkt']:
+            if col.seut.ref_col is None:
+                seut_report(self, context, 'INFO', False, 'I022', col.name)
+                continue
+            if col.seut.ref_col.seut.col_type == 'bs' and len(col.objects) == 0:
+                excluded_bses.append(f"{target.subtype_id}_BS{col.seut.ref_col.seut.type_index}.fbx")
+
+    job.add_step("Collision", duplicate_main_hkt, path, target.subtype_id, excluded_bses)
+    job.add_step("MWM Builder", mwmbuilder, self, context, path, path, settings, mwmfile, materials_path, stage=STAGE_MWMBUILDER)
+
+    if manifest is not None:
+        mwmfiles = [f"{key}.mwm" for key in manifest.digests if key != 'mwm' and not key.endswith('.hkt')]
+        manifest.record('mwm', mwmfiles)
+
+        # Files that are being rebuilt must not be considered current if the job fails.
+        manifest.save()
+        job.add_step("Build Manifest", manifest.commit)
+
+    return {'FINISHED'}
+
 
-    settings = ExportSettings(scene, None)
-    mwmfile = join(path, scene.seut.subtypeId + ".mwm")
+def duplicate_main_hkt(path: str, subtype_id: str, excluded_bses: list):
+    """Duplicates the HKT of the main collection for all BS collections if it is the only one. Runs as part of an export job."""
 
-    # This duplicates HKTs if none are defined for BS but one exists for main.
     hkts = []
     bses = []
     for f in os.listdir(path):
@@ -399,38 +490,25 @@ def export_mwm(self, context):
         if os.path.isdir(f):
             continue
 
-        if f == f"{scene.seut.subtypeId}.hkt" or (f"{scene.seut.subtypeId}_BS" in f and os.path.splitext(f)[1] == '.hkt'):
+        if f == f"{subtype_id}.hkt" or (f.startswith(f"{subtype_id}_BS") and os.path.splitext(f)[1] == '.hkt'):
             hkts.append(f)
 
-        elif f"{scene.seut.subtypeId}_BS" in f and os.path.splitext(f)[1] == '.fbx':
+        elif f.startswith(f"{subtype_id}_BS") and os.path.splitext(f)[1] == '.fbx' and f not in excluded_bses:
             bses.append(f)
 
-    # If there are empty collision collections for BS collections, do not duplicate main's HKT for them.
-    if 'hkt' in collections and not collections['hkt'] is None and collections['hkt'] != []:
-        for col in collections['hkt']:
-            if col.seut.ref_col is None:
-                seut_report(self, context, 'INFO', False, 'I022', col.name)
-                continue
-            if col.seut.ref_col.seut.col_type == 'bs' and len(col.objects) == 0:
-                bses.remove(f"{scene.seut.subtypeId}_BS{col.seut.ref_col.seut.type_index}.fbx")
-
     if len(hkts) == 1:
         if not "_BS" in os.path.basename(hkts[0]):
             for bs in bses:
                 shutil.copyfile(os.path.join(path, hkts[0]), os.path.join(path, os.path.splitext(bs)[0] + '.hkt'))
 
-    mwmbuilder(self, context, path, path, settings, mwmfile, materials_path)
-
-    return {'FINISHED'}
 
-
-def export_sbc(self, context):
+def export_sbc(self, context, target: ExportTarget):
     """Exports to SBC"""
 
     scene = context.scene
     collections = get_collections(scene)
     path_data = os.path.join(get_abs_path(scene.seut.mod_path), "Data")
-    path_models = get_abs_path(scene.seut.export_exportPath)
+    path_models = target.get_abs_path()
 
     # Checks whether collection exists, is excluded or is empty
     result = check_collection(self, context, scene, collections['main'][0], False)
@@ -440,7 +518,7 @@ def export_sbc(self, context):
     # 3 options: no file and no entry, file but no entry, file and entry
 
     # Create XML tree and add initial parameters.
-    output = get_relevant_sbc(os.path.dirname(path_data), 'CubeBlocks', 'Definition', scene.seut.subtypeId)
+    output = get_relevant_sbc(os.path.dirname(path_data), 'CubeBlocks', 'Definition', target.subtype_id)
     if output is not None:
         file_to_update = output[0]
         lines = output[1]
@@ -449,7 +527,7 @@ def export_sbc(self, context):
     
     if output is not None and start is not None and end is not None and scene.seut.export_sbc_type == 'update':
         update_sbc = True
-        lines_entry = lines[start:end]
+        lines_entry = SBCPatch(lines, start, end)
         definitions = None
         def_definition = None
     else:
@@ -466,28 +544,28 @@ def export_sbc(self, context):
 
         def_Id = add_subelement(def_definition, 'Id')
         add_subelement(def_Id, 'TypeId', 'CubeBlock')
-        add_subelement(def_Id, 'SubtypeId', scene.seut.subtypeId)
+        add_subelement(def_Id, 'SubtypeId', target.subtype_id)
 
-        add_subelement(def_definition, 'DisplayName', '{LOC:DisplayName_' + scene.seut.subtypeId + '}')
-        add_subelement(def_definition, 'Description', '{LOC:Description_' + scene.seut.subtypeId + '}')
+        add_subelement(def_definition, 'DisplayName', '{LOC:DisplayName_' + target.subtype_id + '}')
+        add_subelement(def_definition, 'Description', '{LOC:Description_' + target.subtype_id + '}')
 
     icon_path = 'Textures\GUI\Icons\AstronautBackpack.dds'
-    icon_target_path = get_abs_path(os.path.join(scene.render.filepath, scene.seut.subtypeId + '.dds'))
+    icon_target_path = get_abs_path(os.path.join(scene.render.filepath, target.subtype_id + '.dds'))
     if (os.path.exists(icon_target_path) or os.path.exists(os.path.splitext(icon_target_path)[0] + '.png')) and icon_target_path.find('Textures') != -1:
-        icon_path = os.path.join('Textures', icon_target_path.split('Textures\\')[1])
+        icon_path = os.path.join('Textures', icon_target_path.split('Textures' + os.sep)[1])
     lines_entry = update_add_subelement(def_definition, 'Icon', icon_path, update_sbc, lines_entry)
 
     medium_grid_scalar = 1.0 # default to doing nothing unless the 3to5 mode is detected
 
-    if scene.seut.gridScale == 'large':
+    if target.grid_scale == 'large':
         lines_entry = update_add_subelement(def_definition, 'CubeSize', 'Large', update_sbc, lines_entry)
         grid_size = 2.5
-        if (abs(scene.seut.export_rescaleFactor - 3) < 0.01): # floating point comparison
+        if (abs(target.rescale_factor - 3) < 0.01): # floating point comparison
             medium_grid_scalar = 0.6 # Large grid block is going to be 3/5 of the expected size
-    elif scene.seut.gridScale == 'small':
+    elif target.grid_scale == 'small':
         lines_entry = update_add_subelement(def_definition, 'CubeSize', 'Small', update_sbc, lines_entry)
         grid_size = 0.5
-        if (abs(scene.seut.export_rescaleFactor - 0.6) < 0.01): # floating point comparison
+        if (abs(target.rescale_factor - 0.6) < 0.01): # floating point comparison
             medium_grid_scalar = 3.0 # Small grid block is going to be 3 times larger than expected
     
     def_Size = 'Size'
@@ -521,7 +599,7 @@ def export_sbc(self, context):
         add_attrib(def_ModelOffset, 'z', 0)
 
     # Model
-    lines_entry = update_add_subelement(def_definition, 'Model', os.path.join(create_relative_path(path_models, "Models"), scene.seut.subtypeId + '.mwm'), update_sbc, lines_entry)
+    lines_entry = update_add_subelement(def_definition, 'Model', os.path.join(create_relative_path(path_models, "Models"), target.subtype_id + '.mwm'), update_sbc, lines_entry)
 
     # Components
     if not update_sbc:
@@ -540,8 +618,8 @@ def export_sbc(self, context):
     
     if len(scene.seut.mountpointAreas) > 0:
 
-        # gridScale here is modified when exporting both types, use rescaleFactor to determine original gridScale used to define mountpoints
-        if (scene.seut.gridScale == 'small' and scene.seut.export_rescaleFactor > 0.99) or (scene.seut.gridScale == "large" and scene.seut.export_rescaleFactor > 1.01):
+        # Mountpoints are defined in the scene's grid size, regardless of the target's.
+        if scene.seut.gridScale == 'small':
             scale = 0.5
         else:
             scale = 2.5
@@ -624,23 +702,23 @@ def export_sbc(self, context):
                     if end_y > scene.seut.bBox_Y:
                         end_y = scene.seut.bBox_Y
 
-                # Need to do this to prevent ET from auto-rearranging keys.
-                add_attrib(def_Mountpoint, 'a_Side', side_name)
-                add_attrib(def_Mountpoint, 'b_StartX', "{:.2f}".format(round(start_x * medium_grid_scalar, 2)))
-                add_attrib(def_Mountpoint, 'c_StartY', "{:.2f}".format(round(start_y * medium_grid_scalar, 2)))
-                add_attrib(def_Mountpoint, 'd_EndX', "{:.2f}".format(round(end_x * medium_grid_scalar, 2)))
-                add_attrib(def_Mountpoint, 'e_EndY', "{:.2f}".format(round(end_y * medium_grid_scalar, 2)))
+                # Attributes are written in the order they are added.
+                add_attrib(def_Mountpoint, 'Side', side_name)
+                add_attrib(def_Mountpoint, 'StartX', "{:.2f}".format(round(start_x * medium_grid_scalar, 2)))
+                add_attrib(def_Mountpoint, 'StartY', "{:.2f}".format(round(start_y * medium_grid_scalar, 2)))
+                add_attrib(def_Mountpoint, 'EndX', "{:.2f}".format(round(end_x * medium_grid_scalar, 2)))
+                add_attrib(def_Mountpoint, 'EndY', "{:.2f}".format(round(end_y * medium_grid_scalar, 2)))
 
                 if area.properties_mask:
-                    add_attrib(def_Mountpoint, 'f_PropertiesMask', str(area.properties_mask).lower())
+                    add_attrib(def_Mountpoint, 'PropertiesMask', str(area.properties_mask).lower())
                 if area.exclusion_mask:
-                    add_attrib(def_Mountpoint, 'g_ExclusionMask', str(area.exclusion_mask).lower())
+                    add_attrib(def_Mountpoint, 'ExclusionMask', str(area.exclusion_mask).lower())
                 if not area.enabled:
-                    add_attrib(def_Mountpoint, 'h_Enabled', str(area.enabled).lower())
+                    add_attrib(def_Mountpoint, 'Enabled', str(area.enabled).lower())
                 if area.default:
-                    add_attrib(def_Mountpoint, 'i_Default', str(area.default).lower())
+                    add_attrib(def_Mountpoint, 'Default', str(area.default).lower())
                 if area.pressurized:
-                    add_attrib(def_Mountpoint, 'j_PressurizedWhenOpen', str(area.pressurized).lower())
+                    add_attrib(def_Mountpoint, 'PressurizedWhenOpen', str(area.pressurized).lower())
 
         if update_sbc:
             lines_entry = convert_back_xml(def_Mountpoints, 'MountPoints', lines_entry)
@@ -670,14 +748,14 @@ def export_sbc(self, context):
                 else:
                     add_attrib(def_BS_Model, 'BuildPercentUpperBound', "{:.2f}".format((bs + 1) * percentage)[:4])
 
-                add_attrib(def_BS_Model, 'File', os.path.join(create_relative_path(path_models, "Models"), scene.seut.subtypeId + '_BS' + str(bs + 1) + '.mwm'))
+                add_attrib(def_BS_Model, 'File', os.path.join(create_relative_path(path_models, "Models"), target.subtype_id + '_BS' + str(bs + 1) + '.mwm'))
             
             if update_sbc:
                 lines_entry = convert_back_xml(def_BuildProgressModels, 'BuildProgressModels', lines_entry)
 
     # BlockPairName
     if not update_sbc:
-        add_subelement(def_definition, 'BlockPairName', scene.seut.subtypeId)
+        add_subelement(def_definition, 'BlockPairName', target.subtype_id)
 
     # Mirroring
     if collections['mirroring'] != None:
@@ -685,24 +763,24 @@ def export_sbc(self, context):
 
     if scene.seut.mirroring_X != 'None':
         lines_entry = update_add_optional_subelement(def_definition, 'MirroringX', scene.seut.mirroring_X, update_sbc, lines_entry)
-    elif update_sbc and scene.seut.mirroring_X == 'None' and get_subelement(lines_entry, 'MirroringX') != -1:
-        lines_entry = lines_entry.replace(get_subelement(lines_entry, 'MirroringX'),"")
+    elif update_sbc and scene.seut.mirroring_X == 'None':
+        lines_entry = remove_subelement(lines_entry, 'MirroringX')
 
     if scene.seut.mirroring_Z != 'None':                                # This looks wrong but SE works with different Axi than Blender
         lines_entry = update_add_optional_subelement(def_definition, 'MirroringY', scene.seut.mirroring_Z, update_sbc, lines_entry)
-    elif update_sbc and scene.seut.mirroring_Z == 'None' and get_subelement(lines_entry, 'MirroringY') != -1:
-        lines_entry = lines_entry.replace(get_subelement(lines_entry, 'MirroringY'),"")
+    elif update_sbc and scene.seut.mirroring_Z == 'None':
+        lines_entry = remove_subelement(lines_entry, 'MirroringY')
 
     if scene.seut.mirroring_Y != 'None':
         lines_entry = update_add_optional_subelement(def_definition, 'MirroringZ', scene.seut.mirroring_Y, update_sbc, lines_entry)
-    elif update_sbc and scene.seut.mirroring_Y == 'None' and get_subelement(lines_entry, 'MirroringZ') != -1:
-        lines_entry = lines_entry.replace(get_subelement(lines_entry, 'MirroringZ'),"")
+    elif update_sbc and scene.seut.mirroring_Y == 'None':
+        lines_entry = remove_subelement(lines_entry, 'MirroringZ')
     
     # If a MirroringScene is defined, set it in SBC but also set the reference to the base scene in the mirror scene SBC
     if scene.seut.mirroringScene is not None and scene.seut.mirroringScene.name in bpy.data.scenes:
         lines_entry = update_add_optional_subelement(def_definition, 'MirroringBlock', scene.seut.mirroringScene.seut.subtypeId, update_sbc, lines_entry)
-    elif update_sbc and scene.seut.mirroringScene == 'None' and get_subelement(lines_entry, 'MirroringBlock') != -1:
-        lines_entry = lines_entry.replace(get_subelement(lines_entry, 'MirroringBlock'),"")
+    elif update_sbc and scene.seut.mirroringScene == 'None':
+        lines_entry = remove_subelement(lines_entry, 'MirroringBlock')
     
     mirroringcenter_empty = None
     for obj in collections['main'][0].objects:
@@ -722,35 +800,14 @@ def export_sbc(self, context):
 
     # Write to file, place in export folder
     if not update_sbc:
-        temp_string = ET.tostring(definitions, 'utf-8')
-        try:
-            temp_string.decode('ascii')
-        except UnicodeDecodeError:
+        xml_formatted = serialize_xml(definitions)
+        if not xml_formatted.isascii():
             seut_report(self, context, 'ERROR', True, 'E033')
-        xml_string = xml.dom.minidom.parseString(temp_string)
-        xml_formatted = xml_string.toprettyxml()
-    
-    else:
-        xml_formatted = lines.replace(lines[start:end], lines_entry)
-        xml_formatted = format_entry(xml_formatted)
-        target_file = file_to_update
-
-    # Fixing the entries
-    xml_formatted = xml_formatted.replace("a_Side", "Side")
-    xml_formatted = xml_formatted.replace("b_StartX", "StartX")
-    xml_formatted = xml_formatted.replace("c_StartY", "StartY")
-    xml_formatted = xml_formatted.replace("d_EndX", "EndX")
-    xml_formatted = xml_formatted.replace("e_EndY", "EndY")
-    xml_formatted = xml_formatted.replace("f_PropertiesMask", "PropertiesMask")
-    xml_formatted = xml_formatted.replace("g_ExclusionMask", "ExclusionMask")
-    xml_formatted = xml_formatted.replace("h_Enabled", "Enabled")
-    xml_formatted = xml_formatted.replace("i_Default", "Default")
-    xml_formatted = xml_formatted.replace("j_PressurizedWhenOpen", "PressurizedWhenOpen")
 
     if update_sbc:
         target_file = file_to_update
     else:
-        filename = scene.seut.subtypeId
+        filename = target.subtype_id
         target_file = os.path.join(path_data, "CubeBlocks", filename + ".sbc")
         if not os.path.exists(os.path.join(path_data, "CubeBlocks")):
             os.makedirs(os.path.join(path_data, "CubeBlocks"))
@@ -767,12 +824,15 @@ def export_sbc(self, context):
             except:
                 target_file = target_file + "_1.sbc"
 
-    exported_xml = open(target_file, "w")
-    exported_xml.write(xml_formatted)
+    if update_sbc:
+        if not write_sbc_patch(self, context, target_file, lines_entry, target.subtype_id):
+            return {'CANCELLED'}
+    elif write_xml_file(self, context, target_file, xml_formatted) is None:
+        return {'CANCELLED'}
 
     if not update_sbc:
         seut_report(self, context, 'INFO', False, 'I004', target_file)
     else:
-        seut_report(self, context, 'INFO', False, 'I015', scene.seut.subtypeId, target_file)
+        seut_report(self, context, 'INFO', False, 'I015', target.subtype_id, target_file)
 
     return {'FINISHED'}
\ No newline at end of file
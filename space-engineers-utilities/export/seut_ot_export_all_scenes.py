@@ -7,9 +7,14 @@ from ..utils.seut_tool_utils    import get_tool_dir
 from ..seut_errors              import *
 from ..seut_utils               import prep_context, get_preferences
 from .seut_ot_export            import export
+from .seut_export_jobs          import JobRunnerOperator, is_running_jobs
+from .seut_export_jobs          import begin_deferred_jobs, end_deferred_jobs, run_deferred_jobs, discard_deferred_jobs
+from ..utils.seut_xml_utils     import begin_sbc_batch, end_sbc_batch, discard_sbc_batch
+from ..utils.seut_texture_cache import begin_texture_batch, end_texture_batch
+from ..utils.seut_profiler      import begin_profile, end_profile, discard_profile, profile_stage, STAGE_SBC
 
 
-class SEUT_OT_ExportAllScenes(Operator):
+class SEUT_OT_ExportAllScenes(JobRunnerOperator, Operator):
     """Exports all collections in all scenes and compresses them to MWM.\nScene needs to be in Object mode for export to be available"""
     bl_idname = "scene.export_all_scenes"
     bl_label = "Export All Scenes"
@@ -18,11 +23,37 @@ class SEUT_OT_ExportAllScenes(Operator):
 
     @classmethod
     def poll(cls, context):
-        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT'
+        return context.area.type == 'VIEW_3D' and context.mode == 'OBJECT' and not is_running_jobs()
 
 
     def execute(self, context):
         """Exports all collections in all scenes and compresses them to MWM."""
+
+        result = self.export_scenes(context)
+        if result != {'FINISHED'}:
+            end_profile(self, context)
+            return result
+
+        return self.finish_jobs(context, run_deferred_jobs(), False)
+
+
+    def invoke(self, context, event):
+        """Exports all collections in all scenes, then runs the tools in the background."""
+
+        result = self.export_scenes(context)
+        if result != {'FINISHED'}:
+            end_profile(self, context)
+            return result
+
+        jobs = end_deferred_jobs()
+        if jobs == []:
+            return self.finish_jobs(context, jobs, False)
+
+        return self.start_jobs(context, jobs)
+
+
+    def export_scenes(self, context):
+        """Exports all scenes. Their tool steps are queued to be run in parallel afterwards."""
         
         preferences = get_preferences()
 
@@ -52,33 +83,75 @@ class SEUT_OT_ExportAllScenes(Operator):
         current_area = prep_context(context)
         original_scene = context.window.scene
 
-        scene_counter = 0
-        failed_counter = 0
+        self.scene_counter = 0
+        self.failed_scenes = []
+
+        # The Blender side of each export runs scene by scene, the tool steps are run in parallel afterwards.
+        # Updated SBC files are written once all scenes have been exported.
+        begin_profile(preferences.profile_export)
+        begin_deferred_jobs()
+        begin_sbc_batch()
+        begin_issue_batch()
+        begin_texture_batch()
+        try:
+            for scn in bpy.data.scenes:
 
-        for scn in bpy.data.scenes:
+                if 'SEUT' not in scn.view_layers:
+                    continue
 
-            if 'SEUT' not in scn.view_layers:
-                continue
+                if scn.seut.sceneType in ['mainScene','subpart','character','character_animation',]:
 
-            if scn.seut.sceneType in ['mainScene','subpart','character','character_animation',]:
+                    self.scene_counter += 1
+                    context.window.scene = scn
 
-                scene_counter += 1
-                context.window.scene = scn
+                    try:
+                        result = export(self, context)
 
-                try:
-                    result = export(self, context)
+                        if result != {'FINISHED'}:
+                            self.failed_scenes.append(scn.name)
 
-                    if result != {'FINISHED'}:
-                        failed_counter += 1
-                        seut_report(self, context, 'ERROR', True, 'E016', scn.name)
+                    except RuntimeError:
+                        self.failed_scenes.append(scn.name)
+
+        except Exception:
+            discard_deferred_jobs()
+            discard_sbc_batch()
+            discard_profile()
+            raise
+
+        finally:
+            end_issue_batch()
+            end_texture_batch()
+            context.window.scene = original_scene
+            context.area.type = current_area
+
+        with profile_stage(STAGE_SBC, "All Scenes"):
+            end_sbc_batch(self, context)
+
+        return {'FINISHED'}
+
+
+    def finish_jobs(self, context, jobs: list, cancelled: bool) -> set:
+        """Displays the reports of all jobs and a summary of the export."""
+
+        failed_scenes = self.failed_scenes
+
+        for job in jobs:
+            job.replay_reports(self, context)
+            if not job.result and job.scene_name not in failed_scenes:
+                failed_scenes.append(job.scene_name)
+
+        end_profile(self, context)
+
+        if cancelled:
+            seut_report(self, context, 'WARNING', True, 'W021', "All Scenes")
+            return {'CANCELLED'}
 
-                except RuntimeError:
-                    failed_counter += 1
-                    seut_report(self, context, 'ERROR', True, 'E016', scn.name)
+        for scn_name in failed_scenes:
+            seut_report(self, context, 'ERROR', True, 'E016', scn_name)
 
-        context.window.scene = original_scene
-        context.area.type = current_area
+        failed_counter = len(failed_scenes)
 
-        seut_report(self, context, 'INFO', True, 'I008', scene_counter - failed_counter, scene_counter)
+        seut_report(self, context, 'INFO', True, 'I008', self.scene_counter - failed_counter, self.scene_counter)
 
         return {'FINISHED'}
\ No newline at end of file
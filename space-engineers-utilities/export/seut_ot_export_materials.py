@@ -1,12 +1,12 @@
 import bpy
 import os
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
 
 from bpy.types  import Operator
 
-from .seut_export_utils import create_mat_entry, format_xml
-from ..seut_errors      import seut_report, get_abs_path
+from .seut_export_utils         import create_mat_entry, format_xml
+from ..utils.seut_xml_utils     import write_xml_file
+from ..seut_errors              import seut_report, get_abs_path
 
 
 class SEUT_OT_ExportMaterials(Operator):
@@ -57,8 +57,8 @@ def export_materials(self, context):
     # Create file with subtypename + collection name and write string to it
     xml_formatted = format_xml(self, context, materials)
     
-    exported_xml = open(bpy.path.abspath('//') + filename + ".xml", "w")
-    exported_xml.write(xml_formatted)
+    if write_xml_file(self, context, bpy.path.abspath('//') + filename + ".xml", xml_formatted) is None:
+        return {'CANCELLED'}
 
     seut_report(self, context, 'INFO', True, 'I004', bpy.path.abspath('//') + filename + ".xml")
 
@@ -10,6 +10,10 @@ from ..seut_errors                  import seut_report, get_abs_path
 from ..seut_utils                   import create_relative_path, get_preferences, get_seut_blend_data
 
 
+# Number of textures converted per texconv call, and the limit for the length of their paths, to stay well below the command line length limit of Windows.
+TEXCONV_BATCH_SIZE = 16
+TEXCONV_MAX_CMDLINE = 8000
+
 presets = {
     "icon": [None, None, '-ft', 'DDS', '-f', 'BC7_UNORM_SRGB', '-pmalpha', '-sRGB', '-y', '-o', None],
     "cm": [None, None, '-ft', 'DDS', '-f', 'BC7_UNORM_SRGB', '-sepalpha', '-sRGB', '-y', '-o', None],
@@ -84,22 +88,15 @@ class SEUT_OT_ConvertTextures(Operator):
                 seut_report(self, context, 'ERROR', True, 'E046', "texture conversion", result[1])
                 return {'CANCELLED'}
         else:
-            results = mass_convert_textures(self, context, [get_abs_path(data.seut.texconv_input_dir)], output_path, data.seut.texconv_preset, settings)
-            converted = 0
-            for r in results:
-                if r[0] == 0:
-                    converted += 1
-
-            if converted == 0:
+            result = mass_convert_textures(self, context, [get_abs_path(data.seut.texconv_input_dir)], output_path, data.seut.texconv_preset, settings, can_report=True)
+            if result == {'CANCELLED'}:
                 return {'CANCELLED'}
-            else:
-                seut_report(self, context, 'INFO', True, 'I009', converted, "")
         
         return {'FINISHED'}
         
 
 class SEUT_OT_MassConvertTextures(Operator):
-    """Mass converts DDS textures to TIF.\nWARNING: This can lock up Blender for up to 30min for a full conversion"""
+    """Mass converts DDS textures to TIF.\nThe conversion runs in the background and can take a while for a full conversion. Press Esc to cancel it"""
     bl_idname = "wm.mass_convert_textures"
     bl_label = "Update Textures from Game Files"
     bl_options = {'REGISTER', 'UNDO'}
@@ -114,6 +111,79 @@ class SEUT_OT_MassConvertTextures(Operator):
     def execute(self, context):
 
         data = get_seut_blend_data()
+        target_dir, dirs_to_convert, skip_list = self.get_dirs()
+
+        result = mass_convert_textures(self, context, dirs_to_convert, target_dir, data.seut.setup_conversion_filetype.lower(), skip_list=skip_list, log_to_file=True, can_report=True)
+
+        return result
+
+
+    def invoke(self, context, event):
+
+        data = get_seut_blend_data()
+        target_dir, dirs_to_convert, skip_list = self.get_dirs()
+        preset = data.seut.setup_conversion_filetype.lower()
+
+        files_to_convert, output_type = get_textures_to_convert(dirs_to_convert, target_dir, preset, skip_list=skip_list)
+        if files_to_convert == []:
+            seut_report(self, context, 'INFO', True, 'I003')
+            return {'FINISHED'}
+
+        self.batch = TextureConversion(files_to_convert, preset, output_type, logfile=os.path.join(target_dir, 'conversion.log'))
+        self.batch.start()
+        self.timer_start = time.time()
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.5, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+
+        return {'RUNNING_MODAL'}
+
+
+    def modal(self, context, event):
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.batch.cancel()
+            return {'RUNNING_MODAL'}
+
+        if event.type != 'TIMER' or event.timer != self.timer:
+            return {'PASS_THROUGH'}
+
+        for r in self.batch.collect():
+            print_conversion_result(r, self.batch.output_type)
+
+        if not self.batch.is_done():
+            context.window_manager.progress_update(int(self.batch.get_progress() * 100))
+            if self.batch.cancelled:
+                context.workspace.status_text_set("SEUT: Cancelling texture conversion...")
+            else:
+                context.workspace.status_text_set(f"SEUT: Converting textures - {len(self.batch.results)} of {self.batch.total} files converted - Press Esc to cancel")
+            return {'PASS_THROUGH'}
+
+        self.finish(context)
+
+        return report_conversion(self, context, self.batch.results, self.batch.total, time.time() - self.timer_start, True)
+
+
+    def cancel(self, context):
+        self.batch.cancel()
+        self.batch.wait()
+        self.finish(context)
+
+
+    def finish(self, context):
+        self.batch.close()
+
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+
+    def get_dirs(self) -> tuple:
+        """Returns the target directory, the game's texture directories to convert and the texture types to skip."""
+
         preferences = get_preferences()
         target_dir = os.path.join(preferences.asset_path, 'Textures')
 
@@ -141,13 +211,40 @@ class SEUT_OT_MassConvertTextures(Operator):
         for d in range(0, len(dirs_to_convert)):
             dirs_to_convert[d] = os.path.join(preferences.game_path, 'Content', 'Textures', dirs_to_convert[d])
 
-        result = mass_convert_textures(self, context, dirs_to_convert, target_dir, data.seut.setup_conversion_filetype.lower(), skip_list=skip_list, log_to_file=True, can_report=True)
-
-        return result
+        return target_dir, dirs_to_convert, skip_list
 
 
 def mass_convert_textures(self, context, dirs: list, target_dir: str, preset: str, settings: list = [], skip_list: list = [], log_to_file=False, can_report=False):
 
+    files_to_convert, output_type = get_textures_to_convert(dirs, target_dir, preset, settings, skip_list)
+
+    total = len(files_to_convert)
+    if total > 0:
+        if log_to_file:
+            logfile = os.path.join(target_dir, 'conversion.log')
+        else:
+            logfile = None
+
+        timer = time.time()
+        batch = TextureConversion(files_to_convert, preset, output_type, settings, logfile)
+        batch.start()
+
+        while not batch.is_done():
+            for r in batch.collect(None):
+                print_conversion_result(r, output_type)
+        batch.close()
+
+        return report_conversion(self, context, batch.results, total, time.time() - timer, can_report)
+
+    else:
+        seut_report(self, context, 'INFO', can_report, 'I003')
+
+    return {'FINISHED'}
+
+
+def get_textures_to_convert(dirs: list, target_dir: str, preset: str, settings: list = [], skip_list: list = []) -> tuple:
+    """Returns the source and target of all textures in the directories that are missing or outdated in the target directory, and the output file type."""
+
     if preset == 'custom':
         idx_ft = settings.index('-ft')
         output_type = settings[idx_ft + 1]
@@ -184,45 +281,175 @@ def mass_convert_textures(self, context, dirs: list, target_dir: str, preset: st
                 if not os.path.exists(target) or os.path.getmtime(source) > os.path.getmtime(target):
                     files_to_convert.append([os.path.join(tex_dir, file), target])
 
-    commands = []
     for tex in files_to_convert:
         os.makedirs(os.path.dirname(tex[1]), exist_ok=True)    
-        commands.append(get_conversion_args(preset, tex[0], os.path.dirname(tex[1]), settings))
 
-    total = len(files_to_convert)
-    if total > 0:
-        if log_to_file:
-            logfile = os.path.join(target_dir, 'conversion.log')
-        else:
-            logfile = None
+    return files_to_convert, output_type
+
+
+class TextureConversion:
+    """Converts textures with one texconv call per batch of files sharing an output directory,
+    which saves starting a process for every file. The result of each file is taken from the output of its batch."""
+
+    def __init__(self, files_to_convert: list, preset: str, output_type: str, settings: list = [], logfile=None, batch_size: int = TEXCONV_BATCH_SIZE):
+        self.preset = preset
+        self.output_type = output_type
+        self.settings = settings
+        self.total = len(files_to_convert)
+        self.results = []
+        self.files = {}
+
+        by_dir = {}
+        for source, target in files_to_convert:
+            by_dir.setdefault(os.path.dirname(target), []).append((source, target))
+
+        commands = []
+        for target_dir, files in by_dir.items():
+            # Largest files first, so batches of large files are started before batches of small ones.
+            files.sort(key=lambda f: get_file_size(f[0]), reverse=True)
+
+            batch = []
+            length = 0
+            for source, target in files:
+                if batch != [] and (len(batch) >= batch_size or length + len(source) > TEXCONV_MAX_CMDLINE):
+                    commands.append(self.add_batch(target_dir, batch))
+                    batch = []
+                    length = 0
+                batch.append((source, target))
+                length += len(source) + 3
+            
+            if batch != []:
+                commands.append(self.add_batch(target_dir, batch))
+
+        self.batch = ToolBatch(commands, logfile, sort_key=self.get_batch_size, keep_output=True)
+
+
+    def add_batch(self, target_dir: str, files: list) -> list:
+        args = get_conversion_args(self.preset, None, target_dir, self.settings)
+        args = args[:1] + args[2:] + [source for source, target in files]
+        self.files[tuple(args)] = files
+
+        return args
+
+
+    def get_batch_size(self, args: list) -> int:
+        return sum(get_file_size(source) for source, target in self.files[tuple(args)])
+
+
+    @property
+    def cancelled(self) -> bool:
+        return self.batch.cancelled
+
+
+    def start(self):
+        self.batch.start()
+
+
+    def collect(self, timeout: float = 0) -> list:
+        """Returns the results of all files whose batches finished since the last collection."""
 
-        timer = time.time()
         results = []
-        results = call_tool_threaded(commands, 10, logfile)
-        duration = time.time() - timer
-
-        converted = 0
-        for r in results:
-            idx_o = r[2].index('-o')
-            target_file = os.path.join(r[2][idx_o + 1], os.path.splitext(os.path.basename(r[2][1]))[0] + '.' + output_type)
-            if r[0] == 0:
-                converted += 1
-                print(f"OK    - {target_file}")
-            else:
-                print(f"ERROR - {target_file}")
-                print(r[1])
+        for result in self.batch.collect(timeout):
+            results += self.split_result(result)
 
-        if converted == 0:
-            return {'CANCELLED'}
+        self.results += results
 
-        elif duration > 60:
-            m, s = divmod(duration, 60)
-            seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {m}m {round(s, 1)}s")
-        else:
-            seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {round(duration, 1)}s")
+        return results
+
+
+    def split_result(self, result: ToolResult) -> list:
+        """Splits the result of a batch into a result per file. A file counts as converted if texconv did not report a failure for it and its output was written."""
 
+        files = self.files[tuple(result.args)]
+        started = time.time() - result.duration
+
+        sections = {}
+        current = None
+        lines = result.output.decode('utf-8', 'ignore').splitlines() if result.output is not None else []
+        for line in lines:
+            if line.startswith("reading "):
+                current = None
+                for source, target in files:
+                    if source in line:
+                        current = source
+                        break
+            if current is not None:
+                sections.setdefault(current, []).append(line)
+
+        results = []
+        for source, target in files:
+            section = "\n".join(sections.get(source, []))
+
+            # Allow for the timestamp resolution of the filesystem.
+            written = os.path.exists(target) and os.path.getmtime(target) >= started - 2
+            returncode = 0 if written and section.find("FAILED") == -1 else 1
+            if returncode != 0 and section == "":
+                section = result.output.decode('utf-8', 'ignore') if result.output is not None else "Cancelled"
+
+            args = get_conversion_args(self.preset, source, os.path.dirname(target), self.settings)
+            results.append(ToolResult(args, returncode, section.encode('utf-8'), result.duration / len(files)))
+
+        return results
+
+
+    def is_done(self) -> bool:
+        return self.batch.is_done()
+
+
+    def get_progress(self) -> float:
+        if self.total == 0:
+            return 1.0
+
+        return len(self.results) / self.total
+
+
+    def cancel(self):
+        self.batch.cancel()
+
+
+    def wait(self) -> list:
+        while not self.is_done():
+            self.collect(None)
+        self.close()
+
+        return self.results
+
+
+    def close(self):
+        self.batch.close()
+
+
+def get_file_size(path: str) -> int:
+
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def print_conversion_result(result: ToolResult, output_type: str):
+
+    idx_o = result.args.index('-o')
+    target_file = os.path.join(result.args[idx_o + 1], os.path.splitext(os.path.basename(result.args[1]))[0] + '.' + output_type)
+    if result.succeeded:
+        print(f"OK    - {target_file}")
     else:
-        seut_report(self, context, 'INFO', can_report, 'I003')
+        print(f"ERROR - {target_file}")
+        print(result.output.decode("utf-8", "ignore"))
+
+
+def report_conversion(self, context, results: list, total: int, duration: float, can_report: bool) -> set:
+
+    converted = len([r for r in results if r.succeeded])
+
+    if converted == 0:
+        return {'CANCELLED'}
+
+    elif duration > 60:
+        m, s = divmod(duration, 60)
+        seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {int(m)}m {round(s, 1)}s")
+    else:
+        seut_report(self, context, 'INFO', can_report, 'I009', f"{converted}/{total}", f" in {round(duration, 1)}s")
 
     return {'FINISHED'}
 
@@ -0,0 +1,481 @@
+import bpy
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+from ..export.seut_build_graph  import hash_mesh, hash_rna, to_hashable
+from ..utils.seut_png_utils     import quantize
+from ..seut_errors              import seut_report, get_abs_path
+from ..seut_utils               import get_preferences
+
+
+BAKE_CACHE_VERSION = 1
+
+# Edge length of the tiles a cube face is baked in.
+TILE_SIZE = 512
+# The preview pass bakes at this fraction of the final resolution, if that is at least the minimum.
+PREVIEW_FACTOR = 8
+PREVIEW_MIN_RESOLUTION = 128
+PREVIEW_SAMPLES = 16
+# Seconds between updates of the baked images while a pass is running.
+IMAGE_UPDATE_INTERVAL = 10.0
+
+UV_MAP_NAME = "SEUT Bake"
+
+# Bake type: (image suffix, channels, color depth)
+bake_types = {
+    'height': ("", 1, '16'),
+    'biome': ("_mat", 3, '8'),
+    'spots': ("_add", 3, '8'),
+}
+
+# Node properties that only affect the node editor.
+node_ui_properties = ('name', 'label', 'location', 'width', 'width_hidden', 'height', 'dimensions', 'select', 'hide', 'color', 'use_custom_color')
+
+
+class PlanetBake:
+    """Bakes the material of the planet's cube faces in tiles, first as a preview at a lower resolution, then at the final resolution.
+    Finished tiles are saved to the cache, so a bake that was cancelled or failed resumes where it stopped."""
+
+    def __init__(self, context):
+        scene = context.scene
+        self.scene = scene
+        self.planet = scene.seut.planet
+        self.bake_type = scene.seut.bake_type
+        self.resolution = int(scene.seut.bake_resolution)
+        self.suffix, self.channels, depth = bake_types[self.bake_type]
+        self.dtype = np.uint16 if depth == '16' else np.uint8
+
+        self.materials = []
+        for slot in self.planet.material_slots:
+            if slot.material is not None and slot.material not in self.materials:
+                self.materials.append(slot.material)
+
+        self.passes = get_bake_passes(self.resolution)
+        self.tiles = []
+        for index, (resolution, preview) in enumerate(self.passes):
+            size = min(TILE_SIZE, resolution)
+            for y in range(0, resolution, size):
+                for x in range(0, resolution, size):
+                    self.tiles.append((index, x, y, size))
+
+        self.done = 0
+        self.restored = 0
+        # Tiles from the start that are in the cache, which are the ones a later bake can reuse.
+        self.saved = 0
+        self.images = {}
+        self.tile_images = {}
+        self.buffers = {}
+        self.uv_created = False
+        self.uv_original = None
+        self.uv_coords = None
+        self.settings = None
+        self.cache_failed = False
+        self.last_update = 0.0
+
+        self.path = get_bake_cache_path(scene, self.bake_type)
+        self.key = None
+
+
+    def start(self, self_op, context):
+        """Prepares the planet and the scene for baking and restores the tiles of a previous bake. Returns False if baking is not possible."""
+
+        if self.materials == []:
+            seut_report(self_op, context, 'ERROR', True, 'E056', self.bake_type, "The planet has no materials.")
+            return False
+
+        mesh = self.planet.data
+        if UV_MAP_NAME in mesh.uv_layers:
+            mesh.uv_layers.remove(mesh.uv_layers[UV_MAP_NAME])
+
+        if mesh.uv_layers.active is None:
+            seut_report(self_op, context, 'ERROR', True, 'E056', self.bake_type, "The planet has no UV map.")
+            return False
+
+        self.key = hash_bake_inputs(context, self)
+
+        self.uv_coords = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        mesh.uv_layers.active.data.foreach_get('uv', self.uv_coords)
+        self.uv_original = mesh.uv_layers.active.name
+
+        uv_layer = mesh.uv_layers.new(name=UV_MAP_NAME, do_init=False)
+        if uv_layer is None:
+            seut_report(self_op, context, 'ERROR', True, 'E056', self.bake_type, "The planet has no free UV map slot.")
+            return False
+        mesh.uv_layers.active = uv_layer
+        self.uv_created = True
+
+        scene = self.scene
+        self.settings = (scene.render.engine, scene.cycles.samples, scene.cycles.use_denoising)
+        scene.render.engine = 'CYCLES'
+        scene.render.bake.use_selected_to_active = False
+        scene.cycles.use_denoising = False
+
+        scene.render.bake.image_settings.color_depth = bake_types[self.bake_type][2]
+        scene.render.bake.image_settings.color_mode = 'BW' if self.channels == 1 else 'RGB'
+        scene.render.bake.image_settings.compression = 0
+
+        for mat in self.materials:
+            self.images[mat] = create_image(mat.name + self.suffix, self.resolution)
+            self.buffers[mat] = np.zeros((self.resolution, self.resolution, self.channels), dtype=self.dtype)
+
+            if 'IMAGE' not in mat.node_tree.nodes:
+                node = mat.node_tree.nodes.new(type='ShaderNodeTexImage')
+                node.name = 'IMAGE'
+
+        self.restore_tiles()
+        if self.restored > 0:
+            seut_report(self_op, context, 'INFO', False, 'I024', self.bake_type, self.restored, len(self.tiles))
+            self.update_images(force=True)
+
+        return True
+
+
+    def restore_tiles(self):
+        """Loads the tiles a previous bake of the same inputs finished. Tiles are baked in order, so they are loaded until the first one is missing."""
+
+        state_file = os.path.join(self.path, 'state.json')
+        try:
+            with open(state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+
+        if state is None or state.get('version') != BAKE_CACHE_VERSION or state.get('key') != self.key:
+            shutil.rmtree(self.path, ignore_errors=True)
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                with open(state_file, 'w') as f:
+                    json.dump({'version': BAKE_CACHE_VERSION, 'key': self.key}, f)
+            except OSError as e:
+                print(f"SEUT: Could not create bake cache '{self.path}': {e}")
+                self.cache_failed = True
+            return
+
+        for tile in self.tiles:
+            try:
+                data = np.load(self.get_tile_path(tile))
+            except (OSError, ValueError):
+                break
+
+            if data.shape != (len(self.materials), tile[3], tile[3], self.channels) or data.dtype != self.dtype:
+                break
+
+            self.store_tile(tile, data)
+            self.done += 1
+
+        self.restored = self.done
+        self.saved = self.done
+
+
+    def bake_next(self, self_op, context) -> bool:
+        """Bakes the next tile. Returns False if baking failed."""
+
+        tile = self.tiles[self.done]
+        index, x, y, size = tile
+        resolution, preview = self.passes[index]
+
+        self.scene.cycles.samples = get_bake_samples(self.scene, preview)
+
+        # Moves the UVs so that the tile covers the UV space, everything outside of it is not baked.
+        coords = self.uv_coords.reshape(-1, 2)
+        offset = np.array([x, y], dtype=np.float32) / resolution
+        moved = (coords - offset) * (resolution / size)
+        # The layer is looked up each time, references to it become invalid when the mesh's layers change.
+        self.planet.data.uv_layers[UV_MAP_NAME].data.foreach_set('uv', moved.ravel())
+        self.planet.data.update()
+
+        for mat in self.materials:
+            node = mat.node_tree.nodes['IMAGE']
+            node.image = self.get_tile_image(mat, size)
+            for n in mat.node_tree.nodes:
+                n.select = False
+            node.select = True
+            mat.node_tree.nodes.active = node
+
+        self.planet.hide_viewport = False
+        self.planet.hide_set(False)
+        self.planet.select_set(True)
+        context.view_layer.objects.active = self.planet
+
+        try:
+            bpy.ops.object.bake(type='EMIT')
+        except RuntimeError as e:
+            seut_report(self_op, context, 'ERROR', True, 'E056', self.bake_type, str(e).strip())
+            return False
+
+        data = np.empty((len(self.materials), size, size, self.channels), dtype=self.dtype)
+        pixels = np.empty(size * size * 4, dtype=np.float32)
+        for i, mat in enumerate(self.materials):
+            self.tile_images[mat].pixels.foreach_get(pixels)
+            data[i] = quantize(pixels.reshape(size, size, 4)[..., :self.channels], self.dtype)
+
+        self.save_tile(self_op, context, tile, data)
+        self.store_tile(tile, data)
+        self.done += 1
+
+        if self.done == len(self.tiles) or self.tiles[self.done][0] != index:
+            self.update_images(force=True)
+        else:
+            self.update_images()
+
+        return True
+
+
+    def store_tile(self, tile: tuple, data: np.ndarray):
+        """Writes a tile into the buffers of the final images. Preview tiles are scaled up to the final resolution."""
+
+        index, x, y, size = tile
+        factor = self.resolution // self.passes[index][0]
+
+        for i, mat in enumerate(self.materials):
+            tile_data = data[i]
+            if factor > 1:
+                tile_data = np.repeat(np.repeat(tile_data, factor, axis=0), factor, axis=1)
+            self.buffers[mat][y * factor:(y + size) * factor, x * factor:(x + size) * factor] = tile_data
+
+
+    def save_tile(self, self_op, context, tile: tuple, data: np.ndarray):
+        """Saves a tile to the cache. The file is replaced in one step, so an interrupted write never leaves a partial tile."""
+
+        if self.cache_failed:
+            return
+
+        path = self.get_tile_path(tile)
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, data)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            seut_report(self_op, context, 'ERROR', False, 'E055', path, e)
+            self.cache_failed = True
+            return
+
+        if self.tiles[self.saved] == tile:
+            self.saved += 1
+
+
+    def update_images(self, force: bool = False):
+        """Copies the buffers into the images, at most every few seconds unless forced."""
+
+        now = time.time()
+        if not force and now - self.last_update < IMAGE_UPDATE_INTERVAL:
+            return
+        self.last_update = now
+
+        scale = np.float32(np.iinfo(self.dtype).max)
+        for mat, image in self.images.items():
+            pixels = np.ones((self.resolution, self.resolution, 4), dtype=np.float32)
+            pixels[..., :3] = self.buffers[mat] / scale
+            image.pixels.foreach_set(pixels.ravel())
+            image.update()
+
+
+    def finish(self, completed: bool):
+        """Restores the planet and the scene. The cache is removed once the bake is complete."""
+
+        mesh = self.planet.data
+        if self.uv_created:
+            mesh.uv_layers.remove(mesh.uv_layers[UV_MAP_NAME])
+            mesh.uv_layers.active = mesh.uv_layers[self.uv_original]
+            self.uv_created = False
+
+        for mat, image in self.images.items():
+            mat.node_tree.nodes['IMAGE'].image = image
+
+        for image in self.tile_images.values():
+            bpy.data.images.remove(image)
+        self.tile_images = {}
+
+        if self.settings is not None:
+            self.scene.render.engine, self.scene.cycles.samples, self.scene.cycles.use_denoising = self.settings
+            self.settings = None
+
+        if completed:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+    def get_tile_image(self, mat, size: int) -> bpy.types.Image:
+        """Returns the image the material's part of a tile is baked to."""
+
+        image = self.tile_images.get(mat)
+        if image is not None and tuple(image.size) != (size, size):
+            bpy.data.images.remove(image)
+            image = None
+
+        if image is None:
+            image = create_image(f"{mat.name}{self.suffix} (Bake Tile)", size)
+            self.tile_images[mat] = image
+
+        return image
+
+
+    def get_tile_path(self, tile: tuple) -> str:
+        index, x, y, size = tile
+        return os.path.join(self.path, f"{index}_{x}_{y}.npy")
+
+
+    def get_progress(self) -> float:
+        return self.done / len(self.tiles)
+
+
+    def get_status(self) -> str:
+        if self.done == len(self.tiles):
+            return f"SEUT: Baking {self.bake_type} map - Finishing..."
+
+        index = self.tiles[self.done][0]
+        resolution, preview = self.passes[index]
+        pass_tiles = [t for t in self.tiles if t[0] == index]
+        current = self.done - self.tiles.index(pass_tiles[0]) + 1
+
+        return f"SEUT: Baking {self.bake_type} map - {'Preview' if preview else 'Final'} pass ({resolution}x{resolution}) - Tile {current} of {len(pass_tiles)} - Press Esc to cancel"
+
+
+    def is_done(self) -> bool:
+        return self.done == len(self.tiles)
+
+
+def get_bake_passes(resolution: int) -> list:
+    """Returns the resolution of each pass and whether it is a preview."""
+
+    passes = []
+    if resolution // PREVIEW_FACTOR >= PREVIEW_MIN_RESOLUTION:
+        passes.append((resolution // PREVIEW_FACTOR, True))
+    passes.append((resolution, False))
+
+    return passes
+
+
+def get_bake_samples(scene, preview: bool) -> int:
+    """Returns the samples per pixel for the scene's bake type. Biome and ore spot maps encode materials as colors,
+    which more than one sample would blend at their borders. Height maps use more samples to smooth the edges between pixels."""
+
+    if scene.seut.bake_type != 'height':
+        return 1
+
+    if preview:
+        return min(scene.seut.bake_samples, PREVIEW_SAMPLES)
+
+    return scene.seut.bake_samples
+
+
+def get_bake_cache_path(scene, bake_type: str) -> str:
+    """Returns the directory the tiles of a bake are kept in. Within the asset directory if it is set, so they are kept between sessions."""
+
+    preferences = get_preferences()
+    if preferences.asset_path == "":
+        path = os.path.join(bpy.app.tempdir, 'Bake')
+    else:
+        path = os.path.join(get_abs_path(preferences.asset_path), 'Cache', 'Bake')
+
+    name = bpy.path.clean_name(f"{os.path.splitext(bpy.path.basename(bpy.data.filepath))[0]}_{scene.name}_{bake_type}")
+
+    return os.path.join(path, name)
+
+
+def hash_bake_inputs(context, bake: PlanetBake) -> str:
+    """Hashes everything that affects the baked tiles: the planet's mesh and materials and the bake settings."""
+
+    h = hashlib.sha1()
+    h.update(f"{BAKE_CACHE_VERSION};{bake.bake_type};{bake.resolution};{TILE_SIZE};{bake.passes!r};".encode())
+    h.update(f"{[get_bake_samples(bake.scene, preview) for resolution, preview in bake.passes]!r};".encode())
+    h.update(f"{to_hashable(bake.planet.matrix_world)!r};".encode())
+
+    depsgraph = context.evaluated_depsgraph_get()
+    planet_eval = bake.planet.evaluated_get(depsgraph)
+    mesh = planet_eval.to_mesh()
+    try:
+        hash_mesh(h, mesh)
+    finally:
+        planet_eval.to_mesh_clear()
+
+    visited = set()
+    for mat in bake.materials:
+        h.update(f"mat={mat.name};".encode())
+        if mat.node_tree is not None:
+            hash_node_tree(h, mat.node_tree, visited)
+
+    return h.hexdigest()
+
+
+def hash_node_tree(h, node_tree, visited: set):
+    """Adds the nodes and links of a node tree and of the node groups within it to the hash. The bake's image node is left out."""
+
+    for node in node_tree.nodes:
+        if node.name == 'IMAGE':
+            continue
+
+        h.update(f"node={node.bl_idname};{node.name};".encode())
+        hash_rna(h, node, node_ui_properties)
+
+        # Pointers are only hashed by name, which does not change if an image's content does.
+        image = getattr(node, 'image', None)
+        if isinstance(image, bpy.types.Image):
+            hash_image(h, image)
+
+        for socket in node.inputs:
+            if hasattr(socket, 'default_value'):
+                h.update(f"{socket.identifier}={to_hashable(socket.default_value)!r};".encode())
+
+        color_ramp = getattr(node, 'color_ramp', None)
+        if color_ramp is not None:
+            h.update(f"{color_ramp.interpolation};{color_ramp.color_mode};".encode())
+            for element in color_ramp.elements:
+                h.update(f"{element.position!r};{to_hashable(element.color)!r};".encode())
+
+        mapping = getattr(node, 'mapping', None)
+        if mapping is not None and hasattr(mapping, 'curves'):
+            for curve in mapping.curves:
+                h.update(f"{[(to_hashable(p.location), p.handle_type) for p in curve.points]!r};".encode())
+
+        if getattr(node, 'node_tree', None) is not None and node.node_tree.name not in visited:
+            visited.add(node.node_tree.name)
+            hash_node_tree(h, node.node_tree, visited)
+
+    for link in node_tree.links:
+        if link.from_node.name == 'IMAGE' or link.to_node.name == 'IMAGE':
+            continue
+        h.update(f"{link.from_node.name}:{link.from_socket.identifier}>{link.to_node.name}:{link.to_socket.identifier};".encode())
+
+
+def hash_image(h, image):
+    """Adds the content of an image to the hash: the path, modification time and size of its file, or its own data if it is packed, generated or has unsaved changes."""
+
+    h.update(f"img={image.name};{image.source};{image.filepath};{image.colorspace_settings.name};{image.alpha_mode};".encode())
+
+    if image.packed_file is not None:
+        h.update(image.packed_file.data)
+    elif image.source == 'GENERATED':
+        h.update(f"{image.generated_type};{image.generated_width};{image.generated_height};{to_hashable(image.generated_color)!r};{image.use_generated_float};".encode())
+    else:
+        path = get_abs_path(image.filepath)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            h.update(f"{stat.st_mtime_ns};{stat.st_size};".encode())
+
+    # Images painted in Blender differ from their file until saved.
+    if image.is_dirty and image.size[0] > 0:
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        h.update(pixels.tobytes())
+
+
+def create_image(name: str, resolution: int) -> bpy.types.Image:
+    if name in bpy.data.images:
+        img = bpy.data.images[name]
+        bpy.data.images.remove(img)
+
+    img = bpy.data.images.new(
+        name=name,
+        width=resolution,
+        height=resolution,
+        alpha=False,
+        float_buffer=True,
+        is_data=True,
+        tiled=False
+    )
+
+    return img
@@ -1,10 +1,15 @@
 import bpy
 import os
+import numpy as np
+
+from concurrent.futures     import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from ..utils.seut_xml_utils import *
 from ..seut_errors          import seut_report
 from ..seut_utils           import get_abs_path, create_relative_path
 from .seut_planet_utils     import *
+from .seut_planet_bake      import PlanetBake
+from ..utils.seut_png_utils import write_png, quantize
 
 def export_planet_sbc(self, context: bpy.types.Context):
     """Saves the SBC values to the mod folder"""
@@ -24,7 +29,7 @@ def export_planet_sbc(self, context: bpy.types.Context):
     
     if output is not None and start is not None and end is not None and scene.seut.export_sbc_type == 'update':
         update_sbc = True
-        lines_entry = lines[start:end]
+        lines_entry = SBCPatch(lines, start, end)
         definitions = None
         def_definition = None
     else:
@@ -129,7 +134,7 @@ def export_planet_sbc(self, context: bpy.types.Context):
     lines_entry = update_add_subelement(def_SurfaceDetail, 'Size', scene.seut.sd_size, update_sbc, lines_entry)
     lines_entry = update_add_subelement(def_SurfaceDetail, 'Scale', scene.seut.sd_scale, update_sbc, lines_entry)
 
-    def_SD_Slope = 'Slope'
+    def_SD_Slope = 'SurfaceDetail/Slope'
     if not update_sbc:
         def_SD_Slope = add_subelement(def_SurfaceDetail, 'Slope')
 
@@ -280,18 +285,9 @@ def export_planet_sbc(self, context: bpy.types.Context):
 
     # Write to file, place in export folder
     if not update_sbc:
-        temp_string = ET.tostring(definitions, 'utf-8')
-        try:
-            temp_string.decode('ascii')
-        except UnicodeDecodeError:
+        xml_formatted = serialize_xml(definitions)
+        if not xml_formatted.isascii():
             seut_report(self, context, 'ERROR', True, 'E033')
-        xml_string = xml.dom.minidom.parseString(temp_string)
-        xml_formatted = xml_string.toprettyxml()
-    
-    else:
-        xml_formatted = lines.replace(lines[start:end], lines_entry)
-        xml_formatted = format_entry(xml_formatted)
-        target_file = file_to_update
 
     if update_sbc:
         target_file = file_to_update
@@ -313,8 +309,11 @@ def export_planet_sbc(self, context: bpy.types.Context):
             except:
                 target_file = target_file + "_1.sbc"
 
-    exported_xml = open(target_file, "w")
-    exported_xml.write(xml_formatted)
+    if update_sbc:
+        if not write_sbc_patch(self, context, target_file, lines_entry, scene.seut.subtypeId):
+            return {'CANCELLED'}
+    elif write_xml_file(self, context, target_file, xml_formatted) is None:
+        return {'CANCELLED'}
 
     if not update_sbc:
         seut_report(self, context, 'INFO', False, 'I004', target_file)
@@ -324,245 +323,318 @@ def export_planet_sbc(self, context: bpy.types.Context):
     return {'FINISHED'}
 
 
-def export_planet_maps(scene: bpy.types.Scene):
-    """Saves the baked images saved in the BLEND file to the mod folder"""
+def export_planet_maps(self, context):
+    """Saves the baked images saved in the BLEND file to the mod folder. The images are encoded and written in parallel."""
+
+    scene = context.scene
+    path = os.path.join(get_abs_path(scene.seut.mod_path), 'Data', 'PlanetDataFiles', scene.seut.subtypeId)
 
     sides = ['front', 'back', 'left', 'right', 'up', 'down']
 
-    for img in bpy.data.images:
+    # Image suffix: whether the map is a 16 bit greyscale map, 8 bit RGB otherwise
+    maps = {}
+    if scene.seut.export_map_height:
+        maps[""] = True
+    if scene.seut.export_map_biome:
+        maps["_mat"] = False
+    if scene.seut.export_map_spots:
+        maps["_add"] = False
+
+    result = {'FINISHED'}
+    futures = {}
+    max_workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
         for side in sides:
-            if img.name == side and scene.seut.export_map_height:
-                filepath = os.path.join(get_abs_path(scene.seut.mod_path), 'Data', 'PlanetDataFiles', scene.seut.subtypeId, img.name + '.png')
-                scene.render.image_settings.color_depth = '16'
-                scene.render.image_settings.color_mode = 'BW'
-                scene.render.image_settings.compression = 0
-                img.save_render(filepath=filepath, scene=scene, quality=100)
-
-            elif img.name == side + '_mat' and scene.seut.export_map_biome:
-                filepath = os.path.join(get_abs_path(scene.seut.mod_path), 'Data', 'PlanetDataFiles', scene.seut.subtypeId, img.name + '.png')
-                scene.render.image_settings.color_depth = '8'
-                scene.render.image_settings.color_mode = 'RGB'
-                scene.render.image_settings.compression = 0
-                img.save(filepath=filepath, quality=100)
-
-            elif img.name == side + '_add' and scene.seut.export_map_spots:
-                filepath = os.path.join(get_abs_path(scene.seut.mod_path), 'Data', 'PlanetDataFiles', scene.seut.subtypeId, img.name + '.png')
-                scene.render.image_settings.color_depth = '8'
-                scene.render.image_settings.color_mode = 'RGB'
-                scene.render.image_settings.compression = 0
-                img.save(filepath=filepath, quality=100)
+            for suffix, greyscale in maps.items():
+                img = bpy.data.images.get(side + suffix)
+                if img is None:
+                    continue
 
-    return {'FINISHED'}
+                # Limits the maps held in memory while waiting to be written.
+                running = [f for f in futures.values() if not f.done()]
+                if len(running) >= max_workers:
+                    wait(running, return_when=FIRST_COMPLETED)
 
+                # Image data can only be accessed from the main thread.
+                pixels = get_map_pixels(img, greyscale)
+                if pixels is None:
+                    continue
 
-def bake_planet_map(context: bpy.types.Context):
-    """Bakes the planet's material"""
+                filepath = os.path.join(path, img.name + '.png')
+                futures[filepath] = executor.submit(write_png, filepath, pixels)
 
-    scene = context.scene
+        for filepath, future in futures.items():
+            try:
+                future.result()
+            except OSError as e:
+                seut_report(self, context, 'ERROR', True, 'E055', filepath, e)
+                result = {'CANCELLED'}
 
-    bake_type = scene.seut.bake_type
-    bake_resolution = int(scene.seut.bake_resolution)
-    planet = scene.seut.planet
-
-    engine = scene.render.engine
-    scene.render.engine = 'CYCLES'
-    scene.render.bake.use_selected_to_active = False
-    scene.cycles.use_denoising = False
-
-    def create_image(name: str, resolution: int) -> bpy.types.Image:
-        if name in bpy.data.images:
-            img = bpy.data.images[name]
-            bpy.data.images.remove(img)
-
-        img = bpy.data.images.new(
-            name=name,
-            width=resolution,
-            height=resolution, 
-            alpha=False,
-            float_buffer=True,
-            is_data=True,
-            tiled=False
-        )
-
-        return img
-    
-    mats = []
-    for slot in planet.material_slots:
-        mats.append(slot.material)
-
-    # TODO: SURFACE material changes go in here
-    if bake_type == 'height':
-        suffix = ""
-        scene.render.bake.image_settings.color_depth = '16'
-        scene.render.bake.image_settings.color_mode = 'BW'
-        scene.render.bake.image_settings.compression = 0
-        scene.cycles.samples = 4096
-    elif bake_type == 'biome':
-        suffix = "_mat"
-        scene.render.bake.image_settings.color_depth = '8'
-        scene.render.bake.image_settings.color_mode = 'RGB'
-        scene.render.bake.image_settings.compression = 0
-        scene.cycles.samples = 1
-    else:
-        suffix = "_add"
-        scene.render.bake.image_settings.color_depth = '8'
-        scene.render.bake.image_settings.color_mode = 'RGB'
-        scene.render.bake.image_settings.compression = 0
-        scene.cycles.samples = 1
-
-    for mat in mats:
-        if mat is None:
-            continue
-
-        if 'IMAGE' not in mat.node_tree.nodes:
-            node = mat.node_tree.nodes.new(type='ShaderNodeTexImage')
-            node.name = 'IMAGE'
-        else:
-            node = mat.node_tree.nodes['IMAGE']
-            
-        node.image = create_image(mat.name + suffix, bake_resolution)
-        for n in mat.node_tree.nodes:
-            n.select = False
-        node.select = True
-        mat.node_tree.nodes.active = node
-        
+    return result
+
+
+def get_map_pixels(img: bpy.types.Image, greyscale: bool) -> np.ndarray:
+    """Returns the pixels of an image as 16 bit greyscale or 8 bit RGB, top row first. None if the image has no pixels."""
 
-    planet.hide_viewport = False
-    planet.select_set(True)
-    planet.hide_set(False)
+    width, height = img.size
+    channels = img.channels
+    if width == 0 or height == 0:
+        return None
 
-    context.window.view_layer.objects.active = planet
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)[::-1]
 
-    bpy.ops.object.bake(type='EMIT')
+    if not greyscale:
+        if channels < 3:
+            return quantize(np.repeat(pixels[..., :1], 3, axis=2), np.uint8)
+        return quantize(pixels[..., :3], np.uint8)
 
-    scene.render.engine = engine
+    if channels < 3:
+        return quantize(pixels[..., 0], np.uint16)
+
+    red, green, blue = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    if np.array_equal(red, green) and np.array_equal(red, blue):
+        return quantize(red, np.uint16)
+
+    # Same weights Blender uses to convert RGB to BW.
+    return quantize(red * np.float32(0.2126) + green * np.float32(0.7152) + blue * np.float32(0.0722), np.uint16)
+
+
+def bake_planet_map(self, context: bpy.types.Context):
+    """Bakes the planet's material, all tiles at once"""
+
+    bake = PlanetBake(context)
+    if not bake.start(self, context):
+        bake.finish(False)
+        return {'CANCELLED'}
+
+    while not bake.is_done():
+        print(bake.get_status())
+        if not bake.bake_next(self, context):
+            bake.finish(False)
+            return {'CANCELLED'}
+
+    bake.finish(True)
 
     return {'FINISHED'}
 
 
 def import_planet_sbc(self, context):
-    """"""
+    """Imports the selected sections of a planet definition. The SBC is streamed and only the definition is kept,
+    the scene's collections are then filled from its records in one pass."""
 
     if self.planet_def == 'none':
         return {'CANCELLED'}
 
     scene = context.scene
-    tree = ET.parse(self.filepath)
-    root = tree.getroot()
-
-    planet_root = None
-
-    for definition in root:
-        if planet_root is not None:
-            break
-
-        elif definition.tag == 'PlanetGeneratorDefinitions':
-            for planet in definition:
-                for elem in planet:
-                    if elem.tag == 'Id':
-                        for elem2 in elem:
-                            if elem2.tag == 'SubtypeId' and elem2.text == self.planet_def:
-                                planet_root = planet
-                                break
-                    break
-                break
-
-        elif definition.tag == 'Definition' and '{http://www.w3.org/2001/XMLSchema-instance}type' in definition.attrib and definition.attrib['{http://www.w3.org/2001/XMLSchema-instance}type'] == 'PlanetGeneratorDefinition':
-            for elem in definition:
-                if elem.tag == 'Id':
-                    for elem2 in elem:
-                        if elem2.tag == 'SubtypeId' and elem2.text == self.planet_def:
-                            planet_root = definition
-                            break
-                break
-
-    for elem in planet_root:
-        
-        if elem.tag == 'OreMappings' and self.import_ore_mappings:
-            for ore in elem:
-                ore_mapping = add_ore_mapping(context)
-                ore_mapping.value = int(ore.attrib['Value'])
+
+    sections = []
+    if self.import_ore_mappings:
+        sections.append('OreMappings')
+    if self.import_material_groups:
+        sections.append('ComplexMaterials')
+    if self.import_environment_items:
+        sections.append('EnvironmentItems')
+
+    try:
+        records = read_planet_definition(self.filepath, self.planet_def, sections)
+    except (OSError, ET.ParseError) as e:
+        seut_report(self, context, 'ERROR', True, 'E058', self.planet_def, self.filepath, e)
+        return {'CANCELLED'}
+
+    if records is None:
+        seut_report(self, context, 'ERROR', True, 'E058', self.planet_def, self.filepath, "Definition not found.")
+        return {'CANCELLED'}
+
+    add_planet_records(scene, records)
+
+    return {'FINISHED'}
+
+
+def read_planet_definition(filepath: str, subtype_id: str, sections: list) -> dict:
+    """Streams an SBC file and returns the entries of the given sections of a planet definition as records.
+    Elements outside of the definition are discarded as soon as they are parsed and reading stops at its end. None if it was not found."""
+
+    # Section: (entry tag, record reader)
+    readers = {
+        'OreMappings': ('Ore', read_ore_mapping),
+        'ComplexMaterials': ('MaterialGroup', read_material_group),
+        'EnvironmentItems': ('Item', read_environment_item),
+    }
+
+    records = {section: [] for section in readers}
+    path = []
+    definition = None
+    target = False
+
+    with open(filepath, 'rb') as f:
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                path.append(elem.tag)
+
+                if len(path) == 1 and elem.tag != 'Definitions':
+                    return None
+
+                if definition is None:
+                    if len(path) == 3 and path[1] == 'PlanetGeneratorDefinitions':
+                        definition = 3
+                    elif len(path) == 2 and elem.tag == 'Definition' and elem.get('{http://www.w3.org/2001/XMLSchema-instance}type') == 'PlanetGeneratorDefinition':
+                        definition = 2
+                continue
+
+            if definition is not None:
+                depth = len(path) - definition
+
+                if depth == 2 and elem.tag == 'SubtypeId' and path[-2] == 'Id' and elem.text == subtype_id:
+                    target = True
+
+                # Entries are read and discarded one at a time.
+                elif target and depth == 2 and path[-2] in sections and elem.tag == readers[path[-2]][0]:
+                    records[path[-2]].append(readers[path[-2]][1](elem))
+
+                elif depth == 0:
+                    if target:
+                        return records
+                    definition = None
+
+                # Children of an entry are read with it.
+                if depth <= 2:
+                    elem.clear()
+
+            else:
+                elem.clear()
+
+            path.pop()
+
+    return None
+
+
+def read_ore_mapping(elem) -> dict:
+    color = elem.get('TargetColor', '#000000')[1:]
+
+    return {
+        'value': int(elem.get('Value', 0)),
+        'type': elem.get('Type'),
+        'start': int(elem.get('Start', 0)),
+        'depth': int(elem.get('Depth', 1)),
+        'target_color': tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4)),
+    }
+
+
+def read_material_group(elem) -> dict:
+    return {
+        'name': elem.get('Name', ""),
+        'value': int(elem.get('Value', 0)),
+        'rules': [read_rule(r) for r in elem if r.tag == 'Rule'],
+    }
+
+
+def read_environment_item(elem) -> dict:
+    record = {'biomes': [], 'materials': [], 'items': [], 'rules': []}
+
+    for e in elem:
+        if e.tag == 'Biomes':
+            record['biomes'] += [int(b.text) for b in e]
+        elif e.tag == 'Materials':
+            record['materials'] += [m.text for m in e]
+        elif e.tag == 'Items':
+            record['items'] += [dict(i.attrib) for i in e]
+        elif e.tag == 'Rule':
+            record['rules'].append(read_rule(e))
+
+    return record
+
+
+def read_rule(elem) -> dict:
+    """Reads the ranges of a distribution rule and the layers of a material group's rule."""
+
+    record = {'layers': []}
+
+    for i in elem:
+        if i.tag in ['Height', 'Latitude', 'Slope']:
+            record[i.tag.lower()] = (float(i.get('Min', 0)), float(i.get('Max', 0)))
+        elif i.tag == 'Layers':
+            record['layers'] += [(l.get('Material'), float(l.get('Depth', 0))) for l in i]
+
+    return record
+
+
+def add_planet_records(scene, records: dict):
+    """Adds the records of a planet definition to the scene's collections.
+    Properties with update functions are set directly, the palettes are updated once at the end instead."""
+
+    materials = bpy.data.materials
+
+    for record in records['OreMappings']:
+        ore_mapping = scene.seut.ore_mappings.add()
+        ore_mapping['value'] = record['value']
+        # TODO: Pull from material libraries
+        ore_mapping.ore_type = materials.get(record['type'])
+        ore_mapping.start = record['start']
+        ore_mapping.depth = record['depth']
+        ore_mapping.target_color = record['target_color']
+
+    names = {mg.name for mg in scene.seut.material_groups}
+    for record in records['ComplexMaterials']:
+        material_group = scene.seut.material_groups.add()
+        name = record['name'] if record['name'] not in names else f"MaterialGroup {len(scene.seut.material_groups)}"
+        material_group['name'] = material_group['name_prev'] = name
+        material_group['value'] = record['value']
+        names.add(name)
+
+        for r in record['rules']:
+            rule = material_group.rules.add()
+            rule['name'] = rule['name_prev'] = f"Rule {len(material_group.rules)}"
+            set_rule_ranges(rule, r)
+
+            for material, depth in r['layers']:
+                layer = rule.layers.add()
                 # TODO: Pull from material libraries
-                if ore.attrib['Type'] in bpy.data.materials:
-                    ore_mapping.ore_type = bpy.data.materials[ore.attrib['Type']]
-                ore_mapping.start = int(ore.attrib['Start'])
-                ore_mapping.depth = int(ore.attrib['Depth'])
-                hex = ore.attrib['TargetColor'][1:]
-                r, g, b = tuple(int(hex[i:i+2], 16) for i in (0, 2, 4))
-                ore_mapping.target_color = (r / 255, g / 255, b / 255)
-
-        if elem.tag == 'ComplexMaterials' and self.import_material_groups:
-            for mg in elem:
-                material_group = add_material_group(context)
-                material_group.name = mg.attrib['Name']
-                material_group.value = int(mg.attrib['Value'])
-
-                for r in mg:
-                    rule = material_group.rules.add()
-                    rule.name = f"Rule {len(material_group.rules)}"
-
-                    for i in r:
-                        if i.tag == 'Height':
-                            rule.height_min = float(i.attrib['Min'])
-                            rule.height_max = float(i.attrib['Max'])
-                        elif i.tag == 'Latitude':
-                            rule.latitude_min = float(i.attrib['Min'])
-                            rule.latitude_max = float(i.attrib['Max'])
-                        elif i.tag == 'Layers':
-                            for l in i:
-                                layer = rule.layers.add()
-                                # TODO: Pull from material libraries
-                                if l.attrib['Material'] in bpy.data.materials:
-                                    layer.material = bpy.data.materials[l.attrib['Material']]
-                                layer.depth = int(l.attrib['Depth'])
-
-                        elif i.tag == 'Slope':
-                            rule.slope_min = float(i.attrib['Min'])
-                            rule.slope_max = float(i.attrib['Max'])
-
-        if elem.tag == 'EnvironmentItems' and self.import_environment_items:
-            for i in elem:
-                item = scene.seut.environment_items.add()
-                item.name = f"EnvironmentItem {len(scene.seut.environment_items)}"
-
-                for e in i:
-                    if e.tag == 'Biomes':
-                        for b in e:
-                            biome = add_biome(context, item)
-                            biome.value = int(b.text)
-
-                    elif e.tag == 'Materials':
-                        for m in e:
-                            material = item.materials.add()
-                            # TODO: Pull from material libraries
-                            if m.text in bpy.data.materials:
-                                material.name = bpy.data.materials[m.text]
-
-                    elif e.tag == 'Items':
-                        for itm in e:
-                            single_item = item.items.add()
-                            single_item.type_id = itm.attrib['TypeId']
-                            if 'SubtypeId' in itm.attrib:
-                                single_item.subtype_id = itm.attrib['SubtypeId']
-                            if 'GroupId' in itm.attrib:
-                                single_item.group_id = itm.attrib['GroupId']
-                            if 'ModifierId' in itm.attrib:
-                                single_item.modifier_id = itm.attrib['ModifierId']
-                            single_item.density = float(itm.attrib['Density'])
-
-                    elif e.tag == 'Rule':
-                        for r in e:
-                            rule = item.rules.add()
-
-                            for i in r:
-                                if i.tag == 'Height':
-                                    rule.height_min = float(i.attrib['Min'])
-                                    rule.height_max = float(i.attrib['Max'])
-                                elif i.tag == 'Latitude':
-                                    rule.latitude_min = float(i.attrib['Min'])
-                                    rule.latitude_max = float(i.attrib['Max'])
-                                elif i.tag == 'Slope':
-                                    rule.slope_min = float(i.attrib['Min'])
-                                    rule.slope_max = float(i.attrib['Max'])
-
-    return {'FINISHED'}
\ No newline at end of file
+                layer.material = materials.get(material)
+                layer.depth = depth
+
+    names = {ei.name for ei in scene.seut.environment_items}
+    index = len(scene.seut.environment_items)
+    for record in records['EnvironmentItems']:
+        item = scene.seut.environment_items.add()
+        index += 1
+        while f"EnvironmentItem {index}" in names:
+            index += 1
+        item['name'] = item['name_prev'] = f"EnvironmentItem {index}"
+        names.add(item.name)
+
+        for value in record['biomes']:
+            biome = item.biomes.add()
+            biome['value'] = value
+
+        for m in record['materials']:
+            material = item.materials.add()
+            # TODO: Pull from material libraries
+            material.material = materials.get(m)
+
+        for i in record['items']:
+            single_item = item.items.add()
+            single_item.type_id = i.get('TypeId', "")
+            single_item.subtype_id = i.get('SubtypeId', "")
+            single_item.group_id = i.get('GroupId', "")
+            single_item.modifier_id = i.get('ModifierId', "")
+            single_item.density = float(i.get('Density', 0.01))
+
+        for r in record['rules']:
+            rule = item.rules.add()
+            set_rule_ranges(rule, r)
+
+    if records['OreMappings'] != []:
+        update_palette(get_palette(scene, 'ore_mappings'), {om.value for om in scene.seut.ore_mappings}, 2)
+    if records['ComplexMaterials'] != []:
+        update_palette(get_palette(scene, 'material_groups'), {mg.value for mg in scene.seut.material_groups}, 0)
+    if records['EnvironmentItems'] != []:
+        update_palette(get_palette(scene, 'biomes'), {b.value for ei in scene.seut.environment_items for b in ei.biomes}, 1)
+
+
+def set_rule_ranges(rule, record: dict):
+    for key in ['height', 'latitude', 'slope']:
+        if key in record:
+            setattr(rule, key + '_min', record[key][0])
+            setattr(rule, key + '_max', record[key][1])
@@ -1,6 +1,8 @@
 import bpy
 import os
+import xml.etree.ElementTree as ET
 
+from collections            import OrderedDict
 from bpy.types              import Operator
 from bpy.props              import (EnumProperty,
                                     FloatProperty,
@@ -13,11 +15,13 @@ from bpy.props              import (EnumProperty,
                                     )
 from bpy_extras.io_utils    import ImportHelper
 
-from ..seut_preferences import get_preferences
-from ..seut_collections import get_collections
-from ..seut_errors      import get_abs_path, seut_report
-from .seut_planet_io    import *
-from .seut_planet_utils import *
+from ..seut_preferences         import get_preferences
+from ..seut_collections         import get_collections
+from ..seut_errors              import get_abs_path, seut_report
+from .seut_planet_io            import *
+from .seut_planet_bake          import PlanetBake
+from .seut_planet_validation    import validate_planet_maps
+from .seut_planet_utils         import *
 
 
 class SEUT_OT_Planet_RecreateSetup(Operator):
@@ -544,7 +548,7 @@ class SEUT_OT_Planet_ExportAll(Operator):
 
         if scene.seut.export_sbc_type in ['update', 'new']:
             result_sbc = export_planet_sbc(self, context)
-        result_maps = export_planet_maps(scene)
+        result_maps = export_planet_maps(self, context)
 
         if scene.seut.export_sbc_type in ['update', 'new'] and result_sbc == {'FINISHED'} and result_maps == {'FINISHED'} or scene.seut.export_sbc_type == 'none' and result_maps == {'FINISHED'}:
             result = {'FINISHED'}
@@ -555,7 +559,7 @@ class SEUT_OT_Planet_ExportAll(Operator):
 
 
 class SEUT_OT_Planet_Bake(Operator):
-    """Bakes the selected map type"""
+    """Bakes the selected map type.\nThe map is baked in tiles, first as a preview at a lower resolution. Press Esc to cancel, the next bake resumes where it stopped"""
     bl_idname = "planet.bake"
     bl_label = "Bake"
     bl_options = {'REGISTER', 'UNDO'}
@@ -573,72 +577,201 @@ class SEUT_OT_Planet_Bake(Operator):
 
     def execute(self, context):
 
-        return bake_planet_map(context)
+        return bake_planet_map(self, context)
 
 
-last_dir = ""
-valid_files = {}
+    def invoke(self, context, event):
+
+        self.bake = PlanetBake(context)
+        if not self.bake.start(self, context):
+            self.bake.finish(False)
+            return {'CANCELLED'}
+
+        self.cancelled = False
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+        context.workspace.status_text_set(self.bake.get_status())
+
+        return {'RUNNING_MODAL'}
+
+
+    def modal(self, context, event):
+
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.cancelled = True
+            return {'RUNNING_MODAL'}
+
+        if event.type != 'TIMER' or event.timer != self.timer:
+            return {'PASS_THROUGH'}
+
+        if self.cancelled:
+            self.finish(context, False)
+            seut_report(self, context, 'WARNING', True, 'W023', self.bake.bake_type, self.bake.saved, len(self.bake.tiles))
+            return {'CANCELLED'}
+
+        # Tiles are baked one per timer event, so Blender stays responsive in between.
+        if not self.bake.bake_next(self, context):
+            self.finish(context, False)
+            return {'CANCELLED'}
+
+        if not self.bake.is_done():
+            context.window_manager.progress_update(int(self.bake.get_progress() * 100))
+            context.workspace.status_text_set(self.bake.get_status())
+            return {'RUNNING_MODAL'}
+
+        self.finish(context, True)
+
+        return {'FINISHED'}
+
+
+    def cancel(self, context):
+        self.finish(context, False)
+
+
+    def finish(self, context, completed: bool):
+        self.bake.finish(completed)
+
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+
+class SEUT_OT_Planet_ValidateMaps(Operator):
+    """Checks that the biome maps only contain values mapped to a Material Group, Environment Item or Ore Mapping and shows statistics of all maps in the System Console"""
+    bl_idname = "planet.validate_maps"
+    bl_label = "Validate Maps"
+    bl_options = {'REGISTER', 'UNDO'}
+
+
+    snap: BoolProperty(
+        name="Snap Stray Pixels",
+        description="Replaces values that are not mapped to any entry with the nearest mapped value of the same channel",
+        default=False
+    )
+
+
+    @classmethod
+    def poll(cls, context):
+        scene = context.scene
+        return scene.seut.sceneType == 'planet_editor' and 'SEUT' in scene.view_layers
+
+
+    def execute(self, context):
+
+        return validate_planet_maps(self, context, self.snap)
+
+
+    def invoke(self, context, event):
+
+        return context.window_manager.invoke_props_dialog(self)
+
+
+# Directories whose planet definitions are remembered, least recently used first.
+MAX_PLANET_DEF_DIRS = 8
+XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+
+planet_def_cache = OrderedDict()
+planet_def_items = []
 
 
 def items_planet_def(self, context):
 
-    global last_dir
-    global valid_files
+    global planet_def_items
 
-    if os.path.dirname(self.filepath) == last_dir:
-        if self.filepath in valid_files:
-            return valid_files[self.filepath]
-        else:
-            return []
+    # Blender requires the strings returned by an enum callback to stay referenced.
+    planet_def_items = get_planet_defs(self.filepath)
+
+    return planet_def_items
+
+
+def get_planet_defs(filepath: str) -> list:
+    """Returns the planet definitions in an SBC file as enum items. Files are only read again if their timestamp or size changed."""
 
+    if os.path.splitext(filepath)[1] != '.sbc':
+        return []
+
+    directory = os.path.dirname(filepath)
+    try:
+        dir_mtime = os.stat(directory).st_mtime_ns
+        stat = os.stat(filepath)
+    except OSError:
+        return []
+
+    entry = planet_def_cache.get(directory)
+    if entry is None:
+        entry = {'mtime': dir_mtime, 'files': {}}
+        planet_def_cache[directory] = entry
+        while len(planet_def_cache) > MAX_PLANET_DEF_DIRS:
+            planet_def_cache.popitem(last=False)
     else:
-        for f in os.listdir(os.path.dirname(self.filepath)):
-            if os.path.splitext(f)[1] != '.sbc':
-                continue
-            
-            file = os.path.join(os.path.dirname(self.filepath), f)
-            with open(file) as f_open:
-                if '<TypeId>PlanetGeneratorDefinition</TypeId>' in f_open.read():
-                    
-                    try:
-                        tree = ET.parse(file)
-                    except:
-                        return []
-
-                    root = tree.getroot()
-                    if not root.tag == 'Definitions':
-                        return []
-
-                    for definition in root:
-                        if definition.tag == 'PlanetGeneratorDefinitions':
-                            for planet in definition:
-                                for elem in planet:
-                                    if elem.tag == 'Id':
-                                        for elem2 in elem:
-                                            if elem2.tag == 'SubtypeId':
-                                                if not file in valid_files:
-                                                    valid_files[file] = []
-                                                valid_files[file].append((elem2.text, elem2.text, ""))
-                                                break
-                                        break
-
-                        elif definition.tag == 'Definition' and '{http://www.w3.org/2001/XMLSchema-instance}type' in definition.attrib and definition.attrib['{http://www.w3.org/2001/XMLSchema-instance}type'] == 'PlanetGeneratorDefinition':
-                            for elem in definition:
-                                if elem.tag == 'Id':
-                                    for elem2 in elem:
-                                        if elem2.tag == 'SubtypeId':
-                                            if not file in valid_files:
-                                                valid_files[file] = []
-                                            valid_files[file].append((elem2.text, elem2.text, ""))
-                                            break
-                                    break
-                                
-        last_dir = os.path.dirname(self.filepath)
-        if self.filepath in valid_files:
-            return valid_files[self.filepath]
-        else:
+        planet_def_cache.move_to_end(directory)
+
+    # Files were added, removed or renamed.
+    if entry['mtime'] != dir_mtime:
+        entry['files'] = {f: record for f, record in entry['files'].items() if os.path.isfile(f)}
+        entry['mtime'] = dir_mtime
+
+    record = entry['files'].get(filepath)
+    if record is None or record[0] != stat.st_mtime_ns or record[1] != stat.st_size:
+        items = read_planet_defs(filepath)
+        if items is None:
             return []
 
+        record = (stat.st_mtime_ns, stat.st_size, items)
+        entry['files'][filepath] = record
+
+    return record[2]
+
+
+def read_planet_defs(filepath: str) -> list:
+    """Reads the SubtypeIds of the planet definitions in an SBC file. The whole file is still parsed, but elements are discarded
+    as soon as they are closed, so memory use does not grow with the size of the definitions. Returns None if the file could not be read."""
+
+    items = []
+    path = []
+    definition = None
+    found = False
+
+    try:
+        for event, elem in ET.iterparse(filepath, events=('start', 'end')):
+            if event == 'start':
+                path.append(elem.tag)
+
+                if len(path) == 1 and elem.tag != 'Definitions':
+                    return []
+
+                # <PlanetGeneratorDefinitions><PlanetGeneratorDefinition> or <Definition xsi:type="PlanetGeneratorDefinition">
+                if definition is None:
+                    if len(path) == 3 and path[1] == 'PlanetGeneratorDefinitions':
+                        definition = 3
+                        found = False
+                    elif len(path) == 2 and elem.tag == 'Definition' and elem.get(XSI_TYPE) == 'PlanetGeneratorDefinition':
+                        definition = 2
+                        found = False
+                continue
+
+            if definition is not None and not found and elem.tag == 'SubtypeId' and len(path) == definition + 2 and path[-2] == 'Id':
+                items.append((elem.text, elem.text, ""))
+                found = True
+
+            if len(path) == definition:
+                definition = None
+
+            path.pop()
+            elem.clear()
+
+    except ET.ParseError:
+        return items
+
+    except OSError:
+        return None
+
+    return items
+
 
 class SEUT_OT_Planet_ImportSBC(Operator, ImportHelper):
     """Imports a SBC planet definition"""
@@ -696,7 +829,7 @@ class SEUT_OT_Planet_ImportSBC(Operator, ImportHelper):
         row = box.row()
         row.label(text="Options", icon='SETTINGS')
 
-        if self.filepath not in valid_files:
+        if get_planet_defs(self.filepath) == []:
             row = box.row()
             row.alert = True
             row.label(text="No Planet Definition SBC selected.")
@@ -486,6 +486,7 @@ class SEUT_PT_Panel_PlanetExport(Panel):
         row = layout.row()
         row.scale_y = 1.1
         row.operator('planet.bake', icon='OUTPUT')
+        row.operator('planet.validate_maps', icon='CHECKMARK')
 
         # Options
         box = layout.box()
@@ -496,6 +497,10 @@ class SEUT_PT_Panel_PlanetExport(Panel):
         split = box.split(factor=0.40)
         split.label(text="Resolution:")
         split.prop(scene.seut, "bake_resolution", text="")
+        if scene.seut.bake_type == 'height':
+            split = box.split(factor=0.40)
+            split.label(text="Samples:")
+            split.prop(scene.seut, "bake_samples", text="")
 
 
 class SEUT_PT_Panel_PlanetImport(Panel):
@@ -1,13 +1,16 @@
 import bpy
 
 
+palette_names = {
+    'material_groups': "MaterialGroups",
+    'biomes': "Biomes",
+    'ore_mappings': "OreMappings",
+}
+
+
 def add_material_group(context):
     scene = context.scene
-    
-    if scene.seut.material_groups_palette is None:
-        palette = bpy.data.palettes.new(f"MaterialGroups")
-        palette.use_fake_user = True
-        scene.seut.material_groups_palette = palette
+    get_palette(scene, 'material_groups')
     
     item = scene.seut.material_groups.add()
     item.name = "MaterialGroup " + str(len(scene.seut.material_groups))
@@ -24,10 +27,7 @@ def add_biome(context, ei = None):
     else:
         environment_item = ei
     
-    if scene.seut.biomes_palette is None:
-        palette = bpy.data.palettes.new(f"Biomes")
-        palette.use_fake_user = True
-        scene.seut.biomes_palette = palette
+    get_palette(scene, 'biomes')
 
     item = environment_item.biomes.add()
     item.value = len(environment_item.biomes)
@@ -37,13 +37,39 @@ def add_biome(context, ei = None):
 
 def add_ore_mapping(context):
     scene = context.scene
-    
-    if scene.seut.ore_mappings_palette is None:
-        palette = bpy.data.palettes.new(f"OreMappings")
-        palette.use_fake_user = True
-        scene.seut.ore_mappings_palette = palette
+    get_palette(scene, 'ore_mappings')
     
     item = scene.seut.ore_mappings.add()
     item.value = len(scene.seut.ore_mappings)
 
-    return item
\ No newline at end of file
+    return item
+
+
+def get_palette(scene, name: str) -> bpy.types.Palette:
+    """Returns the scene's palette of the given name, creating it if necessary."""
+
+    palette = getattr(scene.seut, name + '_palette')
+    if palette is None:
+        palette = bpy.data.palettes.new(palette_names[name])
+        palette.use_fake_user = True
+        setattr(scene.seut, name + '_palette', palette)
+
+    return palette
+
+
+def update_palette(palette: bpy.types.Palette, values: set, channel: int):
+    """Makes the palette contain exactly one color per value, with the value in the given channel."""
+
+    keys = {round(v / 255, 3) for v in values}
+    existing = set()
+
+    for c in list(palette.colors):
+        key = round(c.color[channel], 3)
+        if key not in keys or key in existing or any(c.color[i] != 0 for i in range(3) if i != channel):
+            palette.colors.remove(c)
+        else:
+            existing.add(key)
+
+    for key in sorted(keys - existing):
+        color = palette.colors.new()
+        color.color = [key if i == channel else 0 for i in range(3)]
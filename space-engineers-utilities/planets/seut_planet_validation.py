@@ -0,0 +1,164 @@
+import bpy
+import numpy as np
+
+from ..seut_errors              import seut_report
+from ..utils.seut_png_utils     import quantize
+
+
+SIDES = ['front', 'back', 'left', 'right', 'up', 'down']
+CHANNELS = ['Red', 'Green', 'Blue']
+
+# Values a channel can contain without an entry, where nothing is placed.
+EMPTY_VALUES = (0, 255)
+
+
+def get_mapped_values(scene) -> list:
+    """Returns the values of the biome map's channels that are mapped to an entry, with the names of the entries:
+    Red to Material Groups, Green to the Biomes of Environment Items and Blue to Ore Mappings."""
+
+    red = {}
+    for mg in scene.seut.material_groups:
+        red.setdefault(mg.value, []).append(f"Material Group '{mg.name}'")
+
+    green = {}
+    for ei in scene.seut.environment_items:
+        for biome in ei.biomes:
+            green.setdefault(biome.value, []).append(f"Environment Items '{ei.name}'")
+
+    blue = {}
+    for om in scene.seut.ore_mappings:
+        ore = om.ore_type.name if om.ore_type is not None else "None"
+        blue.setdefault(om.value, []).append(f"Ore Mapping '{ore}'")
+
+    return [red, green, blue]
+
+
+def get_snap_table(valid: np.ndarray) -> np.ndarray:
+    """Returns a lookup table from every channel value to the nearest valid one."""
+
+    distances = np.abs(np.arange(256)[:, np.newaxis] - valid[np.newaxis, :])
+
+    return valid[distances.argmin(axis=1)].astype(np.uint8)
+
+
+def get_map_values(img: bpy.types.Image) -> tuple:
+    """Returns the image's pixels as float array of shape (pixels, channels) and their RGB values as 8 bit integers."""
+
+    width, height = img.size
+    pixels = np.empty(width * height * img.channels, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(-1, img.channels)
+
+    return pixels, quantize(pixels[:, :3], np.uint8)
+
+
+def validate_planet_maps(self, context, snap: bool = False) -> set:
+    """Checks that the biome maps of all sides only contain values mapped to an entry and prints statistics of the biome and ore spot maps.
+    If enabled, unmapped values are replaced by the nearest mapped value of their channel."""
+
+    scene = context.scene
+    mapped = get_mapped_values(scene)
+
+    valid_tables = []
+    snap_tables = []
+    for channel in mapped:
+        valid = np.zeros(256, dtype=bool)
+        valid[list(channel.keys()) + list(EMPTY_VALUES)] = True
+        valid_tables.append(valid)
+        snap_tables.append(get_snap_table(np.flatnonzero(valid)))
+
+    histograms = {'_mat': np.zeros((3, 256), dtype=np.int64), '_add': np.zeros((3, 256), dtype=np.int64)}
+    totals = {'_mat': 0, '_add': 0}
+    stray_total = 0
+    snapped_total = 0
+    maps = 0
+
+    for suffix in ['_mat', '_add']:
+        for side in SIDES:
+            img = bpy.data.images.get(side + suffix)
+            if img is None or img.size[0] == 0 or img.channels < 3:
+                if suffix == '_mat':
+                    seut_report(self, context, 'WARNING', False, 'W025', side + suffix)
+                continue
+
+            maps += 1
+            pixels, values = get_map_values(img)
+            totals[suffix] += len(values)
+
+            for c in range(3):
+                histograms[suffix][c] += np.bincount(values[:, c], minlength=256)
+
+            if suffix != '_mat':
+                continue
+
+            # Pixels with an unmapped value in any channel.
+            invalid = np.stack([~valid_tables[c][values[:, c]] for c in range(3)], axis=1)
+            stray = int(np.count_nonzero(invalid.any(axis=1)))
+            if stray == 0:
+                continue
+
+            stray_total += stray
+            details = []
+            for c in range(3):
+                unmapped = np.unique(values[invalid[:, c], c])
+                if len(unmapped) > 0:
+                    details.append(f"{CHANNELS[c]}: {', '.join(str(v) for v in unmapped[:10])}{', ...' if len(unmapped) > 10 else ''}")
+            seut_report(self, context, 'WARNING', False, 'W024', img.name, f"{stray} ({stray / len(values):.2%})", "; ".join(details))
+
+            if not snap:
+                continue
+
+            for c in range(3):
+                rows = np.flatnonzero(invalid[:, c])
+                pixels[rows, c] = snap_tables[c][values[rows, c]] / 255
+
+            img.pixels.foreach_set(pixels.ravel())
+            img.update()
+            snapped_total += stray
+
+    if maps == 0:
+        seut_report(self, context, 'ERROR', True, 'E057')
+        return {'CANCELLED'}
+
+    print_map_statistics(scene, mapped, histograms, totals)
+
+    if snapped_total > 0:
+        seut_report(self, context, 'INFO', True, 'I026', snapped_total)
+    elif stray_total > 0:
+        seut_report(self, context, 'WARNING', True, 'W026', stray_total)
+    else:
+        seut_report(self, context, 'INFO', True, 'I025', maps)
+
+    return {'FINISHED'}
+
+
+def print_map_statistics(scene, mapped: list, histograms: dict, totals: dict):
+    """Prints the share of pixels per value of each channel, across all sides."""
+
+    print(f"\n============================================================ Planet map statistics of '{scene.name}'.")
+
+    if totals['_mat'] > 0:
+        titles = ["Material Groups (Red)", "Environment Items (Green)", "Ore Mappings (Blue)"]
+        for c in range(3):
+            print(f"\n{titles[c]}:")
+            histogram = histograms['_mat'][c]
+            for value in np.flatnonzero(histogram):
+                if value in mapped[c]:
+                    label = ", ".join(mapped[c][value])
+                elif value in EMPTY_VALUES:
+                    label = "(none)"
+                else:
+                    label = "UNMAPPED"
+                print(f"    {value:>3} {histogram[value] / totals['_mat']:>8.3%}  {label}")
+
+            unused = [v for v in mapped[c] if histogram[v] == 0]
+            if unused != []:
+                print(f"    Not present in any map: {', '.join(str(v) for v in sorted(unused))}")
+
+    if totals['_add'] > 0:
+        print("\nOre Spots:")
+        for c in range(3):
+            histogram = histograms['_add'][c]
+            values = np.flatnonzero(histogram)
+            coverage = 1 - histogram[0] / totals['_add']
+            print(f"    {CHANNELS[c]:<5} {len(values)} distinct values, {coverage:.3%} of pixels not 0")
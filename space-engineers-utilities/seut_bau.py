@@ -167,6 +167,9 @@ def get_config() -> dict:
         dict['asset_path'] = preferences.asset_path
     if preferences.havok_path is not None:
         dict['havok_path'] = preferences.havok_path
+    dict['texture_cache_size'] = preferences.texture_cache_size
+    dict['log_size'] = preferences.log_size
+    dict['profile_export'] = preferences.profile_export
 
     data['space-engineers-utilities'].append(dict)
     return data
@@ -185,6 +188,12 @@ def set_config(data):
             preferences.asset_path = cfg['asset_path']
         if 'havok_path' in cfg:
             preferences.havok_path = cfg['havok_path']
+        if 'texture_cache_size' in cfg:
+            preferences.texture_cache_size = cfg['texture_cache_size']
+        if 'log_size' in cfg:
+            preferences.log_size = cfg['log_size']
+        if 'profile_export' in cfg:
+            preferences.profile_export = cfg['profile_export']
 
 
 def bau_register():
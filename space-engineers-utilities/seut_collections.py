@@ -1,15 +1,16 @@
 import bpy
 import os
 
-from bpy.types  import Operator
-from bpy.types  import PropertyGroup
-from bpy.props  import (EnumProperty,
-                        FloatProperty,
-                        FloatVectorProperty,
-                        IntProperty,
-                        StringProperty,
-                        BoolProperty,
-                        PointerProperty)
+from bpy.app.handlers   import persistent
+from bpy.types          import Operator
+from bpy.types          import PropertyGroup
+from bpy.props          import (EnumProperty,
+                                FloatProperty,
+                                FloatVectorProperty,
+                                IntProperty,
+                                StringProperty,
+                                BoolProperty,
+                                PointerProperty)
 
 from .seut_errors                       import seut_report
 from .materials.seut_ot_create_material import create_material
@@ -124,6 +125,15 @@ seut_collections = {
 }
 
 
+# The SEUT collections of all scenes, built in a single pass over all collections.
+collection_registry = None
+collection_registry_size = 0
+
+
+def update_scene(self, context):
+    invalidate_collection_registry()
+
+
 def update_ref_col(self, context):
     scene = self.scene
 
@@ -214,7 +224,8 @@ class SEUT_Collection(PropertyGroup):
     )
     
     scene: PointerProperty(
-        type = bpy.types.Scene
+        type = bpy.types.Scene,
+        update = update_scene
     )
     
     col_type: EnumProperty(
@@ -378,20 +389,75 @@ class SEUT_OT_CreateCollection(Operator):
         return {'FINISHED'}
 
 
+def get_collection_registry() -> dict:
+    """Returns the collections assigned to each scene, keyed by the scene's pointer. Collections are only scanned again once the registry has been invalidated."""
+
+    global collection_registry
+    global collection_registry_size
+
+    # Adding or removing collections does not always cause a depsgraph update before the next lookup.
+    if collection_registry is not None and collection_registry_size == len(bpy.data.collections):
+        return collection_registry
+
+    registry = {}
+    for col in bpy.data.collections:
+        if col is None or col.seut.scene is None:
+            continue
+        registry.setdefault(col.seut.scene.as_pointer(), []).append(col)
+
+    collection_registry = registry
+    collection_registry_size = len(bpy.data.collections)
+
+    return collection_registry
+
+
+def get_scene_collections(scene) -> list:
+    """Returns the collections assigned to a scene, in the order of bpy.data.collections."""
+
+    cols = get_collection_registry().get(scene.as_pointer(), [])
+
+    # Removed collections and reused pointers make the registry invalid.
+    try:
+        valid = all(col.seut.scene == scene for col in cols)
+    except ReferenceError:
+        valid = False
+
+    if not valid:
+        invalidate_collection_registry()
+        cols = get_collection_registry().get(scene.as_pointer(), [])
+
+    return list(cols)
+
+
+def invalidate_collection_registry():
+    global collection_registry
+    collection_registry = None
+
+
+@persistent
+def collection_registry_handler(*args):
+    """Invalidates the collection registry after loading a BLEND file and after undo and redo."""
+
+    invalidate_collection_registry()
+
+
+@persistent
+def collection_registry_depsgraph_handler(scene, depsgraph):
+    """Invalidates the collection registry if collections changed."""
+
+    if depsgraph.id_type_updated('COLLECTION'):
+        invalidate_collection_registry()
+
+
 def get_collections(scene: object, inclusive: bool = False) -> dict:
-    """Scans the existing collections of a scene to find the SEUT ones. Inclusive returns all collections, including ones disallowed by sceneType."""
+    """Returns the SEUT collections of a scene. Inclusive returns all collections, including ones disallowed by sceneType."""
 
     collections = {}
     collections['seut'] = None
     for key in seut_collections[scene.seut.sceneType].keys():
         collections[key] = None
 
-    for col in bpy.data.collections:
-        if col is None:
-            continue
-        if not col.seut.scene is scene:
-            continue
-        
+    for col in get_scene_collections(scene):
         if col.seut.col_type == 'none':
             continue
         else:
@@ -422,11 +488,7 @@ def rename_collections(scene: object):
                     vl_col.collection.seut.scene = scene
             break
 
-    for col in bpy.data.collections:
-        if col is None:
-            continue
-        if col.seut.scene is not scene:
-            continue
+    for col in get_scene_collections(scene):
         if col.seut.col_type == 'none':
             continue
         if col.seut.col_type not in seut_collections[scene.seut.sceneType] and col.seut.col_type != 'seut':
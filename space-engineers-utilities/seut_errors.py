@@ -1,14 +1,26 @@
 import bpy
 import sys
-import io
 import os
 import time
+import logging
+import threading
+import numpy as np
 
-from mathutils  import Vector
+from collections        import deque
+from logging.handlers   import RotatingFileHandler
 
 
-log = io.StringIO()
-previous_message = ""
+logger = logging.getLogger(__package__)
+logger.propagate = False
+logger.setLevel(logging.INFO)
+log_handler = None
+log_tail = deque(maxlen=1000)
+
+# Output is written from worker threads as well, so the state of the log streams is kept per thread.
+log_state = threading.local()
+
+issue_limit = 50
+issue_batch = None
 
 errors = {
     'E001': "Import error. Imported object not found.",
@@ -65,6 +77,10 @@ errors = {
     'E052': "The armature has a scale of '1.0' - this is usually caused by having applied all on the armature, which breaks it completely.",
     'E053': "Material '{variable_1}' contains invalid node tree. Custom node trees are not supported by Space Engineers - all changes to a material must be made by altering its texture files.",
     'E054': "The rigid body of collision object '{variable_1}' in collection {variable_2} is set to an unsupported collision shape (COMPOUND).",
+    'E055': "File '{variable_1}' could not be written: {variable_2}",
+    'E056': "Baking the planet's {variable_1} map failed: {variable_2}",
+    'E057': "No biome or ore spot maps could be found. Bake or import them first.",
+    'E058': "Planet definition '{variable_1}' could not be imported from '{variable_2}': {variable_3}",
 }
 
 warnings = {
@@ -88,6 +104,12 @@ warnings = {
     'W018': "Nonstandard bones detected: {variable_1}. You may need to alter the Animation Controller for them to work as intended.",
     'W019': "Material '{variable_1}' has a linked '{variable_2}'-texture but the material technique '{variable_3}' does not support it.",
     'W020': "Scene '{variable_1}' is set to a different grid size than its export size and contains a subpart empty '{variable_2}'. Subpart empties do not support export to a different grid size.",
+    'W021': "Export of '{variable_1}' was cancelled. Files that were being compiled at the time may be incomplete.",
+    'W022': "SBC file '{variable_1}' changed during export. The entry for '{variable_2}' was not updated.",
+    'W023': "Baking the planet's {variable_1} map was cancelled. {variable_2} of {variable_3} tiles are saved and will be reused by the next bake.",
+    'W024': "Biome map '{variable_1}' contains {variable_2} pixels with values not mapped to any entry: {variable_3}",
+    'W025': "Biome map '{variable_1}' could not be found.",
+    'W026': "{variable_1} pixels of the biome maps have values not mapped to any entry. Enable 'Snap Stray Pixels' to replace them with the nearest mapped value. Statistics are shown in the System Console.",
 }
 
 infos = {
@@ -113,6 +135,10 @@ infos = {
     'I020': "The import of {variable_1} materials was skipped because they already exist in the BLEND file: {variable_2}",
     'I021': "{variable_1} of {variable_2} files successfully imported. Refer to Blender System Console for details.",
     'I022': "Export of collision collection '{variable_1}' was skipped because the collection is not attached to the main or a BS collection.",
+    'I023': "Export profile written to '{variable_1}'.",
+    'I024': "Resuming the bake of the planet's {variable_1} map: {variable_2} of {variable_3} tiles were restored from a previous bake.",
+    'I025': "All {variable_1} planet maps only contain values mapped to an entry. Statistics are shown in the System Console.",
+    'I026': "{variable_1} stray pixels were snapped to the nearest mapped value. Export the maps to apply the change.",
 }
 
 
@@ -135,7 +161,7 @@ def check_export(self, context, can_report=True):
         seut_report(self, context, 'ERROR', can_report, 'E045', get_abs_path(scene.seut.mod_path))
         return {'CANCELLED'}
 
-    if path.find("Models\\") != -1 or (path + "\\").find("Models\\") != -1:
+    if (path + os.sep).find("Models" + os.sep) != -1:
         pass
     else:
         seut_report(self, context, 'ERROR', can_report, 'E014', path, scene.name)
@@ -210,12 +236,7 @@ def check_uvms(self, context, obj):
             seut_report(self, context, 'ERROR', True, 'E032', obj.name)
             return {'CANCELLED'}
 
-        at_zero = 0
-        obj_total = len(obj.data.uv_layers.active.data)
-        for loop in obj.data.loops:
-            uv = obj.data.uv_layers.active.data[loop.index].uv
-            if uv == Vector((0.0, 0.0)):
-                at_zero += 1
+        at_zero, obj_total = count_zero_uvs(obj.data)
         
         if obj_total <= 0:
             seut_report(self, context, 'WARNING', False, 'W013', obj.name)
@@ -230,6 +251,19 @@ def check_uvms(self, context, obj):
     return {'CONTINUE'}
 
 
+def count_zero_uvs(mesh) -> tuple:
+    """Returns the number of loops whose coordinates in the active UV map are (0, 0) and the total number of loops."""
+
+    uv_data = mesh.uv_layers.active.data
+    total = len(uv_data)
+
+    uvs = np.empty(total * 2, dtype=np.float32)
+    uv_data.foreach_get('uv', uvs)
+    at_zero = np.count_nonzero((uvs[0::2] == 0.0) & (uvs[1::2] == 0.0))
+
+    return int(at_zero), total
+
+
 def check_weights(context, obj):
     """Checks an object's vertices for missing weight painting. Returns True if all good, False if issue, None if invalid object."""
 
@@ -239,55 +273,71 @@ def check_weights(context, obj):
     if obj is None or obj.data is None or obj.data.vertices is None or len(obj.data.vertices) <= 0:
         return None
 
-    ungrouped = False
-    weightless = False
     grp_ungrouped = "Problematic - Ungrouped"
     grp_weightless = "Problematic - Unweighted"
-    for v in obj.data.vertices:
-        
-        if len(v.groups) == 0 or len(v.groups) == 1 and obj.vertex_groups[v.groups[0].group].name in [grp_ungrouped, grp_weightless]:
-            if grp_ungrouped in obj.vertex_groups:
-                grp = obj.vertex_groups[grp_ungrouped]
-            else:
-                grp = obj.vertex_groups.new(name=grp_ungrouped)
-            grp.add([v.index], 0.0, 'ADD')
-            ungrouped = True
-        else:
-            if any(obj.vertex_groups[x.group].name == grp_ungrouped for x in v.groups):
-                obj.vertex_groups[grp_ungrouped].remove([v.index])
 
+    ungrouped, weightless, members = get_weight_issues(obj, [grp_ungrouped, grp_weightless])
 
-        total_weight = 0
-        for g in v.groups:
-            total_weight += g.weight
-        
-        if total_weight == 0:
-            if grp_weightless in obj.vertex_groups:
-                grp = obj.vertex_groups[grp_weightless]
-            else:
-                grp = obj.vertex_groups.new(name=grp_weightless)
-            grp.add([v.index], 0.0, 'ADD')
-            weightless = True
-        else:
-            if any(obj.vertex_groups[x.group].name == grp_weightless for x in v.groups):
-                obj.vertex_groups[grp_weightless].remove([v.index])
+    # Vertices that are no longer problematic are removed from the groups, empty groups are removed entirely.
+    for name, vertices in [(grp_ungrouped, ungrouped), (grp_weightless, weightless)]:
+        grp = obj.vertex_groups.get(name)
+
+        if len(vertices) == 0:
+            if grp is not None:
+                obj.vertex_groups.remove(grp)
+            continue
 
+        if grp is None:
+            grp = obj.vertex_groups.new(name=name)
+        else:
+            resolved = np.setdiff1d(members[name], vertices)
+            if len(resolved) > 0:
+                grp.remove(resolved.tolist())
 
-    if grp_ungrouped in obj.vertex_groups and len([v for v in obj.data.vertices if obj.vertex_groups[grp_ungrouped].index in [vg.group for vg in v.groups]]) == 0:
-        obj.vertex_groups.remove(obj.vertex_groups[grp_ungrouped])
-    if grp_weightless in obj.vertex_groups and len([v for v in obj.data.vertices if obj.vertex_groups[grp_weightless].index in [vg.group for vg in v.groups]]) == 0:
-        obj.vertex_groups.remove(obj.vertex_groups[grp_weightless])
+        grp.add(vertices.tolist(), 0.0, 'REPLACE')
 
-    if grp_ungrouped in obj.vertex_groups and ungrouped:
+    if len(ungrouped) > 0:
         seut_report(None, context, 'ERROR', True, 'E051', obj.name, f"Vertex is not grouped in vertex group. Added to vertex group '{grp_ungrouped}'.")
         return False
-    if grp_weightless in obj.vertex_groups and weightless:
+    if len(weightless) > 0:
         seut_report(None, context, 'ERROR', True, 'E051', obj.name, f"One or multiple vertices are not weight-painted. Added to vertex group '{grp_weightless}'.")
         return False
     
     return True
 
 
+def get_weight_issues(obj, ignored_groups: list) -> tuple:
+    """Returns the indices of the vertices that are in no vertex group and of those with a total weight of 0, disregarding the ignored groups.
+    Also returns the indices of the vertices in each ignored group that exists."""
+
+    mesh = obj.data
+    count = len(mesh.vertices)
+
+    # Group memberships cannot be read in bulk, so they are collected in a single pass and evaluated as arrays.
+    memberships = [(v.index, g.group, g.weight) for v in mesh.vertices for g in v.groups]
+    if memberships != []:
+        vertex_indices, group_indices, weights = (np.array(column) for column in zip(*memberships))
+    else:
+        vertex_indices = group_indices = np.empty(0, dtype=np.int64)
+        weights = np.empty(0, dtype=np.float64)
+
+    members = {}
+    ignored = []
+    for name in ignored_groups:
+        grp = obj.vertex_groups.get(name)
+        if grp is not None:
+            members[name] = vertex_indices[group_indices == grp.index]
+            ignored.append(grp.index)
+
+    relevant = ~np.isin(group_indices, ignored)
+
+    grouped = np.zeros(count, dtype=bool)
+    grouped[vertex_indices[relevant]] = True
+    total_weights = np.bincount(vertex_indices[relevant], weights=weights[relevant], minlength=count)
+
+    return np.flatnonzero(~grouped), np.flatnonzero(total_weights == 0), members
+
+
 def get_abs_path(path: str) -> str:
     """Returns the absolute path"""
 
@@ -342,77 +392,196 @@ def seut_report(self, context, report_type: str, can_report: bool, code: str, va
 
 
 def add_to_issues(context, issue_type: str, text: str, code: str, reference: str):
-    """Adds an entry to the SEUT issues list"""
+    """Adds an entry to the SEUT issues list, or queues it if a batch is running."""
+
+    if issue_batch is not None:
+        issue_batch.append((time.time(), issue_type, text, code, reference))
+        return
 
     from .seut_utils import get_seut_blend_data
-    data = get_seut_blend_data()
+    store_issue(get_seut_blend_data(), time.time(), issue_type, text, code, reference)
+
+
+def store_issue(data, timestamp: float, issue_type: str, text: str, code: str, reference: str):
+    """Writes an entry into the issues list. Once it is full, the list is a ring buffer and the oldest entry, at issue_head, is overwritten."""
+
     issues = data.seut.issues
 
-    while len(issues) > 49:
-        oldest = None
-        for index in range(0, len(issues)):
-            if oldest == None:
-                oldest = index
-            elif issues[index].timestamp < oldest:
-                oldest = index
-    
-        issues.remove(oldest)
-    
-    issue = issues.add()
-    issue.timestamp = time.time()
+    if len(issues) >= issue_limit:
+        # Lists from before the limit was enforced may be longer, they are trimmed down once.
+        while len(issues) > issue_limit:
+            issues.remove(len(issues) - 1)
+
+        head = data.seut.issue_head % issue_limit
+        issue = issues[head]
+        data.seut.issue_head = (head + 1) % issue_limit
+
+    else:
+        # Until the list is full, entries are inserted right before the oldest one, so the order of the ring is kept.
+        head = min(data.seut.issue_head, len(issues))
+        issue = issues.add()
+        if head != len(issues) - 1:
+            issues.move(len(issues) - 1, head)
+            issue = issues[head]
+        data.seut.issue_head = (head + 1) % issue_limit
+
+    issue.timestamp = timestamp
     issue.issue_type = issue_type
     issue.text = text
+    issue.code = code if code is not None else ""
+    issue.reference = reference if reference is not None else ""
 
-    if code is not None:
-        issue.code = code
-    if reference is not None:
-        issue.reference = reference
     if issue_type == 'ERROR':
         data.seut.issue_alert = True
 
 
-def init_logging():
-    """Duplicates output to a global variable for saving to a log file"""
+def remove_issue(data, index: int):
+    """Removes an entry from the issues list while keeping the order of the ring."""
+
+    data.seut.issues.remove(index)
+
+    if index < data.seut.issue_head:
+        data.seut.issue_head -= 1
+
+
+def clear_issues(data):
+    """Removes all entries from the issues list."""
+
+    data.seut.issues.clear()
+    data.seut.issue_head = 0
+
+
+def begin_issue_batch() -> bool:
+    """Makes reports wait until end_issue_batch is called, so the issues list is only written once.
+    Returns False if a batch is already running, in which case it is ended by whoever started it."""
+
+    global issue_batch
+    if issue_batch is not None:
+        return False
+
+    # Only the newest entries would remain in the list anyway, older ones are dropped from the queue as it fills up.
+    issue_batch = deque(maxlen=issue_limit)
+
+    return True
+
+
+def end_issue_batch():
+    """Writes all queued entries into the issues list."""
+
+    global issue_batch
+    batch = issue_batch if issue_batch is not None else []
+    issue_batch = None
+
+    if len(batch) == 0:
+        return
+
+    from .seut_utils import get_seut_blend_data
+    data = get_seut_blend_data()
+
+    for entry in batch:
+        store_issue(data, *entry)
+
+
+class LogStream(object):
+    """Passes output on to the original stream and duplicates it into the SEUT log."""
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+
+    def write(self, message):
+        self.terminal.write(message)
+
+        # Errors of the log handler are printed to stderr, which would otherwise end up here again.
+        if getattr(log_state, 'writing', False):
+            return
+
+        if message == getattr(log_state, 'previous_message', ""):
+            return
+        log_state.previous_message = message
+
+        log_state.writing = True
+        try:
+            log_tail.append(message)
+            logger.info(message)
+        finally:
+            log_state.writing = False
+
+    def flush(self):
+        self.terminal.flush()
+        if log_handler is not None:
+            log_handler.flush()
+
+
+def init_logging(size: int = None):
+    """Duplicates output into a log file in Blender's temporary directory, which is rotated once it reaches the given size in MB.
+    Also keeps the last messages in memory. Can be called again to change the size."""
+
+    global log_handler
+
+    if size is None:
+        from .seut_utils import get_preferences
+        size = get_preferences().log_size
+
+    # The current file and one rotated file are kept, so together they stay within the size.
+    max_bytes = max(size, 1) * 1024 * 1024 // 2
+
+    if log_handler is None:
+        # Without a log file, only the messages kept in memory can be exported.
+        try:
+            log_handler = RotatingFileHandler(get_log_path(), maxBytes=max_bytes, backupCount=1, encoding='utf-8')
+        except OSError:
+            log_handler = None
+        else:
+            # Messages are written as they are passed to the streams, which already contain their line breaks.
+            log_handler.terminator = ""
+            logger.addHandler(log_handler)
+    else:
+        log_handler.maxBytes = max_bytes
+
+    if not isinstance(sys.stdout, LogStream):
+        sys.stdout = LogStream(sys.stdout)
+    if not isinstance(sys.stderr, LogStream):
+        sys.stderr = LogStream(sys.stderr)
+
+
+def end_logging():
+    """Stops duplicating output into the log."""
+
+    global log_handler
 
-    global log
+    if isinstance(sys.stdout, LogStream):
+        sys.stdout = sys.stdout.terminal
+    if isinstance(sys.stderr, LogStream):
+        sys.stderr = sys.stderr.terminal
 
-    class OutLogger(object):
-        def __init__(self):
-            self.terminal = sys.stdout
-            self.out = log
+    if log_handler is not None:
+        logger.removeHandler(log_handler)
+        log_handler.close()
+        log_handler = None
 
-        def write(self, message):
-            self.terminal.write(message)
 
-            global previous_message
-            if message == previous_message:
-                return
-            previous_message = message
-            self.out.write(anonymize_paths(message))
+def get_log_path() -> str:
+    """Returns the path of the current log file."""
 
-        def flush(self):
-            self.out.flush()
+    return os.path.join(bpy.app.tempdir, 'space-engineers-utilities.log')
 
-    class ErrLogger(object):
-        def __init__(self):
-            self.terminal = sys.stderr
-            self.out = log
 
-        def write(self, message):
-            self.terminal.write(message)
+def write_log(file):
+    """Writes the log, oldest messages first, into an open file, with user names removed from paths."""
 
-            global previous_message
-            if message == previous_message:
-                return
-            previous_message = message
-            self.out.write(anonymize_paths(message))
+    if log_handler is None:
+        for message in log_tail:
+            file.write(anonymize_paths(message))
+        return
 
-        def flush(self):
-            self.terminal.flush()
-            self.out.flush()
+    log_handler.flush()
 
-    sys.stdout = OutLogger()
-    sys.stderr = ErrLogger()
+    for path in [f"{log_handler.baseFilename}.1", log_handler.baseFilename]:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                file.write(anonymize_paths(line))
 
 
 def anonymize_paths(message):
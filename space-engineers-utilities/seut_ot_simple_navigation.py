@@ -2,7 +2,7 @@ import bpy
 
 from bpy.types import Operator
 
-from .seut_collections              import get_collections
+from .seut_collections              import get_collections, get_scene_collections
 from .seut_errors                   import seut_report
 from .seut_utils                    import get_seut_blend_data
 
@@ -24,20 +24,14 @@ class SEUT_OT_SimpleNavigation(Operator):
             return {'FINISHED'}
 
         if not data.seut.simple_navigation:
-            for col in bpy.data.collections:
-                if col is not None and col.seut.scene is scene:
-                    if col.seut.col_type == 'seut':
-                        continue
-                    else:
-                        context.view_layer.layer_collection.children[collections['seut'][0].name].children[col.name].hide_viewport = False
+            for col in get_scene_collections(scene):
+                if col.seut.col_type == 'seut':
+                    continue
+                else:
+                    context.view_layer.layer_collection.children[collections['seut'][0].name].children[col.name].hide_viewport = False
             return {'FINISHED'}
 
-        check = False
-        for col in bpy.data.collections:
-            if col is not None and col.seut.scene is scene:
-                check = True
-
-        if not check:
+        if get_scene_collections(scene) == []:
             seut_report(self, context, 'ERROR', False, 'E010')
             data.seut.simple_navigation = False
             return {'CANCELLED'}
@@ -63,12 +57,11 @@ class SEUT_OT_SimpleNavigation(Operator):
         if active_col.collection.seut.col_type == 'none':
             return {'PASS_THROUGH'}
         
-        for col in bpy.data.collections:
-            if col is not None and col.seut.scene is scene:
-                if col.seut.col_type in ['seut', 'render', 'mountpoints', 'mirroring'] or col == active_col.collection:
-                    continue
-                else:
-                    context.view_layer.layer_collection.children[collections['seut'][0].name].children[col.name].hide_viewport = True
+        for col in get_scene_collections(scene):
+            if col.seut.col_type in ['seut', 'render', 'mountpoints', 'mirroring'] or col == active_col.collection:
+                continue
+            else:
+                context.view_layer.layer_collection.children[collections['seut'][0].name].children[col.name].hide_viewport = True
 
         return {'PASS_THROUGH'}
 
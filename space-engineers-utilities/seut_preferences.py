@@ -8,7 +8,7 @@ from bpy.types  import Operator, AddonPreferences
 from bpy.props  import BoolProperty, StringProperty, EnumProperty, IntProperty
 
 from .utils.seut_repositories       import *
-from .seut_errors                   import seut_report, get_abs_path
+from .seut_errors                   import seut_report, get_abs_path, init_logging
 from .seut_utils                    import get_preferences, get_addon, get_seut_blend_data, wrap_text
 from .seut_bau                      import draw_bau_ui, get_config, set_config
 
@@ -147,6 +147,12 @@ def init_relocate_matlibs():
         relocate_matlibs(os.path.join(preferences.asset_path, 'Materials'))
 
 
+def update_log_size(self, context):
+    init_logging(self.log_size)
+
+    save_addon_prefs()
+
+
 def update_havok_path(self, context):
     filename = 'hctStandAloneFilterManager.exe'
 
@@ -206,6 +212,26 @@ class SEUT_AddonPreferences(AddonPreferences):
         description="Enable or disable the SEUT Animations menu panel being displayed.\nNote that animations are not working yet",
         default= False,
     )
+    texture_cache_size: IntProperty(
+        name="Texture Cache Size",
+        description="Maximum size of the cache of converted textures within the Asset Directory, in MB. The least recently used textures are removed once it is exceeded",
+        default=2048,
+        min=0,
+        subtype='UNSIGNED'
+    )
+    log_size: IntProperty(
+        name="Log Size",
+        description="Maximum size of the log of this Blender session, in MB. The oldest messages are removed once it is exceeded",
+        default=20,
+        min=1,
+        subtype='UNSIGNED',
+        update=update_log_size
+    )
+    profile_export: BoolProperty(
+        name="Profile Exports",
+        description="Measure time and memory use of every stage of an export. The results are shown in the SEUT Notifications screen and written next to each MWM as JSON and as a trace that can be opened in chrome://tracing",
+        default=False
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -293,6 +319,7 @@ class SEUT_AddonPreferences(AddonPreferences):
         if sys.platform == "win32":
             split.operator('wm.console_toggle', text="", icon='CONSOLE')
         box.prop(self, "asset_path", expand=True)
+        box.prop(self, "texture_cache_size", text="Texture Cache Size (MB)")
 
         if os.path.exists(preferences.asset_path):
             repo = data.seut.repos['seut-assets']
@@ -393,6 +420,11 @@ class SEUT_AddonPreferences(AddonPreferences):
         box.label(text="External Tools", icon='TOOL_SETTINGS')
         box.prop(self, "havok_path", text="Havok Filter Manager", expand=True)
 
+        box = layout.box()
+        box.label(text="Logging", icon='TEXT')
+        box.prop(self, "log_size", text="Log Size (MB)")
+        box.prop(self, "profile_export")
+
         box = layout.box()
         box.label(text="SEUT Panels", icon="META_PLANE")
         row = box.row()
@@ -290,7 +290,7 @@ def update_export_exportPath(self, context):
         seut_report(self, context, 'ERROR', False, 'E045', get_abs_path(self.mod_path))
         self.export_exportPath = ""
 
-    if path.find("Models\\") != -1 or (path + "\\").find("Models\\") != -1:
+    if (path + os.sep).find("Models" + os.sep) != -1:
         pass
     else:
         seut_report(self, context, 'ERROR', False, 'E014', path, scene.name)
@@ -928,6 +928,13 @@ class SEUT_Scene(PropertyGroup):
             ),
         default='2048'
     )
+    bake_samples: IntProperty(
+        name='Samples',
+        description="How many samples per pixel to bake height maps with. More samples smooth the edges between pixels but increase bake times.\nBiome and ore spot maps always use a single sample, so material colors are never blended",
+        default=256,
+        min=1,
+        max=4096
+    )
     export_map_height: BoolProperty(
         name="Height Map",
         description="Whether to export the height map",
@@ -324,6 +324,10 @@ class SEUT_Text(PropertyGroup):
     issue_index: IntProperty(
         default=0
     )
+    issue_head: IntProperty(
+        description="Index of the oldest issue, which is overwritten next once the issues list is full",
+        default=0
+    )
     issue_alert: BoolProperty(
         default=False
     )
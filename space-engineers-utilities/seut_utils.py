@@ -275,11 +275,11 @@ def create_relative_path(path: str, folder_name: str):
     """Returns the path capped off before the last occurrence of the foldername, returns False if foldername is not found in path"""
     
     path = get_abs_path(path)
-    offset = path.rfind("\\" + folder_name + "\\")
+    offset = path.rfind(os.sep + folder_name + os.sep)
 
     if offset == -1:
-        if path.endswith("\\" + folder_name):
-            return path[path.rfind("\\" + folder_name) + 1:]
+        if path.endswith(os.sep + folder_name):
+            return path[path.rfind(os.sep + folder_name) + 1:]
         else:
             return False
     else:
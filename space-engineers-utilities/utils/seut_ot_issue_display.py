@@ -8,9 +8,10 @@ import traceback
 from bpy.types              import Operator
 from bpy.props              import StringProperty, IntProperty
 
-from ..seut_errors      import log, seut_report, anonymize_paths
+from ..seut_errors      import seut_report, anonymize_paths, remove_issue, clear_issues, write_log
 from ..seut_utils       import wrap_text, get_preferences, get_seut_blend_data
 from .seut_repositories import update_register_repos
+from .seut_profiler     import get_last_summary
 
 
 class SEUT_OT_IssueDisplay(Operator):
@@ -58,6 +59,25 @@ class SEUT_OT_IssueDisplay(Operator):
             split.prop(data.seut, 'display_warnings', icon='ERROR', text="")
             split.prop(data.seut, 'display_infos', icon='INFO', text="")
             layout.separator(factor=1.0)
+
+        summary = get_last_summary()
+        if summary != []:
+            box = layout.box()
+            box.label(text="Last Export Profile", icon='TIME')
+            row = box.row()
+            row.active = False
+            for text in ["Stage", "Runs", "Wall Time", "CPU Time", "Memory Increase", "Tool Peak Memory"]:
+                row.label(text=text)
+            for stage in summary:
+                row = box.row()
+                row.scale_y = 0.75
+                row.label(text=stage['stage'])
+                row.label(text=str(stage['count']))
+                row.label(text=f"{stage['wall']:.2f}s")
+                row.label(text=f"{stage['cpu']:.2f}s")
+                for memory in [stage['memory'], stage['tool_peak_rss']]:
+                    row.label(text=f"{memory / 1024 / 1024:.0f} MB" if memory is not None else "-")
+            layout.separator(factor=1.0)
         
         for issue in SEUT_OT_IssueDisplay.issues_sorted:
 
@@ -147,7 +167,7 @@ class SEUT_OT_DeleteIssue(Operator):
 
         for index in range(0, len(data.seut.issues)):
             if data.seut.issues[index] == SEUT_OT_IssueDisplay.issues_sorted[self.idx]:
-                data.seut.issues.remove(index)
+                remove_issue(data, index)
                 break
 
         SEUT_OT_IssueDisplay.issues_sorted.clear()
@@ -166,7 +186,7 @@ class SEUT_OT_ClearIssues(Operator):
     def execute(self, context):
         
         data = get_seut_blend_data()
-        data.seut.issues.clear()
+        clear_issues(data)
         SEUT_OT_IssueDisplay.issues_sorted.clear()
         
         return {'FINISHED'}
@@ -227,10 +247,10 @@ class SEUT_OT_ExportLog(Operator):
 
         seut_report(self, context, 'INFO', False, 'I001', path)
         
-        with open(path, "w") as f:
+        with open(path, "w", encoding='utf-8') as f:
             for l in info:
                 print(l, file=f)
-            print(log.getvalue(), file=f)
+            write_log(f)
 
         subprocess.Popen(f'explorer /select,"{path}"')
         
@@ -0,0 +1,76 @@
+import os
+import zlib
+import struct
+import numpy as np
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Fast deflate level. Together with the Up filter it compresses smooth maps well, higher levels mostly cost time.
+PNG_COMPRESSION = 1
+
+# PNG color types by number of channels.
+color_types = {
+    1: 0, # Greyscale
+    3: 2, # RGB
+    4: 6, # RGBA
+}
+
+
+def quantize(pixels: np.ndarray, dtype) -> np.ndarray:
+    """Converts values between 0 and 1 to an unsigned integer type, rounded the same way as Blender does when saving images."""
+
+    scale = np.iinfo(dtype).max
+    return (np.clip(pixels, 0.0, 1.0) * scale + 0.5).astype(dtype)
+
+
+def encode_png(pixels: np.ndarray, compression: int = PNG_COMPRESSION) -> bytes:
+    """Encodes an array of shape (height, width) or (height, width, channels) of uint8 or uint16 as PNG. The first row is the top of the image.
+    Releases the GIL while compressing, so images can be encoded in parallel threads."""
+
+    if pixels.ndim == 2:
+        pixels = pixels[..., np.newaxis]
+
+    height, width, channels = pixels.shape
+    if channels not in color_types:
+        raise ValueError(f"Unsupported number of channels: {channels}")
+
+    if pixels.dtype == np.uint8:
+        bit_depth = 8
+    elif pixels.dtype == np.uint16:
+        bit_depth = 16
+        # PNG stores samples big-endian.
+        pixels = pixels.astype('>u2', copy=False)
+    else:
+        raise ValueError(f"Unsupported pixel type: {pixels.dtype}")
+
+    rows = np.ascontiguousarray(pixels).view(np.uint8).reshape(height, width * channels * (bit_depth // 8))
+
+    # Every row uses the Up filter, which stores the difference to the row above.
+    filtered = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+
+    header = struct.pack('>IIBBBBB', width, height, bit_depth, color_types[channels], 0, 0, 0)
+
+    return b''.join([
+        PNG_SIGNATURE,
+        get_chunk(b'IHDR', header),
+        get_chunk(b'IDAT', zlib.compress(filtered.tobytes(), compression)),
+        get_chunk(b'IEND', b''),
+    ])
+
+
+def write_png(path: str, pixels: np.ndarray, compression: int = PNG_COMPRESSION):
+    """Encodes the pixels as PNG and writes them to a file."""
+
+    data = encode_png(pixels, compression)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def get_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
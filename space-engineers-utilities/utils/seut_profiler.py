@@ -0,0 +1,296 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+
+from ..seut_errors  import seut_report
+
+
+# Stages of the export that are measured.
+STAGE_XML = "XML"
+STAGE_FBX = "FBX"
+STAGE_TEXTURES = "Texture Conversion"
+STAGE_FBXIMPORTER = "FBXImporter"
+STAGE_HAVOK = "Havok Filter"
+STAGE_MWMBUILDER = "MWM Builder"
+STAGE_SBC = "SBC Update"
+
+profile = None
+last_summary = []
+stage_stack = threading.local()
+
+
+class Profile:
+    """The measurements of all stages of one export, from all threads."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.entries = []
+        self.targets = []
+        self.lock = threading.Lock()
+
+
+    def add_entry(self, entry: dict):
+        with self.lock:
+            self.entries.append(entry)
+
+
+    def add_target(self, scene_name: str, subtype_id: str, path: str):
+        """Registers the directory a scene's MWM is written to, where its profile is written to as well."""
+
+        with self.lock:
+            self.targets.append((scene_name, subtype_id, path))
+
+
+    def get_entries(self, scene_name: str = None, subtype_id: str = None) -> list:
+        """Returns the entries of a scene. Entries of export jobs are limited to the given SubtypeId."""
+
+        with self.lock:
+            entries = list(self.entries)
+
+        if scene_name is None:
+            return entries
+
+        return [e for e in entries if e['scene'] == scene_name and (e['subtype_id'] is None or e['subtype_id'] == subtype_id)]
+
+
+def begin_profile(enabled: bool):
+    """Starts recording the stages of an export, if enabled. Replaces the profile of an export that did not finish."""
+
+    global profile
+    profile = Profile() if enabled else None
+
+
+def end_profile(self, context):
+    """Stops recording, writes the profile of every target next to its MWM and keeps a summary for display."""
+
+    global profile, last_summary
+    current = profile
+    profile = None
+
+    if current is None:
+        return
+
+    last_summary = get_summary(current.get_entries())
+
+    for scene_name, subtype_id, path in current.targets:
+        entries = current.get_entries(scene_name, subtype_id)
+        if entries == []:
+            continue
+
+        profile_path = os.path.join(path, f"{subtype_id}.profile.json")
+        trace_path = os.path.join(path, f"{subtype_id}.trace.json")
+
+        try:
+            with open(profile_path, 'w') as f:
+                json.dump({'scene': scene_name, 'subtype_id': subtype_id, 'stages': entries, 'summary': get_summary(entries)}, f, indent=4)
+            with open(trace_path, 'w') as f:
+                json.dump(get_trace(entries), f)
+        except OSError as e:
+            seut_report(self, context, 'ERROR', False, 'E055', profile_path, str(e))
+            continue
+
+        seut_report(self, context, 'INFO', False, 'I023', profile_path)
+
+
+def discard_profile():
+    """Stops recording without writing the profile."""
+
+    global profile
+    profile = None
+
+
+def get_last_summary() -> list:
+    """Returns the per-stage summary of the last profiled export."""
+
+    return last_summary
+
+
+def add_profile_target(scene_name: str, subtype_id: str, path: str):
+    """Registers the MWM directory of a target of the export, if it is being profiled."""
+
+    if profile is not None:
+        profile.add_target(scene_name, subtype_id, path)
+
+
+@contextlib.contextmanager
+def profile_stage(stage: str, scene_name: str, collection: str = None, subtype_id: str = None):
+    """Measures wall time, CPU time and the increase of Blender's memory usage (RSS) over the code within, if an export is being profiled.
+    Memory is measured for the whole process, so stages running in parallel threads contribute to each other's increase.
+    Tool processes run within are measured through record_process."""
+
+    current = profile
+    if current is None:
+        yield
+        return
+
+    stack = get_stage_stack()
+    entry = {
+        'stage': stage,
+        'scene': scene_name,
+        'collection': collection,
+        'subtype_id': subtype_id,
+        'thread': threading.get_ident(),
+        'start': time.perf_counter() - current.start,
+        'wall': 0.0,
+        'nested': 0.0,
+        'cpu': 0.0,
+        'tool_cpu': 0.0,
+        'memory': None,
+        'tool_peak_rss': None,
+    }
+    stack.append(entry)
+
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    rss = get_memory_usage()
+    try:
+        yield
+
+    finally:
+        stack.pop()
+        entry['wall'] = time.perf_counter() - wall
+        entry['cpu'] += time.thread_time() - cpu
+        rss_end = get_memory_usage()
+        if rss is not None and rss_end is not None:
+            entry['memory'] = rss_end - rss
+
+        # Time spent in nested stages is only counted once, for the innermost stage.
+        if stack != []:
+            stack[-1]['nested'] += entry['wall']
+            stack[-1]['cpu'] -= entry['cpu']
+
+        current.add_entry(entry)
+
+
+def record_process(process):
+    """Adds the CPU time and peak memory of a tool process that has exited to the stage currently measured in this thread."""
+
+    stack = get_stage_stack()
+    if profile is None or stack == []:
+        return
+
+    cpu, peak_rss = get_process_usage(process)
+    entry = stack[-1]
+    if cpu is not None:
+        entry['tool_cpu'] += cpu
+    if peak_rss is not None:
+        entry['tool_peak_rss'] = max(entry['tool_peak_rss'] or 0, peak_rss)
+
+
+def get_stage_stack() -> list:
+    """Returns the stages currently measured in this thread, innermost last."""
+
+    if not hasattr(stage_stack, 'entries'):
+        stage_stack.entries = []
+
+    return stage_stack.entries
+
+
+def get_summary(entries: list) -> list:
+    """Returns the total wall time and CPU time per stage, excluding time spent in nested stages,
+    along with the largest increase of Blender's memory usage and the highest peak memory of a tool process. Memory values are None if unknown."""
+
+    stages = {}
+    for e in entries:
+        stage = stages.setdefault(e['stage'], {'stage': e['stage'], 'count': 0, 'wall': 0.0, 'cpu': 0.0, 'memory': None, 'tool_peak_rss': None})
+        stage['count'] += 1
+        stage['wall'] += e['wall'] - e['nested']
+        stage['cpu'] += e['cpu'] + e['tool_cpu']
+        if e['memory'] is not None:
+            stage['memory'] = max(stage['memory'] if stage['memory'] is not None else e['memory'], e['memory'])
+        if e['tool_peak_rss'] is not None:
+            stage['tool_peak_rss'] = max(stage['tool_peak_rss'] or 0, e['tool_peak_rss'])
+
+    return sorted(stages.values(), key=lambda s: s['wall'], reverse=True)
+
+
+def get_trace(entries: list) -> dict:
+    """Returns the entries in the Chrome trace event format, which can be opened in chrome://tracing or Perfetto."""
+
+    events = []
+    for e in entries:
+        name = e['stage'] if e['collection'] is None else f"{e['stage']} ({e['collection']})"
+        events.append({
+            'name': name,
+            'cat': e['stage'],
+            'ph': 'X',
+            'ts': round(e['start'] * 1000000),
+            'dur': round(e['wall'] * 1000000),
+            'pid': os.getpid(),
+            'tid': e['thread'],
+            'args': {'scene': e['scene'], 'subtype_id': e['subtype_id'], 'cpu': e['cpu'], 'tool_cpu': e['tool_cpu'], 'memory': e['memory'], 'tool_peak_rss': e['tool_peak_rss']},
+        })
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def get_process_usage(process) -> tuple:
+    """Returns the CPU time in seconds and the peak memory in bytes of a tool process that has exited.
+    Values that cannot be determined on this platform are None."""
+
+    if sys.platform == 'win32':
+        return get_windows_process_usage(process)[:2]
+
+    return None, None
+
+
+def get_memory_usage() -> int:
+    """Returns the memory Blender currently uses (RSS) in bytes. None if it cannot be determined on this platform."""
+
+    if sys.platform == 'win32':
+        return get_windows_process_usage()[2]
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_windows_process_usage(process=None) -> tuple:
+    """Returns the CPU time, peak working set and current working set of a process through the Windows API."""
+
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+
+    if process is None:
+        handle = kernel32.GetCurrentProcess()
+    else:
+        # The handle of a Popen object stays open until it is garbage collected.
+        handle = wintypes.HANDLE(int(process._handle))
+
+    cpu = None
+    times = [wintypes.FILETIME() for i in range(4)]
+    if kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+        kernel, user = [(t.dwHighDateTime << 32 | t.dwLowDateTime) / 10000000 for t in times[2:]]
+        cpu = kernel + user
+
+    peak_rss = None
+    rss = None
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    if kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        peak_rss = counters.PeakWorkingSetSize
+        rss = counters.WorkingSetSize
+
+    return cpu, peak_rss, rss
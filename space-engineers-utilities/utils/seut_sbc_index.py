@@ -0,0 +1,242 @@
+import bpy
+import os
+import re
+import json
+import hashlib
+
+
+INDEX_VERSION = 1
+
+sbc_indexes = {}
+
+subtype_id_pattern = re.compile(r'<SubtypeId>(.*?)</SubtypeId>', re.DOTALL)
+
+
+class SBCIndex:
+    """Remembers where definitions are located within the SBC files of a mod, so lookups only need to re-read files that changed since the mod was last walked.
+    The mod is walked once until the index is invalidated, after which definitions are looked up directly by their SubtypeId."""
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self.path = os.path.join(get_index_dir(), hashlib.sha1(os.path.normcase(self.root).encode('utf-8')).hexdigest() + '.json')
+        self.files = {}
+        self.dirty = False
+        self.sbc_files = None
+        self.definitions = {}
+
+        self.load()
+
+
+    def load(self):
+        """Loads the persisted index of the mod, if there is a valid one."""
+
+        if not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') != INDEX_VERSION or data.get('root') != self.root:
+            return
+
+        self.files = data.get('files', {})
+
+
+    def save(self):
+        """Persists the index if it was changed."""
+
+        if not self.dirty:
+            return
+
+        data = {
+            'version': INDEX_VERSION,
+            'root': self.root,
+            'files': self.files
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(data, f)
+            self.dirty = False
+        except OSError:
+            pass
+
+
+    def refresh(self) -> list:
+        """Walks the mod without reading any files and drops the records of all files that were changed or removed. Returns the SBC files in walk order."""
+
+        sbc_files = []
+        for path, subdirs, files in os.walk(self.root):
+            if path == self.root:
+                continue
+            for name in files:
+                if not name.endswith(".sbc"):
+                    continue
+
+                file = os.path.join(path, name)
+                try:
+                    stat = os.stat(file)
+                except OSError:
+                    continue
+
+                rel_path = os.path.relpath(file, self.root)
+                record = self.files.get(rel_path)
+                if record is None or record['mtime'] != stat.st_mtime_ns or record['size'] != stat.st_size:
+                    self.files[rel_path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'sections': {}}
+                    self.dirty = True
+
+                sbc_files.append(rel_path)
+
+        for rel_path in set(self.files) - set(sbc_files):
+            del self.files[rel_path]
+            self.dirty = True
+
+        return sbc_files
+
+
+    def invalidate(self):
+        """Makes the next lookup walk the mod again, to pick up files that were changed or added since."""
+
+        self.sbc_files = None
+        self.definitions = {}
+
+
+    def get_definitions(self, sbc_type: str, container_name: str) -> tuple:
+        """Returns a dict of the SubtypeIds of all definitions of the given type and the file containing them, along with the last file containing the type.
+        Files earlier in walk order take precedence."""
+
+        if self.sbc_files is None:
+            self.sbc_files = self.refresh()
+            self.definitions = {}
+
+        key = f"{sbc_type}|{container_name}"
+        if key not in self.definitions:
+            definitions = {}
+            last_sbc = None
+            for rel_path in self.sbc_files:
+                section = self.get_section(rel_path, sbc_type, container_name)
+                if section is None:
+                    continue
+                last_sbc = rel_path
+
+                for subtype_id in section:
+                    definitions.setdefault(subtype_id, rel_path)
+
+            self.definitions[key] = (definitions, last_sbc)
+
+        return self.definitions[key]
+
+
+    def get_section(self, rel_path: str, sbc_type: str, container_name: str, lines: str = None):
+        """Returns the definitions of the given type within a file as a dict of SubtypeId and offsets. None if the file does not contain the type."""
+
+        sections = self.files[rel_path]['sections']
+        key = f"{sbc_type}|{container_name}"
+
+        if key not in sections:
+            if lines is None:
+                lines = read_sbc(os.path.join(self.root, rel_path))
+            sections[key] = index_section(lines, sbc_type, container_name)
+            self.dirty = True
+
+        return sections[key]
+
+
+    def lookup(self, sbc_type: str, container_name: str, subtype_id: str) -> list:
+        """Returns the file, its content and the offsets of the definition. Offsets are None if the definition is not found in any file."""
+
+        result = self.find(sbc_type, container_name, subtype_id, True)
+        self.save()
+
+        return result
+
+
+    def find(self, sbc_type: str, container_name: str, subtype_id: str, retry: bool) -> list:
+        definitions, last_sbc = self.get_definitions(sbc_type, container_name)
+
+        rel_path = definitions.get(subtype_id)
+        if rel_path is not None:
+            file = os.path.join(self.root, rel_path)
+            lines = read_sbc(file)
+            start, end = self.files[rel_path]['sections'][f"{sbc_type}|{container_name}"][subtype_id]
+
+            if is_definition(lines, start, end, container_name, subtype_id):
+                return [file, lines, start, end]
+
+            # The file may have been changed within the timestamp resolution of the filesystem.
+            if retry:
+                self.files[rel_path]['sections'] = {}
+                self.get_section(rel_path, sbc_type, container_name, lines)
+                self.definitions = {}
+                return self.find(sbc_type, container_name, subtype_id, False)
+
+        if last_sbc is not None:
+            file = os.path.join(self.root, last_sbc)
+            return [file, read_sbc(file), None, None]
+        else:
+            return [None, None, None, None]
+
+
+def get_index_dir() -> str:
+    """Returns the directory the SBC indexes are stored in."""
+
+    return os.path.join(bpy.utils.user_resource('CONFIG'), 'seut-cache', 'sbc-index')
+
+
+def get_sbc_index(root: str) -> SBCIndex:
+    """Returns the SBC index of a mod, loading it if it is not yet in memory."""
+
+    root = os.path.normpath(root)
+    if root not in sbc_indexes:
+        sbc_indexes[root] = SBCIndex(root)
+
+    return sbc_indexes[root]
+
+
+def invalidate_sbc_indexes():
+    """Makes all indexes walk their mod again on their next lookup."""
+
+    for index in sbc_indexes.values():
+        index.invalidate()
+
+
+def read_sbc(file: str) -> str:
+    """Returns the content of an SBC file."""
+
+    with open(file) as f:
+        return f.read()
+
+
+def index_section(lines: str, sbc_type: str, container_name: str):
+    """Returns the offsets of all definitions within the specified type of a file. None if the file does not contain the type."""
+
+    if f'<{sbc_type}>' not in lines:
+        return None
+
+    entries_start = lines.find(f'<{sbc_type}>') + len(f'<{sbc_type}>')
+    entries_end = lines.find(f'</{sbc_type}>')
+    if entries_end == -1:
+        entries_end = len(lines)
+
+    section = {}
+    for match in subtype_id_pattern.finditer(lines, entries_start, entries_end):
+        subtype_id = match.group(1)
+        if subtype_id in section:
+            continue
+
+        start = lines.rfind(f'<{container_name}', entries_start, match.start())
+        end = lines.find(f'</{container_name}>', start) + len(f'</{container_name}>')
+        section[subtype_id] = [start, end]
+
+    return section
+
+
+def is_definition(lines: str, start: int, end: int, container_name: str, subtype_id: str) -> bool:
+    """Checks whether the given offsets still point to the expected definition."""
+
+    entry = lines[start:end]
+    return entry.startswith(f'<{container_name}') and entry.endswith(f'</{container_name}>') and f'<SubtypeId>{subtype_id}</SubtypeId>' in entry
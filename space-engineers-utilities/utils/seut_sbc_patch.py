@@ -0,0 +1,213 @@
+import re
+
+from xml.sax.saxutils   import escape
+
+
+# Comments, declarations and CDATA sections are skipped, all other matches are tags.
+TOKEN_PATTERN = re.compile(r'<!--.*?-->|<\?.*?\?>|<!\[CDATA\[.*?\]\]>|<!.*?>|<(/?)([^\s/>]+)((?:\s*[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)\s*(/?)>', re.DOTALL)
+ATTRIB_PATTERN = re.compile(r'([^\s=]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+class XMLSpan:
+    """An element of an XML text, described by its offsets within the text."""
+
+    def __init__(self, tag: str, start: int, parent=None):
+        self.tag = tag
+        self.start = start
+        self.end = None
+        self.content_start = None
+        self.content_end = None
+        self.attribs = {}
+        self.children = []
+        self.parent = parent
+
+
+    def contains(self, span) -> bool:
+        return self.start <= span.start and span.end <= self.end
+
+
+class SBCPatch:
+    """Parses one definition of an SBC file into a tree of spans and collects edits to it,
+    which are applied to the text of the file in a single pass."""
+
+    def __init__(self, text: str, start: int = 0, end: int = None):
+        self.text = text
+        self.root = None
+        self.tags = {}
+        self.edits = []
+
+        self.parse(start, len(text) if end is None else end)
+
+
+    def parse(self, start: int, end: int):
+        """Builds the span tree of the first element between start and end."""
+
+        current = None
+        for match in TOKEN_PATTERN.finditer(self.text, start, end):
+            closing, tag, attribs, self_closing = match.groups()
+            if tag is None:
+                continue
+
+            if closing:
+                if current is None:
+                    break
+                if not self.is_open(current, tag):
+                    continue
+                # Elements that were not closed end where their parent does.
+                while current.tag != tag:
+                    current.content_end = current.end = match.start()
+                    current = current.parent
+                current.content_end = match.start()
+                current.end = match.end()
+                current = current.parent
+                if current is None:
+                    break
+                continue
+
+            if current is None and self.root is not None:
+                break
+
+            span = XMLSpan(tag, match.start(), current)
+            offset = match.start(3)
+            for attrib in ATTRIB_PATTERN.finditer(attribs):
+                group = 2 if attrib.group(2) is not None else 3
+                span.attribs[attrib.group(1)] = (offset + attrib.start(group), offset + attrib.end(group))
+
+            if current is None:
+                self.root = span
+            else:
+                current.children.append(span)
+            self.tags.setdefault(tag, []).append(span)
+
+            if self_closing:
+                span.end = match.end()
+            else:
+                span.content_start = match.end()
+                current = span
+
+        # Elements left open at the end of the definition end there.
+        while current is not None:
+            current.content_end = current.end = end
+            current = current.parent
+
+
+    def is_open(self, span: XMLSpan, tag: str) -> bool:
+        """Returns True if the element or one of its parents has the tag."""
+
+        while span is not None:
+            if span.tag == tag:
+                return True
+            span = span.parent
+
+        return False
+
+
+    def find(self, path: str, scope: XMLSpan = None, attrib: str = None) -> XMLSpan:
+        """Returns the element at a path of tags separated by '/', relative to the scope or the root. None if not found.
+        Each step prefers direct children over elements nested deeper. The last element may be required to have a matching 'name' attribute."""
+
+        if scope is None:
+            scope = self.root
+        if scope is None:
+            return None
+
+        steps = path.split('/')
+        for idx, tag in enumerate(steps):
+            name = attrib if idx == len(steps) - 1 else None
+            scope = self.find_child(scope, tag, name)
+            if scope is None:
+                return None
+
+        return scope
+
+
+    def find_child(self, scope: XMLSpan, tag: str, name: str = None) -> XMLSpan:
+
+        candidates = [span for span in self.tags.get(tag, []) if span is not scope and scope.contains(span)]
+        if name is not None:
+            candidates = [span for span in candidates if self.get_attrib(span, 'name') == name]
+
+        for span in candidates:
+            if span.parent is scope:
+                return span
+
+        return candidates[0] if candidates != [] else None
+
+
+    def get_text(self, span: XMLSpan) -> str:
+        return self.text[span.start:span.end]
+
+
+    def get_attrib(self, span: XMLSpan, name: str) -> str:
+        """Returns the value of an attribute of the element. None if it has no such attribute."""
+
+        if name not in span.attribs:
+            return None
+
+        start, end = span.attribs[name]
+        return self.text[start:end]
+
+
+    def replace(self, start: int, end: int, text: str):
+        """Replaces a range of the original text. Edits within the range that were made before are discarded."""
+
+        if start < end:
+            self.edits = [e for e in self.edits if not (start <= e[0] and e[1] <= end and (e[0] < e[1] or start < e[0] < end))]
+        self.edits.append((start, end, text))
+
+
+    def set_text(self, span: XMLSpan, value):
+        """Sets the content of an element."""
+
+        if span.content_start is None:
+            self.expand(span, escape(str(value)))
+        else:
+            self.replace(span.content_start, span.content_end, escape(str(value)))
+
+
+    def set_attrib(self, span: XMLSpan, name: str, value):
+        start, end = span.attribs[name]
+        self.replace(start, end, escape(str(value), {'"': "&quot;"}))
+
+
+    def insert(self, parent: XMLSpan, text: str):
+        """Adds text at the end of the content of an element."""
+
+        if parent.content_end is None:
+            self.expand(parent, text)
+        else:
+            self.replace(parent.content_end, parent.content_end, text)
+
+
+    def expand(self, span: XMLSpan, content: str):
+        """Replaces a self-closing element with one that has content."""
+
+        attribs = self.text[span.start + 1 + len(span.tag):span.end - 2].rstrip()
+        self.replace(span.start, span.end, f"<{span.tag}{attribs}>{content}</{span.tag}>")
+
+
+    def remove(self, span: XMLSpan):
+        self.replace(span.start, span.end, "")
+
+
+    def apply(self) -> str:
+        """Returns the text with all edits applied."""
+
+        if self.edits == []:
+            return self.text
+
+        parts = []
+        position = 0
+        for start, end, text in sorted(self.edits, key=lambda e: (e[0], e[1])):
+            if start < position:
+                continue
+            parts.append(self.text[position:start])
+            parts.append(text)
+            position = end
+        parts.append(self.text[position:])
+
+        return "".join(parts)
+
+
+    def __str__(self) -> str:
+        return self.apply()
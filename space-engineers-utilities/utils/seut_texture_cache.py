@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+from ..seut_errors  import get_abs_path
+from ..seut_utils   import get_preferences
+
+
+CACHE_VERSION = 1
+
+texture_caches = {}
+texture_batch = None
+
+
+class TextureCache:
+    """Keeps converted textures by the content of their source file and the conversion preset,
+    so a texture only needs to be converted again if it actually changed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = os.path.join(path, 'index.json')
+        self.entries = {}
+        self.sources = {}
+        self.targets = {}
+        self.dirty = False
+
+        self.load()
+
+
+    def load(self):
+        """Loads the index of the cache, if there is a valid one."""
+
+        if not os.path.isfile(self.file):
+            return
+
+        try:
+            with open(self.file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') != CACHE_VERSION:
+            return
+
+        self.entries = data.get('entries', {})
+        self.sources = data.get('sources', {})
+        self.targets = data.get('targets', {})
+
+
+    def save(self):
+        """Saves the index of the cache if it was changed."""
+
+        if not self.dirty:
+            return
+
+        data = {
+            'version': CACHE_VERSION,
+            'entries': self.entries,
+            'sources': self.sources,
+            'targets': self.targets
+        }
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(self.file, 'w') as f:
+                json.dump(data, f)
+            self.dirty = False
+        except OSError as e:
+            print(f"SEUT: Could not save texture cache index '{self.file}': {e}")
+
+
+    def get_source_digest(self, source: str) -> str:
+        """Returns the hash of the content of a source file. Files are only read again if their timestamp or size changed."""
+
+        stat = os.stat(source)
+        record = self.sources.get(source)
+        if record is not None and record[0] == stat.st_mtime_ns and record[1] == stat.st_size:
+            return record[2]
+
+        h = hashlib.sha1()
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+
+        self.sources[source] = [stat.st_mtime_ns, stat.st_size, h.hexdigest()]
+        self.dirty = True
+
+        return h.hexdigest()
+
+
+    def get_key(self, source: str, args: list, tool: str) -> str:
+        """Returns the key of the converted texture: the source's content combined with the conversion arguments and tool."""
+
+        h = hashlib.sha1(self.get_source_digest(source).encode())
+        h.update(repr(args).encode())
+        if os.path.isfile(tool):
+            h.update(f"{os.path.getsize(tool)}".encode())
+
+        return h.hexdigest()
+
+
+    def get_entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + '.dds')
+
+
+    def is_current(self, target_file: str, key: str) -> bool:
+        """Returns True if the target file was created from the key and has not been changed since."""
+
+        record = self.targets.get(target_file)
+        if record is None or record[0] != key or not os.path.isfile(target_file):
+            return False
+
+        stat = os.stat(target_file)
+        return record[1] == stat.st_mtime_ns and record[2] == stat.st_size
+
+
+    def record_target(self, target_file: str, key: str):
+        """Remembers that the target file was created from the key."""
+
+        stat = os.stat(target_file)
+        self.targets[target_file] = [key, stat.st_mtime_ns, stat.st_size]
+        self.dirty = True
+
+
+    def fetch(self, key: str, target_file: str) -> bool:
+        """Copies the converted texture of the key to the target file. Returns False if the cache does not contain it."""
+
+        entry_path = self.get_entry_path(key)
+        if key not in self.entries or not os.path.isfile(entry_path):
+            return False
+
+        # Files are copied rather than hard-linked: tools overwrite their output in place, which would change the cached file as well.
+        try:
+            shutil.copyfile(entry_path, target_file)
+        except OSError:
+            return False
+
+        self.entries[key]['used'] = time.time()
+        self.record_target(target_file, key)
+
+        return True
+
+
+    def store(self, key: str, target_file: str):
+        """Adds a converted texture to the cache."""
+
+        entry_path = self.get_entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            shutil.copyfile(target_file, entry_path)
+        except OSError as e:
+            print(f"SEUT: Could not add '{target_file}' to texture cache: {e}")
+            return
+
+        self.entries[key] = {'size': os.path.getsize(entry_path), 'used': time.time()}
+        self.record_target(target_file, key)
+
+
+    def evict(self, max_size: int):
+        """Removes the least recently used textures until the cache is no larger than max_size bytes."""
+
+        for key in [key for key in self.entries if not os.path.isfile(self.get_entry_path(key))]:
+            del self.entries[key]
+            self.dirty = True
+
+        # Records of files that no longer exist would otherwise accumulate.
+        for source in [source for source in self.sources if not os.path.isfile(source)]:
+            del self.sources[source]
+            self.dirty = True
+        for target in [target for target in self.targets if not os.path.isfile(target)]:
+            del self.targets[target]
+            self.dirty = True
+
+        total = sum(entry['size'] for entry in self.entries.values())
+        if total <= max_size:
+            return
+
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['used']):
+            try:
+                os.remove(self.get_entry_path(key))
+            except OSError:
+                continue
+
+            total -= self.entries[key]['size']
+            del self.entries[key]
+            self.dirty = True
+
+            if total <= max_size:
+                break
+
+
+def get_texture_cache() -> TextureCache:
+    """Returns the texture cache within the asset directory. None if no asset directory is set."""
+
+    preferences = get_preferences()
+    if preferences.asset_path == "":
+        return None
+
+    path = os.path.join(get_abs_path(preferences.asset_path), 'Cache', 'Textures')
+    if path not in texture_caches:
+        texture_caches[path] = TextureCache(path)
+
+    return texture_caches[path]
+
+
+def save_texture_cache(cache: TextureCache):
+    """Evicts textures exceeding the configured cache size and saves the cache, or queues it if a batch is running."""
+
+    if texture_batch is not None:
+        if cache not in texture_batch:
+            texture_batch.append(cache)
+        return
+
+    preferences = get_preferences()
+    if cache.dirty:
+        cache.evict(preferences.texture_cache_size * 1024 * 1024)
+    cache.save()
+
+
+def begin_texture_batch() -> bool:
+    """Makes saving texture caches wait until end_texture_batch is called, so each cache is only evicted and saved once.
+    Returns False if a batch is already running, in which case it is ended by whoever started it."""
+
+    global texture_batch
+    if texture_batch is not None:
+        return False
+
+    texture_batch = []
+
+    return True
+
+
+def end_texture_batch():
+    """Saves all queued texture caches."""
+
+    global texture_batch
+    batch = texture_batch if texture_batch is not None else []
+    texture_batch = None
+
+    for cache in batch:
+        save_texture_cache(cache)
@@ -1,65 +1,236 @@
 import bpy
 import os
+import time
 import subprocess
 import threading
 
-from multiprocessing    import Pool
+from collections        import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
+from .seut_profiler         import record_process
 from ..seut_errors          import get_abs_path
 
 
+# Number of output lines kept in memory per tool call, for error messages. The full output only goes to the log file.
+TOOL_OUTPUT_TAIL = 100
+
+
 def call_tool(args: list, logfile=None) -> list:
 
     try:
-        out = subprocess.check_output(args, cwd=None, stderr=subprocess.STDOUT, shell=True)
-        if logfile is not None:
-            write_to_log(logfile, out, args=args)
-        return [0, out, args]
-    
-    except subprocess.CalledProcessError as e:
-        if logfile is not None:
-            write_to_log(logfile, e.output, args=args)
-        return [e.returncode, e.output, args]
+        header = "Command: " + str(args) + '\n'
+        returncode, out, aborted = run_tool(args, logfile=logfile, log_header=header.encode('utf-8'))
+        return [returncode, out, args]
     
     except Exception as e:
         print(e)
 
 
-def call_tool_threaded(commands: list, thread_count: int, logfile=None):
-
-    threads = []
-    results = []
-    commands_left = commands
-        
-    while len(commands_left) > 0:
-        if len(threads) < thread_count:
-            c = commands_left[0]
-            t = threading.Thread(target=threaded_call, args=(c, results,))
-            threads.append(t)
-            commands_left.remove(c)
-            t.start()
-        else:
-            t = threads[0]
-            threads.remove(t)
-            t.join()
-    
-    for i in threads:
-        i.join()
-    
-    if logfile is not None:
-        output = ""
+def run_tool(args: list, cwd=None, logfile=None, log_header: bytes = None, inspect_line=None, on_start=None, on_exit=None) -> list:
+    """Runs a tool without a shell and reads its output line by line as it is written, instead of buffering all of it.
+    Each line is written to the log file and passed to inspect_line, which can abort the tool by returning True.
+    Returns the return code, the last lines of output and whether the tool was aborted."""
 
-        for r in results:
-            output += r[1].decode("utf-8", "ignore") + '\n'
+    # Keeps console tools from opening a window of their own.
+    creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
 
-        write_to_log(logfile, output.encode())
-    
-    return results
+    process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, creationflags=creationflags)
+    if on_start is not None:
+        on_start(process)
+
+    tail = deque(maxlen=TOOL_OUTPUT_TAIL)
+    aborted = False
+    log = None
+
+    try:
+        if logfile is not None:
+            log = open(get_abs_path(logfile), 'wb')
+            if log_header is not None:
+                log.write(log_header)
+
+        for line in iter(process.stdout.readline, b''):
+            tail.append(line)
+            if log is not None:
+                log.write(line)
+
+            if not aborted and inspect_line is not None and inspect_line(line.decode('utf-8', 'ignore')):
+                aborted = True
+                kill_process(process)
+
+        process.wait()
+
+    except BaseException:
+        kill_process(process)
+        process.wait()
+        raise
+
+    finally:
+        process.stdout.close()
+        if log is not None:
+            log.close()
+        record_process(process)
+        if on_exit is not None:
+            on_exit(process)
+
+    return [process.returncode, b''.join(tail), aborted]
+
+
+def kill_process(process):
+    """Kills a tool process along with the processes it started."""
+
+    if process.poll() is not None:
+        return
+
+    if os.name == 'nt':
+        subprocess.call(["taskkill", "/F", "/T", "/PID", str(process.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        process.kill()
+
+
+class ToolResult:
+    """The result of a single tool call of a batch."""
+
+    def __init__(self, args: list, returncode: int, output: bytes, duration: float):
+        self.args = args
+        self.returncode = returncode
+        self.output = output
+        self.duration = duration
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0
+
+
+class ToolBatch:
+    """Runs a batch of tool calls in a pool of worker threads. Results are written to the log as they come in,
+    only the output of failed calls is kept in memory."""
+
+    def __init__(self, commands: list, logfile=None, max_workers: int = None, sort_key=None, keep_output=False):
+        self.commands = list(commands)
+        self.logfile = logfile
+        self.keep_output = keep_output
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.results = []
+        self.cancelled = False
+        self.executor = None
+        self.futures = set()
+        self.processes = []
+        self.lock = threading.Lock()
+        self.log = None
+
+        # Starting the longest calls first keeps a few large files from being left over at the end.
+        if sort_key is not None:
+            self.commands.sort(key=sort_key, reverse=True)
+
+
+    def start(self):
+        """Starts running the tool calls without waiting for them."""
+
+        if self.logfile is not None:
+            self.log = open(get_abs_path(self.logfile), 'wb')
+
+        if self.commands == []:
+            return
+
+        self.executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.commands)))
+        self.futures = {self.executor.submit(self.run, args) for args in self.commands}
 
 
-def threaded_call(c: list, results: list):
-    result = call_tool(c)
-    results.append(result)
+    def run(self, args: list) -> ToolResult:
+        timer = time.time()
+        try:
+            returncode, out, aborted = run_tool(args, on_start=self.add_process, on_exit=self.remove_process)
+        except Exception as e:
+            returncode, out = -1, str(e).encode('utf-8')
+
+        return ToolResult(args, returncode, out, time.time() - timer)
+
+
+    def add_process(self, process):
+        with self.lock:
+            self.processes.append(process)
+            if self.cancelled:
+                kill_process(process)
+
+
+    def remove_process(self, process):
+        with self.lock:
+            self.processes.remove(process)
+
+
+    def collect(self, timeout: float = 0) -> list:
+        """Logs and returns the results of all calls that finished since the last collection. Waits up to timeout seconds for one to finish."""
+
+        if self.futures == set():
+            return []
+
+        done, self.futures = wait(self.futures, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        results = []
+        for future in done:
+            if future.cancelled():
+                continue
+            result = future.result()
+
+            if self.log is not None:
+                self.log.write(f"Command: {result.args}\n".encode('utf-8'))
+                self.log.write(result.output)
+                self.log.write(b"\n")
+                self.log.flush()
+
+            if result.succeeded and not self.keep_output:
+                result.output = None
+
+            results.append(result)
+
+        self.results += results
+
+        return results
+
+
+    def is_done(self) -> bool:
+        return self.futures == set()
+
+
+    def get_progress(self) -> float:
+        """Returns the share of the tool calls that have finished."""
+
+        if self.commands == []:
+            return 1.0
+
+        return len(self.results) / len(self.commands)
+
+
+    def wait(self) -> list:
+        """Blocks until all calls have finished and returns their results."""
+
+        while not self.is_done():
+            self.collect(None)
+
+        self.close()
+
+        return self.results
+
+
+    def cancel(self):
+        """Skips all calls that have not started yet and kills the running ones."""
+
+        with self.lock:
+            self.cancelled = True
+            for future in self.futures:
+                future.cancel()
+            for process in self.processes:
+                kill_process(process)
+
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+        if self.log is not None:
+            self.log.close()
+            self.log = None
 
 
 def write_to_log(logfile: str, content: str, args=None, cwd=None):
@@ -78,4 +249,9 @@ def write_to_log(logfile: str, content: str, args=None, cwd=None):
 
 
 def get_tool_dir() -> str:
+    """Returns the directory of the tools shipped with SEUT. Can be overridden through the SEUT_TOOL_DIR environment variable."""
+
+    if os.environ.get('SEUT_TOOL_DIR'):
+        return os.environ['SEUT_TOOL_DIR']
+
     return os.path.join(bpy.utils.user_resource("SCRIPTS"), 'addons', __package__[:__package__.find(".")], 'tools')
\ No newline at end of file
@@ -1,51 +1,146 @@
 import bpy
 import os
+import time
+import tempfile
 
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
 
-from ..seut_errors  import seut_report
+from xml.sax.saxutils   import escape
 
+from .seut_sbc_index    import get_sbc_index, invalidate_sbc_indexes
+from .seut_sbc_patch    import SBCPatch
+from ..seut_errors      import seut_report
 
-def get_relevant_sbc(path_in: str, sbc_type: str, container_name: str, subtype_id: str) -> list:
-    """Returns the relevant element of an existing entry, if found."""
 
-    last_sbc = []
-    for path, subdirs, files in os.walk(path_in):
-        for name in files:
-            if path == path_in:
-                continue
-            if not name.endswith(".sbc"):
-                continue
-            with open(os.path.join(path, name)) as f:
-                lines = f.read()
-                if f'<{sbc_type}>' in lines:
-                    entries_start = lines.find(f'<{sbc_type}>') + len(f'<{sbc_type}>')
-                    entries_end = lines.find(f'</{sbc_type}>')
-                    entries = lines[entries_start:entries_end]
-                    last_sbc =  [os.path.join(path, name), lines]
-
-                    if f'<SubtypeId>{subtype_id}</SubtypeId>' in entries:
-                        start = entries.find(f'<SubtypeId>{subtype_id}</SubtypeId>')
-                        start = entries[:start].rfind(f'<{container_name}')
-                        end = (
-                            start
-                            + entries[start:].find(f'</{container_name}>')
-                            + len(f'</{container_name}>')
-                        )
-                        return [os.path.join(path, name), lines, entries_start + start, entries_end + end]
-
-    if last_sbc != []:
-        return [last_sbc[0], last_sbc[1], None, None]
+sbc_batch = None
+
+
+def serialize_xml(element, declaration: bool = True) -> str:
+    """Converts an XML tree into a string indented with tabs, optionally preceded by the XML declaration."""
+
+    ET.indent(element, space="\t")
+
+    # '>' is always escaped within text and attribute values, so this only affects empty elements, which are written as before.
+    content = ET.tostring(element, encoding='unicode').replace(" />", "/>") + "\n"
+
+    if declaration:
+        return '<?xml version="1.0" ?>\n' + content
     else:
-        return [None, None, None, None]
+        return content
+
+
+def write_xml_file(self, context, path: str, content: str) -> int:
+    """Writes a file by writing to a temporary file and replacing the target with it, so it is never read while only partially written.
+    Returns the size of the written file. None if it could not be written."""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    temp = None
+    try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp', delete=False) as f:
+            temp = f.name
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # On Windows, replacing fails while another process is reading the target.
+        for attempt in range(5):
+            try:
+                os.replace(temp, path)
+                break
+            except PermissionError:
+                if attempt == 4:
+                    raise
+                time.sleep(0.1)
+
+    except OSError as e:
+        if temp is not None and os.path.exists(temp):
+            os.remove(temp)
+        seut_report(self, context, 'ERROR', True, 'E055', path, e)
+        return None
+
+    finally:
+        # Lookups have to pick up the written file.
+        if path.lower().endswith('.sbc'):
+            invalidate_sbc_indexes()
+
+    return os.path.getsize(path)
+
+
+def begin_sbc_batch() -> bool:
+    """Makes updates of existing SBC files wait until end_sbc_batch is called, so each file is only written once.
+    Returns False if a batch is already running, in which case it is ended by whoever started it."""
+
+    global sbc_batch
+    if sbc_batch is not None:
+        return False
+
+    sbc_batch = {}
+
+    # Files may have been changed outside of SEUT since the last batch.
+    invalidate_sbc_indexes()
+
+    return True
+
+
+def write_sbc_patch(self, context, path: str, patch: SBCPatch, key: str) -> bool:
+    """Applies the patch to its SBC file and writes it, or queues it if a batch is running.
+    A queued patch replaces one queued earlier for the same file and key."""
+
+    if sbc_batch is None:
+        return write_xml_file(self, context, path, format_entry(patch.apply())) is not None
+
+    queued = sbc_batch.setdefault(os.path.normcase(os.path.abspath(path)), (path, {}))
+    queued[1][key] = patch
+
+    return True
+
+
+def end_sbc_batch(self, context):
+    """Writes every SBC file with queued patches once, with the patches of all its entries applied."""
+
+    global sbc_batch
+    batch = sbc_batch if sbc_batch is not None else {}
+    sbc_batch = None
+
+    for path, patches in batch.values():
+        patches = list(patches.items())
+        combined = patches[0][1]
+
+        # Patches are offsets into the text of the file, which only match if all of them were made from the same text.
+        for key, patch in patches[1:]:
+            if patch.text != combined.text:
+                seut_report(self, context, 'WARNING', False, 'W022', path, key)
+                continue
+            combined.edits += patch.edits
+
+        write_xml_file(self, context, path, format_entry(combined.apply()))
+
+
+def discard_sbc_batch():
+    """Stops batching SBC updates without writing the queued ones."""
+
+    global sbc_batch
+    sbc_batch = None
+
+
+def get_relevant_sbc(path_in: str, sbc_type: str, container_name: str, subtype_id: str) -> list:
+    """Returns the relevant element of an existing entry, if found. The mod is only walked once per batch."""
+
+    index = get_sbc_index(path_in)
+
+    # Outside of a batch, files may have been changed since the last lookup.
+    if sbc_batch is None:
+        index.invalidate()
+
+    return index.lookup(sbc_type, container_name, subtype_id)
 
 
 def update_add_subelement(parent, name: str, value=None, update=False, lines=None):
     """Depending on the input either updates or creates a subelement."""
 
     if update:
-        return update_subelement(lines, name, value)
+        return update_subelement(lines, name, value, parent=parent)
     else:
         return add_subelement(parent, name, value)
 
@@ -72,51 +167,61 @@ def add_subelement(parent, name: str, value=None):
         return subelement
 
 
-def update_subelement(lines: str, name: str, value, attrib: str = None) -> str:
+def update_subelement(lines: SBCPatch, name: str, value, attrib: str = None, parent: str = None) -> SBCPatch:
     """Updates an existing subelements to a new value."""
 
-    entry = get_subelement(lines, name, attrib)
+    span = lines.find(get_element_path(parent, name), attrib=attrib)
+    if span is None:
+        seut_report(None, bpy.context, 'WARNING', False, 'W016', name)
+        return lines
 
-    if attrib is not None:
-        entry_updated = f"<{name} name=\"{attrib}\">{str(value)}</{name}>"
-    else:
-        entry_updated = f"<{name}>{str(value)}</{name}>"
+    lines.set_text(span, value)
 
-    return lines.replace(str(entry), str(entry_updated))
+    return lines
 
 
-def update_add_optional_subelement(parent, name: str, value, update_sbc: bool, lines: str) -> str:
+def update_add_optional_subelement(parent, name: str, value, update_sbc: bool, lines: SBCPatch) -> SBCPatch:
     """Updates or adds an optional subelement depending on the parameters given."""
 
     if update_sbc:
-        if get_subelement(lines, name) == -1:
-            return lines.replace('</Definition>', '<' + name + '>' + str(value) + '</' + name + '>\n</Definition>')
+        if get_subelement(lines, name, parent=parent) == -1:
+            scope = lines.root if parent is None or not isinstance(parent, str) else lines.find(parent)
+            if scope is not None:
+                lines.insert(scope, '<' + name + '>' + escape(str(value)) + '</' + name + '>\n')
+            return lines
         else:
-            return update_subelement(lines, name, str(value))
+            return update_subelement(lines, name, str(value), parent=parent)
     else:
         return add_subelement(parent, name, str(value))
 
 
-def get_subelement(lines: str, name: str, attrib: str = None):
+def get_subelement(lines: SBCPatch, name: str, attrib: str = None, parent: str = None):
     """Returns the specified subelement. -1 if not found."""
     
-    if attrib is not None and f"<{name} name=\"{attrib}\">" in lines:
-        start = lines.find(f"<{name} name=\"{attrib}\">")
-        end = start + lines[start:].find(f"</{name}>") + len(f"</{name}>")
-        return lines[start:end]
+    span = lines.find(get_element_path(parent, name), attrib=attrib)
+    if span is None:
+        return -1
 
-    elif f"<{name}>" in lines:
-        start = lines.find(f"<{name}>")
-        end = start + lines[start:].find(f"</{name}>") + len(f"</{name}>")
-        return lines[start:end]
+    return lines.get_text(span)
 
-    elif f"<{name} " in lines:
-        start = lines.find(f"<{name} ")
-        end = start + lines[start:].find('/>') + 2
-        return lines[start:end]
 
-    else:
-        return -1
+def remove_subelement(lines: SBCPatch, name: str, parent: str = None) -> SBCPatch:
+    """Removes a subelement, if it exists."""
+
+    span = lines.find(get_element_path(parent, name))
+    if span is not None:
+        lines.remove(span)
+
+    return lines
+
+
+def get_element_path(parent, name: str) -> str:
+    """Returns the path of an element below its parent. In updates, parents are given as paths, the definition itself as None."""
+
+    if parent is None or not isinstance(parent, str):
+        return name
+
+    return f"{parent}/{name}"
 
 
 def update_add_attrib(element, name: str, value=None, update=False, lines=None):
@@ -141,50 +246,38 @@ def add_attrib(element, name: str, value):
     return element.set(name, str(value))
 
 
-def update_attrib(lines, element, name: str, value):
+def update_attrib(lines: SBCPatch, element: str, name: str, value) -> SBCPatch:
     """Adds an attribute to an element."""
 
-    entry = get_subelement(lines, element)
-    if entry == -1:
+    span = lines.find(element)
+    if span is None:
         seut_report(None, bpy.context, 'WARNING', False, 'W016', element)
         return lines
 
-    attrib = get_attrib(entry, name)
-    if attrib == -1:
+    if lines.get_attrib(span, name) is None:
         seut_report(None, bpy.context, 'WARNING', False, 'W017', name, element)
         return lines
 
-    entry_updated = entry.replace(name + "=\"" + attrib + "\"", name + "=\"" + str(value) + "\"")
-
-    return lines.replace(str(entry), entry_updated)
-
+    lines.set_attrib(span, name, value)
 
-def get_attrib(entry: str, name: str):
-    """Returns the specified attribute. -1 if not found."""
+    return lines
 
-    if entry.find(name + "=\"") != -1:
-        start = entry.find(name + "=\"") + len(name) + 2
-        end = start + entry[start:].find("\"")
-        return entry[start:end]
-    else:
-        return -1
 
-
-def convert_back_xml(element, name: str, lines_entry: str, definition_type: str = 'Definition') -> str:
+def convert_back_xml(element, name: str, lines_entry: SBCPatch, definition_type: str = 'Definition') -> SBCPatch:
     """Converts a temp xml entry back and replaces it inside the larger xml entry."""
 
-    entry = ET.tostring(element, 'utf-8')
-    entry = xml.dom.minidom.parseString(entry).toprettyxml()
-    entry = entry[entry.find("\n") + 1:]
+    entry = serialize_xml(element, False)
 
-    start = lines_entry.find('<' + name + '>')
+    span = lines_entry.find(name)
     
-    if start == -1:
-        start = lines_entry.find(f"</{definition_type}>")
-        return lines_entry[:start] + entry + lines_entry[start:]
+    if span is None:
+        definition = lines_entry.root if lines_entry.root is not None and lines_entry.root.tag == definition_type else lines_entry.find(definition_type)
+        if definition is not None:
+            lines_entry.insert(definition, entry)
     else:
-        end = lines_entry.find('</' + name + '>') + len('</' + name + '>')
-        return lines_entry.replace(lines_entry[start:end], entry)
+        lines_entry.replace(span.start, span.end, entry)
+
+    return lines_entry
 
 
 def format_entry(lines: str, depth: int = 0) -> str:
@@ -192,39 +285,45 @@ def format_entry(lines: str, depth: int = 0) -> str:
 
     indent = "\t"
     lines_arr = lines.splitlines()
-    entry = ""
-
-    for line in lines_arr:
-        
-        remove = False
-        line = indent * depth + line.strip()
-            
-        start = line.find('<')
-        end = line.rfind('>')
-        
-        if line.count('<') <= 0 and line.count('>') <= 0:
-            if line.strip() == "":
-                remove = True
-        elif line[start:start+4] == '<!--' and line[end-2:end+1] == '-->':
-            pass
-        elif line[end-1:end+1] == '/>':
-            pass
-        elif line.find('<!--') != -1 and line.find('/>') != -1:
-            pass
-        elif line[start:start+2] == '<?' and line[end-1:end+1] == '?>':
-            pass
-        elif line.count('<') >= 2 and line.count('>') >= 2 and line.count('</') == 1:
-            pass
-        elif line[start:start+2] == '</':
+    if lines_arr == []:
+        return ""
+
+    # Every line but those equal to the last one is followed by a line break.
+    last = lines_arr[-1].strip()
+    entry = []
+    append = entry.append
+
+    for content in map(str.strip, lines_arr):
+
+        if content == "":
+            continue
+
+        start = content.find('<')
+        end = content.rfind('>')
+
+        if start == -1 and end == -1:
+            append(indent * depth + content)
+
+        # Self-closing tags, elements on a single line, comments and declarations keep the depth.
+        elif (content[end-1:end+1] == '/>'
+                or content.count('</') == 1 and content.count('<') >= 2 and content.count('>') >= 2
+                or content[start:start+4] == '<!--' and content[end-2:end+1] == '-->'
+                or content[start:start+2] == '<?' and content[end-1:end+1] == '?>'
+                or '<!--' in content and '/>' in content):
+            append(indent * depth + content)
+
+        # Closing tags are indented one level less than their content.
+        elif content[start:start+2] == '</':
+            line = (indent * depth + content)[1:]
+            content = line.strip()
             depth -= 1
-            line = line[1:]
+            append(line)
+
         else:
+            append(indent * depth + content)
             depth += 1
-        
-        if line.strip() != lines_arr[-1].strip():
-            line = line + "\n"
-        
-        if not remove:
-            entry += line
-
-    return entry
\ No newline at end of file
+
+        if content != last:
+            append("\n")
+
+    return "".join(entry)
\ No newline at end of file